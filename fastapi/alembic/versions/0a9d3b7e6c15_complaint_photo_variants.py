@@ -0,0 +1,30 @@
+"""Complaint photo web and thumbnail variants
+
+Revision ID: 0a9d3b7e6c15
+Revises: f2c61d9e8a04
+Create Date: 2026-10-18 16:31:14.552908
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9d3b7e6c15'
+down_revision: Union[str, Sequence[str], None] = 'f2c61d9e8a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("cattle_complaints", sa.Column("photo_web_path", sa.String(length=255), nullable=True))
+    op.add_column("cattle_complaints", sa.Column("photo_thumb_path", sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("cattle_complaints", "photo_thumb_path")
+    op.drop_column("cattle_complaints", "photo_web_path")
@@ -0,0 +1,55 @@
+"""Complaint keyset pagination indexes
+
+Revision ID: 3f1a9c2b7d45
+Revises: 6c11b86fbdc3
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2b7d45'
+down_revision: Union[str, Sequence[str], None] = '6c11b86fbdc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction; build without locking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cattle_complaints_created_at_id",
+            "cattle_complaints",
+            ["created_at", "complaint_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_cattle_complaints_status_created_at_id",
+            "cattle_complaints",
+            ["complaint_status", "created_at", "complaint_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_cattle_complaints_status_created_at_id",
+            table_name="cattle_complaints",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_cattle_complaints_created_at_id",
+            table_name="cattle_complaints",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -20,13 +20,101 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # The tables as they stood before the first migration; later revisions
+    # add to them. if_not_exists lets a database whose tables were made by
+    # create_all (before migrations were used) be upgraded in place.
+    op.create_table(
+        "farmers",
+        sa.Column("fid", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("fname", sa.String(length=35), nullable=False),
+        sa.Column("faadhar", sa.String(length=20), nullable=False),
+        sa.Column("fphone", sa.String(length=13), nullable=False),
+        sa.Column("femail", sa.String(length=100), nullable=False),
+        sa.Column("faddress", sa.String(length=100), nullable=False),
+        sa.Column("farmname", sa.String(length=50), nullable=False),
+        sa.Column("farmtype", sa.String(length=10), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("fid"),
+        sa.UniqueConstraint("faadhar"),
+        sa.UniqueConstraint("femail"),
+        if_not_exists=True,
+    )
+    op.create_index(op.f("ix_farmers_fid"), "farmers", ["fid"], unique=False, if_not_exists=True)
+
+    op.create_table(
+        "vets",
+        sa.Column("vid", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("vname", sa.String(length=35), nullable=False),
+        sa.Column("vemail", sa.String(length=100), nullable=False),
+        sa.Column("vphone", sa.String(length=13), nullable=False),
+        sa.Column("vlicense", sa.String(length=50), nullable=False),
+        sa.Column("vclinic", sa.String(length=100), nullable=False),
+        sa.Column("vaddress", sa.String(length=200), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("vid"),
+        sa.UniqueConstraint("vemail"),
+        sa.UniqueConstraint("vlicense"),
+        if_not_exists=True,
+    )
+    op.create_index(op.f("ix_vets_vid"), "vets", ["vid"], unique=False, if_not_exists=True)
+
+    op.create_table(
+        "shelters",
+        sa.Column("sid", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("sname", sa.String(length=100), nullable=False),
+        sa.Column("semail", sa.String(length=100), nullable=False),
+        sa.Column("sphone", sa.String(length=13), nullable=False),
+        sa.Column("sregistration", sa.String(length=50), nullable=False),
+        sa.Column("saddress", sa.String(length=200), nullable=False),
+        sa.Column("scapacity", sa.Integer(), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("sid"),
+        sa.UniqueConstraint("semail"),
+        sa.UniqueConstraint("sregistration"),
+        if_not_exists=True,
+    )
+    op.create_index(op.f("ix_shelters_sid"), "shelters", ["sid"], unique=False, if_not_exists=True)
+
+    op.create_table(
+        "cattle_complaints",
+        sa.Column("complaint_id", sa.Uuid(), nullable=False),
+        sa.Column("reporter_name", sa.String(length=50), nullable=False),
+        sa.Column("reporter_phone", sa.String(length=10), nullable=False),
+        sa.Column("reporter_email", sa.String(length=100), nullable=True),
+        sa.Column("reporter_location", sa.String(length=200), nullable=False),
+        sa.Column("cattle_count", sa.Integer(), nullable=False),
+        sa.Column("cattle_type", sa.String(length=20), nullable=False),
+        sa.Column("cattle_condition", sa.String(length=30), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("photo_path", sa.String(length=255), nullable=True),
+        sa.Column("spotted_date", sa.DateTime(), nullable=False),
+        sa.Column("exact_location", sa.Text(), nullable=False),
+        sa.Column("gps_latitude", sa.Float(), nullable=True),
+        sa.Column("gps_longitude", sa.Float(), nullable=True),
+        sa.Column("nearest_landmark", sa.String(length=100), nullable=True),
+        sa.Column("complaint_status", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("complaint_id"),
+        if_not_exists=True,
+    )
+    op.create_index(op.f("ix_cattle_complaints_complaint_id"), "cattle_complaints", ["complaint_id"],
+                    unique=False, if_not_exists=True)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f("ix_cattle_complaints_complaint_id"), table_name="cattle_complaints")
+    op.drop_table("cattle_complaints")
+    op.drop_index(op.f("ix_shelters_sid"), table_name="shelters")
+    op.drop_table("shelters")
+    op.drop_index(op.f("ix_vets_vid"), table_name="vets")
+    op.drop_table("vets")
+    op.drop_index(op.f("ix_farmers_fid"), table_name="farmers")
+    op.drop_table("farmers")
@@ -0,0 +1,39 @@
+"""Complaint counters
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3f1a9c2b7d45
+Create Date: 2026-10-18 11:40:05.918274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a93'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2b7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "complaint_counters",
+        sa.Column("complaint_status", sa.String(length=20), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("complaint_status", "shard"),
+    )
+    # seed from the existing rows; the reconciler keeps it honest afterwards
+    op.execute(
+        "INSERT INTO complaint_counters (complaint_status, shard, total) "
+        "SELECT complaint_status, 0, count(*) FROM cattle_complaints GROUP BY complaint_status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("complaint_counters")
@@ -0,0 +1,47 @@
+"""Complaint photo processing attempts
+
+Revision ID: a3c8f5d29e61
+Revises: d81c5a2f07e3
+Create Date: 2026-10-18 21:05:37.190428
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8f5d29e61'
+down_revision: Union[str, Sequence[str], None] = 'd81c5a2f07e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("cattle_complaints",
+                  sa.Column("photo_attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("cattle_complaints", sa.Column("photo_failed_at", sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cattle_complaints_photo_pending",
+            "cattle_complaints",
+            ["created_at"],
+            postgresql_where=sa.text("photo_path IS NOT NULL AND photo_thumb_path IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_cattle_complaints_photo_pending",
+            table_name="cattle_complaints",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("cattle_complaints", "photo_failed_at")
+    op.drop_column("cattle_complaints", "photo_attempts")
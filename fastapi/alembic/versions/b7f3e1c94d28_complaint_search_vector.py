@@ -0,0 +1,63 @@
+"""Complaint full-text search vector and GIN index
+
+Revision ID: b7f3e1c94d28
+Revises: 9d4e2a6b1c70
+Create Date: 2026-10-18 17:48:09.531274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3e1c94d28'
+down_revision: Union[str, Sequence[str], None] = '9d4e2a6b1c70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# frozen copy of app.models.complaint.SEARCH_VECTOR_SQL at this revision
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(exact_location, '') || ' ' "
+    "|| coalesce(nearest_landmark, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(reporter_location, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A stored generated column is filled in by the ALTER itself (one table
+    # rewrite) and kept current by Postgres on every insert and update.
+    op.add_column(
+        "cattle_complaints",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cattle_complaints_search_vector",
+            "cattle_complaints",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_cattle_complaints_search_vector",
+            table_name="cattle_complaints",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("cattle_complaints", "search_vector")
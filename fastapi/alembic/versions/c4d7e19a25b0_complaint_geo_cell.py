@@ -0,0 +1,70 @@
+"""Complaint geo cell column and index
+
+Revision ID: c4d7e19a25b0
+Revises: 8b2e4d6f1a93
+Create Date: 2026-10-18 13:05:47.220914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.geo import GEO_CELL_BITS
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e19a25b0'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_LON_BITS = (GEO_CELL_BITS + 1) // 2
+_LAT_BITS = GEO_CELL_BITS // 2
+
+# app.utils.geo.encode_cell in SQL: quantize each axis, then interleave the
+# bits (longitude takes the odd positions, latitude the even ones). Set-based,
+# so it also renders under ``alembic upgrade --sql``.
+BACKFILL_SQL = f"""
+UPDATE cattle_complaints AS c
+SET geo_cell = (
+    SELECT sum((((q.x >> k) & 1) << (2 * k + 1)) | (((q.y >> k) & 1) << (2 * k)))::bigint
+    FROM (
+        SELECT
+            least(greatest(floor((c.gps_longitude + 180.0) / 360.0 * {1 << _LON_BITS})::bigint, 0),
+                  {(1 << _LON_BITS) - 1}) AS x,
+            least(greatest(floor((c.gps_latitude + 90.0) / 180.0 * {1 << _LAT_BITS})::bigint, 0),
+                  {(1 << _LAT_BITS) - 1}) AS y
+    ) AS q, generate_series(0, {_LAT_BITS - 1}) AS k
+)
+WHERE c.gps_latitude BETWEEN -90 AND 90
+  AND c.gps_longitude BETWEEN -180 AND 180
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("cattle_complaints", sa.Column("geo_cell", sa.BigInteger(), nullable=True))
+    op.execute(BACKFILL_SQL)
+
+    # CONCURRENTLY cannot run inside a transaction; build without locking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cattle_complaints_geo_cell",
+            "cattle_complaints",
+            ["geo_cell"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_cattle_complaints_geo_cell",
+            table_name="cattle_complaints",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("cattle_complaints", "geo_cell")
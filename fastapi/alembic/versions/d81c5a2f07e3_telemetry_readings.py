@@ -0,0 +1,41 @@
+"""Telemetry readings (partitioned by day)
+
+Revision ID: d81c5a2f07e3
+Revises: b7f3e1c94d28
+Create Date: 2026-10-18 19:20:14.862530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81c5a2f07e3'
+down_revision: Union[str, Sequence[str], None] = 'b7f3e1c94d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only the partitioned parent lives here; the daily partitions are rolled
+    # forward (and expired) by the app's partition manager.
+    op.create_table(
+        "telemetry_readings",
+        sa.Column("tag_id", sa.String(length=64), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(), nullable=False),
+        sa.Column("temperature", sa.Float(), nullable=True),
+        sa.Column("activity", sa.Float(), nullable=True),
+        sa.Column("rumination", sa.Float(), nullable=True),
+        postgresql_partition_by="RANGE (recorded_at)",
+    )
+    op.create_index("ix_telemetry_readings_tag_recorded_at", "telemetry_readings", ["tag_id", "recorded_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # dropping the parent drops every partition with it
+    op.drop_index("ix_telemetry_readings_tag_recorded_at", table_name="telemetry_readings")
+    op.drop_table("telemetry_readings")
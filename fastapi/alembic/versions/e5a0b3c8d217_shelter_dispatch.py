@@ -0,0 +1,49 @@
+"""Shelter coordinates and complaint assignment
+
+Revision ID: e5a0b3c8d217
+Revises: c4d7e19a25b0
+Create Date: 2026-10-18 14:22:09.613840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0b3c8d217'
+down_revision: Union[str, Sequence[str], None] = 'c4d7e19a25b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("shelters", sa.Column("slatitude", sa.Float(), nullable=True))
+    op.add_column("shelters", sa.Column("slongitude", sa.Float(), nullable=True))
+    op.add_column("cattle_complaints", sa.Column("assigned_shelter_id", sa.Uuid(), nullable=True))
+    op.add_column("cattle_complaints", sa.Column("assigned_at", sa.DateTime(), nullable=True))
+    op.create_foreign_key(
+        "cattle_complaints_assigned_shelter_id_fkey",
+        "cattle_complaints",
+        "shelters",
+        ["assigned_shelter_id"],
+        ["sid"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_cattle_complaints_assigned_shelter",
+        "cattle_complaints",
+        ["assigned_shelter_id", "complaint_status"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cattle_complaints_assigned_shelter", table_name="cattle_complaints")
+    op.drop_constraint("cattle_complaints_assigned_shelter_id_fkey", "cattle_complaints", type_="foreignkey")
+    op.drop_column("cattle_complaints", "assigned_at")
+    op.drop_column("cattle_complaints", "assigned_shelter_id")
+    op.drop_column("shelters", "slongitude")
+    op.drop_column("shelters", "slatitude")
@@ -0,0 +1,40 @@
+"""Content-addressed photo blobs
+
+Revision ID: f2c61d9e8a04
+Revises: e5a0b3c8d217
+Create Date: 2026-10-18 15:48:52.037165
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c61d9e8a04'
+down_revision: Union[str, Sequence[str], None] = 'e5a0b3c8d217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "photo_blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("path", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    # existing uploads keep their legacy timestamp_uuid paths and no digest
+    op.add_column("cattle_complaints", sa.Column("photo_sha256", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("cattle_complaints", "photo_sha256")
+    op.drop_table("photo_blobs")
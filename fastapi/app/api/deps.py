@@ -0,0 +1,100 @@
+"""
+Authentication dependencies.
+
+Access tokens are verified locally (signature, expiry, revocation list), and
+the user behind them is read through ``user_cache``, so an authenticated
+request normally costs no database round trip and no password hashing.
+"""
+import uuid
+from typing import NamedTuple
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import ACCESS_TOKEN, decode_token
+from app.db.session import get_db
+from app.models.user import Farmer, Vet, Shelter
+from app.services.cache import user_cache
+from app.services.token_revocation import revocation_list
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# role -> (id column, name column, email column)
+USER_COLUMNS = {
+    "farmer": (Farmer.fid, Farmer.fname, Farmer.femail),
+    "vet": (Vet.vid, Vet.vname, Vet.vemail),
+    "shelter": (Shelter.sid, Shelter.sname, Shelter.semail),
+}
+
+
+class CurrentUser(NamedTuple):
+    user_id: uuid.UUID
+    role: str
+    name: str
+    email: str
+    token: dict
+
+
+def _unauthorized(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def user_cache_key(role: str, user_id) -> str:
+    return f"{role}:{user_id}"
+
+
+async def load_user(db: AsyncSession, role: str, user_id: uuid.UUID) -> dict | None:
+    """Cached snapshot of a user, or None if the role is unknown or the user is gone."""
+    columns = USER_COLUMNS.get(role)
+    if columns is None:
+        return None
+
+    async def load():
+        id_col, name_col, email_col = columns
+        row = (await db.execute(select(name_col, email_col).where(id_col == user_id))).one_or_none()
+        if row is None:
+            return None
+        return {"name": row[0], "email": row[1]}
+
+    return await user_cache.get_or_load(user_cache_key(role, user_id), load)
+
+
+async def get_current_user(
+        credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+        db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = decode_token(credentials.credentials, ACCESS_TOKEN)
+        user_id = uuid.UUID(claims["sub"])
+    except (JWTError, ValueError):
+        raise _unauthorized()
+    if revocation_list.is_revoked(claims["jti"]):
+        raise _unauthorized("Token has been revoked")
+
+    role = claims.get("role")
+    user = await load_user(db, role, user_id)
+    if user is None:
+        raise _unauthorized()
+    return CurrentUser(user_id, role, user["name"], user["email"], claims)
+
+
+def require_role(role: str):
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if user.role != role:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed for this role")
+        return user
+    return dependency
+
+
+get_current_farmer = require_role("farmer")
+get_current_vet = require_role("vet")
+get_current_shelter = require_role("shelter")
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Body, File, Header, Query, UploadFile
+from fastapi.responses import Response
+from sqlalchemy import insert as sa_insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.schemas.auth import (
@@ -10,138 +12,156 @@ from app.schemas.auth import (
     _normalize_aadhaar,
     _normalize_phone,
     DeleteUserRequest,
+    RefreshRequest,
+    LogoutRequest,
 )
 from app.models.user import Farmer, Vet, Shelter
-from app.core.security import hash_password, verify_password
+from app.models.complaint import CattleComplaint
+from app.core.security import (
+    REFRESH_TOKEN,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    hash_password_async,
+    verify_password_async,
+)
+from app.core.rate_limit import client_ip, login_throttle
+from app.api.deps import CurrentUser, get_current_user, load_user, user_cache_key
 from app.services.mailer import send_email
+from app.services.welcome_mail import welcome_email
+from app.services.user_import import IMPORT_SPECS, error_report_csv, import_users
+from app.services.dispatch import dispatcher
+from app.services.cache import complaint_cache, user_cache
+from app.services.token_revocation import revocation_list
+from jose import JWTError
 from app.core.config import settings
-import asyncio
+import hmac
+import logging
 
 router = APIRouter(tags=["auth"])
 
 router = APIRouter()
 
-@router.post("/signup/farmer", status_code=201)
-async def signup_farmer(payload: FarmerCreate, db: AsyncSession = Depends(get_db)):
-    existing = await db.scalar(select(Farmer).where(Farmer.faadhar == payload.faadhar))
-    if existing:
-        raise HTTPException(400, "Farmer already registered with this Aadhar")
+# Postgres names single-column unique constraints <table>_<column>_key
+UNIQUE_VIOLATION_MESSAGES = {
+    "farmers_faadhar_key": "Farmer already registered with this Aadhar",
+    "farmers_femail_key": "Email already registered",
+    "vets_vemail_key": "Email already registered",
+    "vets_vlicense_key": "License number already registered",
+    "shelters_semail_key": "Email already registered",
+    "shelters_sregistration_key": "Registration number already exists",
+}
 
-    existing_email = await db.scalar(select(Farmer).where(Farmer.femail == payload.femail))
-    if existing_email:
-        raise HTTPException(400, "Email already registered")
 
-    new_user = Farmer(**payload.model_dump(exclude={"password"}))
-    new_user.password_hash = hash_password(payload.password)
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-
-    # --- HTML Email Content ---
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-      <body style="font-family: Arial, sans-serif; background-color: #f4f7fa; padding: 20px;">
-        <div style="max-width: 600px; margin: auto; background-color: #ffffff; border-radius: 10px; padding: 25px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-          <div style="text-align: center;">
-            <img src="https://upload.wikimedia.org/wikipedia/commons/6/6b/Cow_icon.png" alt="LifeTag Logo" width="60" />
-            <h2 style="color: #2c7be5;">Welcome to LifeTag</h2>
-            <p style="color: #444;">Empowering Farmers • Ensuring Livestock Welfare</p>
-          </div>
-          <hr style="margin: 20px 0;">
-          <p>Dear <b>{new_user.fname}</b>,</p>
-          <p>We are delighted to inform you that your <b>LifeTag Farmer Account</b> has been successfully created. You are now part of India’s growing digital livestock ecosystem aimed at ensuring traceability, welfare, and transparency.</p>
-
-          <p>With your LifeTag account, you can now:</p>
-          <ul>
-            <li>Access your registered cattle details and vaccination records.</li>
-            <li>Update ownership and track health history.</li>
-            <li>Connect with veterinary officers and nearby shelters.</li>
-            <li>Receive notifications about upcoming vaccinations and welfare schemes.</li>
-          </ul>
-
-          <p style="margin-top: 20px;">You can log in anytime at:  
-            <a href="https://lifetag.in/login" style="color: #2c7be5; text-decoration: none;">https://lifetag.in/login</a>
-          </p>
-
-          <p>If you have any questions or need assistance, feel free to contact our support team at  
-            <a href="mailto:support@lifetag.in">support@lifetag.in</a>.
-          </p>
-
-          <p style="margin-top: 30px;">Warm regards,<br>
-          <b>The LifeTag Support Team</b><br>
-          Department of Digital Livestock Management<br>
-          Ministry of Animal Husbandry & Dairying (Prototype)</p>
-
-          <hr style="margin: 30px 0;">
-          <p style="font-size: 12px; color: #888; text-align: center;">
-            This is an auto-generated email. Please do not reply.<br>
-            © 2025 LifeTag. All Rights Reserved.
-          </p>
-        </div>
-      </body>
-    </html>
+def _violated_constraint(error: IntegrityError) -> str | None:
+    # asyncpg exposes the name on the driver exception the DBAPI error wraps
+    cause = getattr(error.orig, "__cause__", None)
+    name = getattr(cause, "constraint_name", None) or getattr(error.orig, "constraint_name", None)
+    if name:
+        return name
+    text = str(error.orig)
+    return next((c for c in UNIQUE_VIOLATION_MESSAGES if c in text), None)
+
+
+async def _insert_user(db: AsyncSession, model, values: dict, id_column):
     """
+    Insert a user and return its id in a single round trip.
+
+    Uniqueness is left to the table's unique constraints, which also closes
+    the race two concurrent signups had with the old pre-check SELECTs. The
+    statement runs in autocommit, so there is no separate BEGIN/COMMIT.
+    """
+    conn = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+    try:
+        return await conn.scalar(sa_insert(model).values(**values).returning(id_column))
+    except IntegrityError as e:
+        message = UNIQUE_VIOLATION_MESSAGES.get(_violated_constraint(e))
+        if message is None:
+            raise
+        raise HTTPException(400, message)
+
+
+@router.post("/signup/farmer", status_code=201)
+async def signup_farmer(payload: FarmerCreate, db: AsyncSession = Depends(get_db)):
+    values = payload.model_dump(exclude={"password"})
+    values["password_hash"] = await hash_password_async(payload.password)
+    user_id = await _insert_user(db, Farmer, values, Farmer.fid)
 
-    asyncio.create_task(send_email(
-        "Welcome to LifeTag – Your Farmer Registration is Successful",
-        new_user.femail,
-        html_content,
-        True
-    ))
+    try:
+        await send_email(*welcome_email("farmer", payload.fname, payload.femail))
+    except Exception:
+        logging.exception("Failed to queue farmer welcome email")
 
-    return {"message": "Farmer signup successful", "user_id": new_user.fid}
+    return {"message": "Farmer signup successful", "user_id": user_id}
 
 
 @router.post("/signup/vet", status_code=201)
 async def signup_vet(payload: VetCreate, db: AsyncSession = Depends(get_db)):
-    if await db.scalar(select(Vet).where(Vet.vemail == payload.vemail)):
-        raise HTTPException(400, "Email already registered")
-    if await db.scalar(select(Vet).where(Vet.vlicense == payload.vlicense)):
-        raise HTTPException(400, "License number already registered")
-
-    new_user = Vet(**payload.model_dump(exclude={"password"}))
-    new_user.password_hash = hash_password(payload.password)
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    values = payload.model_dump(exclude={"password"})
+    values["password_hash"] = await hash_password_async(payload.password)
+    user_id = await _insert_user(db, Vet, values, Vet.vid)
 
-    asyncio.create_task(send_email(
-        "Welcome to LifeTag - Veterinarian Account",
-        new_user.vemail,
-        f"Hello Dr. {new_user.vname}, your vet account has been created."
-    ))
-    return {"message": "Vet signup successful", "user_id": new_user.vid}
+    try:
+        await send_email(*welcome_email("vet", payload.vname, payload.vemail))
+    except Exception:
+        logging.exception("Failed to queue vet welcome email")
+    return {"message": "Vet signup successful", "user_id": user_id}
 
 
 @router.post("/signup/shelter", status_code=201)
 async def signup_shelter(payload: ShelterCreate, db: AsyncSession = Depends(get_db)):
-    if await db.scalar(select(Shelter).where(Shelter.semail == payload.semail)):
-        raise HTTPException(400, "Email already registered")
-    if await db.scalar(select(Shelter).where(Shelter.sregistration == payload.sregistration)):
-        raise HTTPException(400, "Registration number already exists")
-
-    new_user = Shelter(**payload.model_dump(exclude={"password"}))
-    new_user.password_hash = hash_password(payload.password)
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    values = payload.model_dump(exclude={"password"})
+    values["password_hash"] = await hash_password_async(payload.password)
+    user_id = await _insert_user(db, Shelter, values, Shelter.sid)
+    dispatcher.add_shelter(user_id, payload.slatitude, payload.slongitude, payload.scapacity)
+
+    try:
+        await send_email(*welcome_email("shelter", payload.sname, payload.semail))
+    except Exception:
+        logging.exception("Failed to queue shelter welcome email")
+    return {"message": "Shelter signup successful", "user_id": user_id}
+
+
+@router.post("/import/{role}")
+async def import_users_csv(
+        role: str,
+        file: UploadFile = File(...),
+        report_format: str = Query("json", alias="format", pattern="^(json|csv)$"),
+        x_import_token: str | None = Header(None),
+        db: AsyncSession = Depends(get_db)
+):
+    """Create farmer, vet or shelter accounts from a CSV whose header matches the signup fields."""
+    if not settings.USER_IMPORT_TOKEN or not hmac.compare_digest(x_import_token or "", settings.USER_IMPORT_TOKEN):
+        raise HTTPException(403, "User import is not allowed")
+    role = role.lower()
+    if role not in IMPORT_SPECS:
+        raise HTTPException(400, "Unknown role")
 
-    asyncio.create_task(send_email(
-        "Welcome to LifeTag - Shelter Account",
-        new_user.semail,
-        f"Hello {new_user.sname}, your shelter account has been created."
-    ))
-    return {"message": "Shelter signup successful", "user_id": new_user.sid}
+    try:
+        report = await import_users(db, role, file)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if report_format == "csv":
+        return Response(
+            content=error_report_csv(report),
+            media_type="text/csv",
+            headers={"X-Import-Rows": str(report["rows"]), "X-Import-Created": str(report["created"]),
+                     "X-Import-Complete": "true" if report["complete"] else "false"},
+        )
+    return report
 
 
 @router.post("/login")
-async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+async def login(payload: LoginRequest, request: Request, db: AsyncSession = Depends(get_db)):
     role = payload.role.lower()
     identifier = payload.identifier
     pwd = payload.password
     user = None
 
+    # throttle before touching the database or the bcrypt pool
+    await login_throttle.check(client_ip(request), role, identifier)
+
     if role == "farmer":
         try:
             norm_id = _normalize_aadhaar(identifier)
@@ -156,8 +176,9 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
         raise HTTPException(401, "Invalid credentials")
 
     # Password check
-    if not verify_password(pwd, user.password_hash):
+    if not await verify_password_async(pwd, user.password_hash):
         raise HTTPException(401, "Invalid credentials")
+    await login_throttle.succeeded(role, identifier)
 
     if role == "farmer":
         user_name = user.fname
@@ -168,11 +189,73 @@ async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
     else:
         user_name = ""
 
+    user_id = getattr(user, 'fid', getattr(user, 'vid', getattr(user, 'sid', None)))
     return {
         "message": "Login successful",
-        "user_id": str(getattr(user, 'fid', getattr(user, 'vid', getattr(user, 'sid', None))),),
+        "user_id": str(user_id),
         "user_name": user_name,
-        "role": role
+        "role": role,
+        **_issue_tokens(user_id, role),
+    }
+
+
+def _issue_tokens(user_id, role: str) -> dict:
+    access_token, _ = create_access_token(user_id, role)
+    refresh_token, _ = create_refresh_token(user_id, role)
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+@router.post("/token/refresh")
+async def refresh_token(payload: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new token pair; the old refresh token is revoked."""
+    import uuid
+
+    invalid = HTTPException(401, "Invalid refresh token")
+    try:
+        claims = decode_token(payload.refresh_token, REFRESH_TOKEN)
+        user_id = uuid.UUID(claims["sub"])
+    except (JWTError, ValueError):
+        raise invalid
+    if revocation_list.is_revoked(claims["jti"]):
+        raise invalid
+    if await load_user(db, claims.get("role"), user_id) is None:
+        raise invalid
+    if not await revocation_list.revoke(db, claims["jti"], claims["exp"]):
+        raise invalid
+    await db.commit()
+    return _issue_tokens(user_id, claims["role"])
+
+
+@router.post("/logout")
+async def logout(
+        payload: LogoutRequest | None = None,
+        current: CurrentUser = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    await revocation_list.revoke(db, current.token["jti"], current.token["exp"])
+    if payload is not None and payload.refresh_token:
+        try:
+            claims = decode_token(payload.refresh_token, REFRESH_TOKEN)
+        except JWTError:
+            claims = None
+        if claims is not None and claims["sub"] == str(current.user_id):
+            await revocation_list.revoke(db, claims["jti"], claims["exp"])
+    await db.commit()
+    return {"message": "Logged out"}
+
+
+@router.get("/me")
+async def me(current: CurrentUser = Depends(get_current_user)):
+    return {
+        "user_id": str(current.user_id),
+        "user_name": current.name,
+        "email": current.email,
+        "role": current.role,
     }
 
 
@@ -204,9 +287,20 @@ async def delete_user(payload: DeleteUserRequest, db: AsyncSession = Depends(get
     else:
         raise HTTPException(status_code=400, detail="Unknown role")
 
+    orphaned = []
+    if role == "shelter":
+        # assigned complaints lose their shelter through ON DELETE SET NULL
+        orphaned = (await db.scalars(
+            select(CattleComplaint.complaint_id).where(CattleComplaint.assigned_shelter_id == uid)
+        )).all()
+
     result = await db.execute(stmt)
     # result.rowcount may be None depending on DB/driver; check using SELECT
     await db.commit()
+    if role == "shelter":
+        dispatcher.remove_shelter(uid)
+    await complaint_cache.invalidate(*(str(cid) for cid in orphaned))
+    await user_cache.invalidate(user_cache_key(role, uid))
 
     # verify deletion by attempting to fetch
     if role == "farmer":
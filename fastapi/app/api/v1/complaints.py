@@ -1,81 +1,43 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import CurrentUser, get_current_shelter
 from app.db.session import get_db
-from app.utils.file import allowed_file, save_upload_file
-from app.schemas.complaint import CattleComplaintCreate, CattleComplaintRead
+from app.utils.file import allowed_file, image_media_type, store_upload_file
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.geo import bounding_box, cover_ranges, encode_cell, haversine_km, split_box, valid_coordinates
+from app.schemas.complaint import CattleComplaintCreate, CattleComplaintRead, ComplaintStatusBatchUpdate
 from app.models.complaint import CattleComplaint
-from app.services.mailer import send_email
-import asyncio
-from datetime import datetime
+from app.services.mailer import send_email, send_emails
+from app.services.complaint_counters import adjust_counters, read_counters
+from app.services.dispatch import ACTIVE_STATUSES, dispatcher, missing_shelter_violation
+from app.services.photos import abandon_photo, add_photo_reference
+from app.services.image_pipeline import image_pipeline
+from app.services.cache import complaint_cache
+from app.services.complaint_feed import complaint_event, complaint_feed, publish
+from app.core.config import settings
+from datetime import datetime, timezone
 import logging
 import html
+import csv
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import uuid
+import asyncio
+import orjson
 
-router = APIRouter(prefix="/complaints", tags=["complaints"])
-
-@router.post("/cattle", status_code=201)
-async def create_cattle_complaint(
-        reporter_name: str = Form(...),
-        reporter_phone: str = Form(...),
-        reporter_email: str | None = Form(None),
-        reporter_location: str = Form(...),
-        cattle_count: int = Form(...),
-        cattle_type: str = Form(...),
-        cattle_condition: str = Form(...),
-        description: str | None = Form(None),
-        spotted_date: str | None = Form(None),
-        exact_location: str = Form(...),
-        gps_latitude: float | None = Form(None),
-        gps_longitude: float | None = Form(None),
-        nearest_landmark: str | None = Form(None),
-        photo: UploadFile | None = File(None),
-        db: AsyncSession = Depends(get_db)
-):
-        # handle photo
-        photo_path = None
-        if photo is not None:
-                if not allowed_file(photo.filename):
-                        raise HTTPException(status_code=400, detail="Invalid file type")
-                photo_path = await save_upload_file(photo)
-
-        if spotted_date:
-                try:
-                    
-                        spotted = datetime.fromisoformat(spotted_date.replace("Z", "+00:00"))
-                except Exception:
-                        raise HTTPException(status_code=400, detail="Invalid spotted_date format")
-        else:
-                spotted = datetime.utcnow()
-
-        new = CattleComplaint(
-                reporter_name=reporter_name,
-                reporter_phone=reporter_phone,
-                reporter_email=reporter_email,
-                reporter_location=reporter_location,
-                cattle_count=cattle_count,
-                cattle_type=cattle_type,
-                cattle_condition=cattle_condition,
-                description=description,
-                photo_path=photo_path,
-                spotted_date=spotted,
-                exact_location=exact_location,
-                gps_latitude=gps_latitude,
-                gps_longitude=gps_longitude,
-                nearest_landmark=nearest_landmark
-        )
+router = APIRouter(prefix="/complaints", tags=["complaints"], default_response_class=ORJSONResponse)
 
-        
-        db.add(new)
-        await db.flush()
-        await db.commit()
-        await db.refresh(new)
+COMPLAINT_EMAIL_SUBJECT = "LifeTag – Cattle Complaint Registered Successfully"
 
-        # send email async (fire-and-forget). Use the created instance `new` and escape user input.
-        try:
-                if new.reporter_email:
-                        # escape user-provided fields to avoid HTML injection in the email body
-                        safe_name = html.escape(new.reporter_name or "Reporter")
-                        safe_complaint_id = html.escape(str(new.complaint_id))
-                        html_content = f"""
+def _complaint_registered_email(reporter_name: str | None, complaint_id) -> str:
+    # escape user-provided fields to avoid HTML injection in the email body
+    safe_name = html.escape(reporter_name or "Reporter")
+    safe_complaint_id = html.escape(str(complaint_id))
+    return f"""
 <!DOCTYPE html>
 <html>
     <body style="font-family: Arial, sans-serif; background-color: #f4f7fa; padding: 20px;">
@@ -122,98 +84,824 @@ async def create_cattle_complaint(
 </html>
 """
 
-                        asyncio.create_task(send_email(
-                                "LifeTag – Cattle Complaint Registered Successfully",
+@router.post("/cattle", status_code=201)
+async def create_cattle_complaint(
+        reporter_name: str = Form(...),
+        reporter_phone: str = Form(...),
+        reporter_email: str | None = Form(None),
+        reporter_location: str = Form(...),
+        cattle_count: int = Form(...),
+        cattle_type: str = Form(...),
+        cattle_condition: str = Form(...),
+        description: str | None = Form(None),
+        spotted_date: str | None = Form(None),
+        exact_location: str = Form(...),
+        gps_latitude: float | None = Form(None),
+        gps_longitude: float | None = Form(None),
+        nearest_landmark: str | None = Form(None),
+        photo: UploadFile | None = File(None),
+        db: AsyncSession = Depends(get_db)
+):
+        if spotted_date:
+                try:
+                    
+                        spotted = datetime.fromisoformat(spotted_date.replace("Z", "+00:00"))
+                except Exception:
+                        raise HTTPException(status_code=400, detail="Invalid spotted_date format")
+        else:
+                spotted = datetime.utcnow()
+
+        # handle photo: staged here, moved into place by add_photo_reference
+        stored_photo = None
+        if photo is not None:
+                if not allowed_file(photo.filename):
+                        raise HTTPException(status_code=400, detail="Invalid file type")
+                stored_photo = await store_upload_file(photo)
+
+        fields = dict(
+                reporter_name=reporter_name,
+                reporter_phone=reporter_phone,
+                reporter_email=reporter_email,
+                reporter_location=reporter_location,
+                cattle_count=cattle_count,
+                cattle_type=cattle_type,
+                cattle_condition=cattle_condition,
+                description=description,
+                photo_path=stored_photo.path if stored_photo else None,
+                photo_sha256=stored_photo.sha256 if stored_photo else None,
+                spotted_date=spotted,
+                exact_location=exact_location,
+                gps_latitude=gps_latitude,
+                gps_longitude=gps_longitude,
+                nearest_landmark=nearest_landmark,
+                geo_cell=encode_cell(gps_latitude, gps_longitude) if valid_coordinates(gps_latitude, gps_longitude) else None
+        )
+
+        # a second attempt only follows a shelter deleted since this worker's last dispatch refresh
+        for attempt in range(2):
+                new = CattleComplaint(**fields)
+                assignment = dispatcher.assign(gps_latitude, gps_longitude)
+                if assignment is not None:
+                        new.assigned_shelter_id = assignment[0]
+                        new.assigned_at = datetime.utcnow()
+
+                try:
+                        db.add(new)
+                        await db.flush()
+                        await adjust_counters(db, {new.complaint_status: 1})
+                        await publish(db, [complaint_event("created", new.complaint_id, new.complaint_status,
+                                                           gps_latitude, gps_longitude, new.assigned_shelter_id)])
+                        if stored_photo is not None:
+                                stored_photo = await add_photo_reference(db, stored_photo)
+                        await db.commit()
+                except Exception as e:
+                        dispatcher.release(new.assigned_shelter_id)
+                        if attempt == 0 and missing_shelter_violation(e):
+                                await db.rollback()
+                                dispatcher.remove_shelter(new.assigned_shelter_id)
+                                continue
+                        if stored_photo is not None:
+                                await db.rollback()
+                                await abandon_photo(stored_photo)
+                        raise
+                break
+        await db.refresh(new)
+        if stored_photo is not None:
+                image_pipeline.submit(new.complaint_id, stored_photo.path)
+
+        # queue the notification email (spooled, delivered in the background). Use the created instance `new` and escape user input.
+        try:
+                if new.reporter_email:
+                        await send_email(
+                                COMPLAINT_EMAIL_SUBJECT,
                                 new.reporter_email,
-                                html_content,
+                                _complaint_registered_email(new.reporter_name, new.complaint_id),
                                 True
-                        ))
+                        )
 
         except Exception:
-                logging.exception("Failed to schedule/send complaint notification email")
+                logging.exception("Failed to queue complaint notification email")
 
         return {
                 "message": "Cattle complaint registered successfully",
                 "complaint_id": str(new.complaint_id),
-                "status": "Open"
+                "status": "Open",
+                "assigned_shelter_id": str(new.assigned_shelter_id) if new.assigned_shelter_id else None
         }
 
 
+# postgres caps a statement at 32767 bind parameters
+_MAX_BIND_PARAMS = 32767
+
+def _length_errors(values: dict) -> list[dict]:
+    """Check string values against the column lengths so one bad row cannot fail the whole insert."""
+    errors = []
+    for col in CattleComplaint.__table__.columns:
+        v = values.get(col.key)
+        limit = getattr(col.type, "length", None)
+        if isinstance(v, str) and limit and len(v) > limit:
+            errors.append({"loc": col.key, "msg": f"String should have at most {limit} characters"})
+    return errors
+
+def _parse_bulk_body(raw: bytes, content_type: str) -> list:
+    if "ndjson" in content_type:
+        return [json.loads(line) for line in raw.splitlines() if line.strip()]
+    records = json.loads(raw)
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of complaints")
+    return records
+
+async def _reassign_deleted_shelters(db: AsyncSession, rows: list[dict]) -> None:
+    """Drop shelters that no longer exist from the dispatcher and reassign their rows."""
+    from sqlalchemy import select
+    from app.models.user import Shelter
+
+    assigned = {r["assigned_shelter_id"] for r in rows if r["assigned_shelter_id"] is not None}
+    existing = set((await db.scalars(select(Shelter.sid).where(Shelter.sid.in_(assigned)))).all())
+    gone = assigned - existing
+    for sid in gone:
+        dispatcher.remove_shelter(sid)
+    for r in rows:
+        if r["assigned_shelter_id"] in gone:
+            assignment = dispatcher.assign(r["gps_latitude"], r["gps_longitude"])
+            r["assigned_shelter_id"] = assignment[0] if assignment is not None else None
+            r["assigned_at"] = r["created_at"] if assignment is not None else None
+
+@router.post("/cattle/batch")
+async def create_cattle_complaints_batch(request: Request, db: AsyncSession = Depends(get_db)):
+    """Ingest many complaints (JSON array or NDJSON) with multi-row INSERTs in one transaction."""
+    from sqlalchemy import insert
+    from pydantic import ValidationError
+
+    limit = settings.BULK_COMPLAINT_MAX_BODY_BYTES
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Batches are limited to {limit} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=f"Batches are limited to {limit} bytes")
+    try:
+        records = _parse_bulk_body(bytes(body), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request body: {e}")
+    if len(records) > settings.BULK_COMPLAINT_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_COMPLAINT_MAX_RECORDS} complaints per batch")
+
+    now = datetime.utcnow()
+    results: list[dict] = []
+    rows: list[dict] = []
+    for i, raw in enumerate(records):
+        try:
+            item = CattleComplaintCreate.model_validate(raw)
+        except ValidationError as e:
+            results.append({"index": i, "status": "invalid", "errors": [
+                {"loc": ".".join(str(p) for p in err["loc"]), "msg": err["msg"]} for err in e.errors()
+            ]})
+            continue
+        values = item.model_dump()
+        errors = _length_errors(values)
+        if errors:
+            results.append({"index": i, "status": "invalid", "errors": errors})
+            continue
+
+        lat, lon = item.gps_latitude, item.gps_longitude
+        spotted = values["spotted_date"] or now
+        values.update(
+            complaint_id=uuid.uuid4(),
+            spotted_date=spotted.astimezone(timezone.utc).replace(tzinfo=None) if spotted.tzinfo else spotted,
+            complaint_status="Open",
+            photo_path=None,
+            geo_cell=encode_cell(lat, lon) if valid_coordinates(lat, lon) else None,
+            assigned_shelter_id=None,
+            assigned_at=None,
+            created_at=now,
+            updated_at=now,
+        )
+        assignment = dispatcher.assign(lat, lon)
+        if assignment is not None:
+            values["assigned_shelter_id"] = assignment[0]
+            values["assigned_at"] = now
+        rows.append(values)
+        results.append({"index": i, "status": "created", "complaint_id": str(values["complaint_id"])})
+
+    if rows:
+        chunk = max(1, _MAX_BIND_PARAMS // len(rows[0]))
+        for attempt in range(2):
+            try:
+                for start in range(0, len(rows), chunk):
+                    await db.execute(insert(CattleComplaint).values(rows[start:start + chunk]))
+                await adjust_counters(db, {"Open": len(rows)})
+                await publish(db, [
+                    complaint_event("created", r["complaint_id"], "Open", r["gps_latitude"], r["gps_longitude"],
+                                    r["assigned_shelter_id"])
+                    for r in rows
+                ])
+                await db.commit()
+            except Exception as e:
+                if attempt == 0 and missing_shelter_violation(e):
+                    await db.rollback()
+                    await _reassign_deleted_shelters(db, rows)
+                    continue
+                for r in rows:
+                    dispatcher.release(r["assigned_shelter_id"])
+                raise
+            break
+
+        mails = [
+            (COMPLAINT_EMAIL_SUBJECT, r["reporter_email"],
+             _complaint_registered_email(r["reporter_name"], r["complaint_id"]), True)
+            for r in rows if r["reporter_email"]
+        ]
+        if mails:
+            try:
+                await send_emails(mails)
+            except Exception:
+                logging.exception("Failed to queue bulk complaint notification emails")
+
+    return {"created": len(rows), "rejected": len(results) - len(rows), "results": results}
+
+
+LIST_COLUMNS = (
+    CattleComplaint.complaint_id,
+    CattleComplaint.reporter_name,
+    CattleComplaint.reporter_phone,
+    CattleComplaint.reporter_email,
+    CattleComplaint.cattle_count,
+    CattleComplaint.cattle_type,
+    CattleComplaint.cattle_condition,
+    CattleComplaint.exact_location,
+    CattleComplaint.spotted_date,
+    CattleComplaint.complaint_status.label("status"),
+    CattleComplaint.created_at,
+    CattleComplaint.photo_path.isnot(None).label("has_photo"),
+)
+
+def _list_item(row) -> dict:
+    item = dict(row._mapping)
+    # the photo endpoint serves the original until the thumbnail exists
+    item["photo_url"] = f"/api/complaints/cattle/{row.complaint_id}/photo?variant=thumb" if row.has_photo else None
+    return item
+
 @router.get("/cattle")
-async def list_cattle_complaints(status: str | None = None, page: int = 1, per_page: int = 10, db: AsyncSession = Depends(get_db)):
-    from sqlalchemy import select, func as sql_func
-    query = select(CattleComplaint)
+async def list_cattle_complaints(status: str | None = None, page: int = 1, per_page: int = 10, cursor: str | None = None, db: AsyncSession = Depends(get_db)):
+    """List complaints newest first.
+
+    Without ``cursor`` this pages with OFFSET as before. Passing the
+    ``next_cursor`` from a previous response switches to keyset paging on
+    (created_at, complaint_id), which costs the same at any depth.
+    """
+    from sqlalchemy import select, tuple_
+    import uuid
+    # plain row tuples: no ORM identity map, and description/photo columns stay in the DB
+    query = select(*LIST_COLUMNS)
     if status:
         query = query.where(CattleComplaint.complaint_status == status)
-    
-    total_query = select(sql_func.count()).select_from(CattleComplaint)
-    if status:
-        total_query = total_query.where(CattleComplaint.complaint_status == status)
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
-    
-    query = query.order_by(CattleComplaint.created_at.desc()).offset((page-1)*per_page).limit(per_page)
+
+    if cursor is not None:
+        try:
+            after_created, after_id = decode_cursor(cursor)
+            after_created = datetime.fromisoformat(after_created)
+            after_id = uuid.UUID(after_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(CattleComplaint.created_at, CattleComplaint.complaint_id) < tuple_(after_created, after_id)
+        )
+    else:
+        query = query.offset((page-1)*per_page)
+
+    counts = await read_counters(db)
+    total = counts.get(status, 0) if status else sum(counts.values())
+
+    query = query.order_by(CattleComplaint.created_at.desc(), CattleComplaint.complaint_id.desc()).limit(per_page)
     result = await db.execute(query)
-    items = result.scalars().all()
-    res = []
-    for c in items:
-        res.append({
-            "complaint_id": str(c.complaint_id),
-            "reporter_name": c.reporter_name,
-            "reporter_phone": c.reporter_phone,
-            "reporter_email": c.reporter_email,
-            "cattle_count": c.cattle_count,
-            "cattle_type": c.cattle_type,
-            "cattle_condition": c.cattle_condition,
-            "exact_location": c.exact_location,
-            "spotted_date": c.spotted_date.isoformat(),
-            "status": c.complaint_status,
-            "created_at": c.created_at.isoformat(),
-            "has_photo": bool(c.photo_path)
-        })
-    return {"complaints": res, "total": total, "page": page}
+    rows = result.all()
+    next_cursor = None
+    if len(rows) == per_page:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].complaint_id)
+    # orjson encodes UUIDs and datetimes natively; returning the response
+    # directly also skips FastAPI's jsonable_encoder pass.
+    return ORJSONResponse({
+        "complaints": [_list_item(r) for r in rows],
+        "total": total,
+        "page": page if cursor is None else None,
+        "next_cursor": next_cursor,
+    })
+
+@router.get("/cattle/stats")
+async def cattle_complaint_stats(db: AsyncSession = Depends(get_db)):
+    counts = await read_counters(db)
+    return {"total": sum(counts.values()), "by_status": counts}
+
+SEARCH_COLUMNS = (*LIST_COLUMNS, CattleComplaint.nearest_landmark, CattleComplaint.reporter_location)
+
+@router.get("/cattle/search")
+async def search_cattle_complaints(
+        q: str = Query(..., min_length=1, max_length=200),
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        sort: str = Query("rank", pattern="^(rank|newest)$"),
+        per_page: int = Query(20, ge=1, le=100),
+        cursor: str | None = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over location, landmark, description and reporter location.
+
+    ``q`` takes web-search syntax ("quoted phrases", -exclusions, or). Matching
+    uses the GIN index on the generated ``search_vector`` column. Results are
+    ordered by relevance (``sort=rank``) or newest first, and page with the
+    ``next_cursor`` keyset token like the list endpoint.
+    """
+    from sqlalchemy import Float, func, literal, literal_column, select, tuple_
+    from app.models.complaint import SEARCH_CONFIG
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    rank = func.ts_rank(CattleComplaint.search_vector, tsquery, type_=Float)
+
+    query = select(*SEARCH_COLUMNS, rank.label("rank")).where(CattleComplaint.search_vector.op("@@")(tsquery))
+    if status:
+        query = query.where(CattleComplaint.complaint_status == status)
+    if created_from:
+        query = query.where(CattleComplaint.created_at >= created_from)
+    if created_to:
+        query = query.where(CattleComplaint.created_at < created_to)
+
+    keyset = [CattleComplaint.created_at, CattleComplaint.complaint_id]
+    if sort == "rank":
+        keyset.insert(0, rank)
+    if cursor is not None:
+        try:
+            values = decode_cursor(cursor)
+            if len(values) != len(keyset):
+                raise ValueError("Cursor does not match sort order")
+            after = [datetime.fromisoformat(values[-2]), uuid.UUID(values[-1])]
+            if sort == "rank":
+                after.insert(0, literal(float(values[0]), Float))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(*keyset) < tuple_(*after))
+
+    query = query.order_by(*(c.desc() for c in keyset)).limit(per_page)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) == per_page:
+        last = rows[-1]
+        values = (last.created_at, last.complaint_id)
+        next_cursor = encode_cursor(*((last.rank,) + values if sort == "rank" else values))
+    return ORJSONResponse({
+        "complaints": [_list_item(r) for r in rows],
+        "next_cursor": next_cursor,
+    })
+
+async def _feed_stream(statuses: set[str] | None, box: tuple | None):
+    # subscribe inside the generator so the subscription is dropped by the
+    # generator's own cleanup, however the stream ends
+    sub = complaint_feed.subscribe(statuses, box)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), settings.FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # comment line: keeps proxies from timing out an idle stream
+                yield b": keepalive\n\n"
+                continue
+            # hand over everything already queued in one write
+            frames = [frame]
+            while not sub.queue.empty():
+                frames.append(sub.queue.get_nowait())
+            yield b"".join(frames)
+    finally:
+        complaint_feed.unsubscribe(sub)
+
+@router.get("/cattle/feed")
+async def cattle_complaint_feed(
+        status: list[str] | None = Query(None),
+        min_lat: float | None = Query(None, ge=-90, le=90),
+        min_lon: float | None = Query(None, ge=-180, le=180),
+        max_lat: float | None = Query(None, ge=-90, le=90),
+        max_lon: float | None = Query(None, ge=-180, le=180),
+):
+    """Server-sent events for complaint creation and status changes.
+
+    Events are ``created`` and ``status`` (with ``prev``), filtered by any of
+    ``status`` (repeatable; a change into or out of a listed status counts)
+    and a bounding box. ``resync`` means events were missed and the client
+    should refetch the list.
+    """
+    bounds = (min_lat, min_lon, max_lat, max_lon)
+    box = None
+    if any(b is not None for b in bounds):
+        if any(b is None for b in bounds) or min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(status_code=400, detail="Invalid bounding box")
+        box = bounds
+    if complaint_feed.full():
+        raise HTTPException(status_code=503, detail="Too many feed subscribers, please retry shortly",
+                            headers={"Retry-After": "5"})
+    return StreamingResponse(
+        _feed_stream(set(status) if status else None, box),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# candidates fetched per requested result; they come back roughly nearest
+# first, so this only has to absorb the error of the flat-earth ordering
+_CANDIDATE_FACTOR = 4
+
+async def _complaints_in_box(db: AsyncSession, box: tuple, center: tuple, status: str | None,
+                             radius_km: float | None, limit: int) -> list[dict]:
+    from sqlalchemy import select, and_, or_, func
+    import math
+    parts = split_box(*box)
+    cells = or_(*(and_(CattleComplaint.geo_cell >= lo, CattleComplaint.geo_cell < hi)
+                  for part in parts for lo, hi in cover_ranges(*part)))
+    inside = or_(*(and_(CattleComplaint.gps_latitude.between(min_lat, max_lat),
+                        CattleComplaint.gps_longitude.between(min_lon, max_lon))
+                   for min_lat, min_lon, max_lat, max_lon in parts))
+    # equirectangular distance, wrapping longitude across the antimeridian
+    dlon = func.abs(CattleComplaint.gps_longitude - center[1])
+    approx_distance = (func.power(CattleComplaint.gps_latitude - center[0], 2)
+                       + func.power(func.least(dlon, 360 - dlon) * math.cos(math.radians(center[0])), 2))
+    query = select(
+        CattleComplaint.complaint_id,
+        CattleComplaint.gps_latitude,
+        CattleComplaint.gps_longitude,
+        CattleComplaint.cattle_count,
+        CattleComplaint.cattle_type,
+        CattleComplaint.cattle_condition,
+        CattleComplaint.exact_location,
+        CattleComplaint.complaint_status,
+        CattleComplaint.created_at,
+    ).where(cells, inside)
+    if status:
+        query = query.where(CattleComplaint.complaint_status == status)
+    query = query.order_by(approx_distance).limit(limit * _CANDIDATE_FACTOR)
+    rows = (await db.execute(query)).all()
+
+    ranked = []
+    for r in rows:
+        d = haversine_km(center[0], center[1], r.gps_latitude, r.gps_longitude)
+        if radius_km is None or d <= radius_km:
+            ranked.append((d, r))
+    ranked.sort(key=lambda x: x[0])
+    return [{
+        "complaint_id": str(r.complaint_id),
+        "gps_latitude": r.gps_latitude,
+        "gps_longitude": r.gps_longitude,
+        "distance_km": round(d, 3),
+        "cattle_count": r.cattle_count,
+        "cattle_type": r.cattle_type,
+        "cattle_condition": r.cattle_condition,
+        "exact_location": r.exact_location,
+        "status": r.complaint_status,
+        "created_at": r.created_at.isoformat(),
+    } for d, r in ranked[:limit]]
+
+@router.get("/cattle/nearby")
+async def nearby_cattle_complaints(
+        lat: float = Query(..., ge=-90, le=90),
+        lon: float = Query(..., ge=-180, le=180),
+        radius_km: float = Query(10.0, gt=0, le=200),
+        status: str | None = None,
+        limit: int = Query(50, ge=1, le=500),
+        db: AsyncSession = Depends(get_db)
+):
+    box = bounding_box(lat, lon, radius_km)
+    items = await _complaints_in_box(db, box, (lat, lon), status, radius_km, limit)
+    return {"complaints": items, "count": len(items)}
+
+@router.get("/cattle/within")
+async def cattle_complaints_within(
+        min_lat: float = Query(..., ge=-90, le=90),
+        min_lon: float = Query(..., ge=-180, le=180),
+        max_lat: float = Query(..., ge=-90, le=90),
+        max_lon: float = Query(..., ge=-180, le=180),
+        status: str | None = None,
+        limit: int = Query(100, ge=1, le=500),
+        db: AsyncSession = Depends(get_db)
+):
+    # min_lon > max_lon is a box that crosses the antimeridian
+    if min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    center_lon = (min_lon + max_lon) / 2 if min_lon <= max_lon else (min_lon + max_lon + 360) / 2
+    if center_lon > 180:
+        center_lon -= 360
+    center = ((min_lat + max_lat) / 2, center_lon)
+    items = await _complaints_in_box(db, (min_lat, min_lon, max_lat, max_lon), center, status, None, limit)
+    return {"complaints": items, "count": len(items)}
+
+EXPORT_COLUMNS = (
+    "complaint_id", "reporter_name", "reporter_phone", "reporter_email", "reporter_location",
+    "cattle_count", "cattle_type", "cattle_condition", "description", "photo_path",
+    "spotted_date", "exact_location", "gps_latitude", "gps_longitude", "nearest_landmark",
+    "complaint_status", "assigned_shelter_id", "assigned_at", "created_at", "updated_at",
+)
+
+def _export_value(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    return v
+
+async def _export_rows(query, fmt: str):
+    # The request-scoped session from get_db is closed before a
+    # StreamingResponse body runs, so the export owns its session.
+    from app.db.session import AsyncSessionLocal
+    batch_size = settings.EXPORT_BATCH_SIZE
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buf.getvalue()
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            if fmt == "csv":
+                buf.seek(0)
+                buf.truncate()
+                writer.writerows([_export_value(v) for v in row] for row in rows)
+                yield buf.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row))), ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+
+@router.get("/cattle/export")
+async def export_cattle_complaints(
+        format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+        status: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        current: CurrentUser = Depends(get_current_shelter),
+):
+    """Stream the calling shelter's assigned complaints as NDJSON or CSV via a server-side cursor."""
+    from sqlalchemy import select
+    query = select(*(getattr(CattleComplaint, c) for c in EXPORT_COLUMNS))
+    # exports carry reporter contact details; a shelter only gets its own cases
+    query = query.where(CattleComplaint.assigned_shelter_id == current.user_id)
+    if status:
+        query = query.where(CattleComplaint.complaint_status == status)
+    if created_from:
+        query = query.where(CattleComplaint.created_at >= created_from)
+    if created_to:
+        query = query.where(CattleComplaint.created_at < created_to)
+    query = query.order_by(CattleComplaint.created_at, CattleComplaint.complaint_id)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cattle_complaints.{format}"'},
+    )
+
+DETAIL_COLUMNS = (
+    CattleComplaint.complaint_id,
+    CattleComplaint.reporter_name,
+    CattleComplaint.reporter_phone,
+    CattleComplaint.reporter_email,
+    CattleComplaint.reporter_location,
+    CattleComplaint.cattle_count,
+    CattleComplaint.cattle_type,
+    CattleComplaint.cattle_condition,
+    CattleComplaint.description,
+    CattleComplaint.photo_path,
+    CattleComplaint.photo_web_path,
+    CattleComplaint.photo_thumb_path,
+    CattleComplaint.spotted_date,
+    CattleComplaint.exact_location,
+    CattleComplaint.gps_latitude,
+    CattleComplaint.gps_longitude,
+    CattleComplaint.nearest_landmark,
+    CattleComplaint.complaint_status.label("status"),
+    CattleComplaint.assigned_shelter_id,
+    CattleComplaint.assigned_at,
+    CattleComplaint.created_at,
+    CattleComplaint.updated_at,
+)
 
 @router.get("/cattle/{complaint_id}")
-async def get_cattle_complaint(complaint_id: str, db: AsyncSession = Depends(get_db)):
+async def get_cattle_complaint(complaint_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     from sqlalchemy import select
     import uuid
     try:
         complaint_uuid = uuid.UUID(complaint_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid complaint ID format")
-    
-    query = select(CattleComplaint).where(CattleComplaint.complaint_id == complaint_uuid)
-    result = await db.execute(query)
-    c = result.scalar_one_or_none()
-    if not c:
+
+    async def load():
+        query = select(*DETAIL_COLUMNS).where(CattleComplaint.complaint_id == complaint_uuid)
+        result = await db.execute(query)
+        row = result.one_or_none()
+        if not row:
+            return None
+        item = dict(row._mapping)
+        item["photo_url"] = f"/api/complaints/cattle/{row.complaint_id}/photo" if row.photo_path else None
+        body = orjson.dumps(item)
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body
+
+    # the session only checks out a connection on first execute, so hits never touch the pool
+    entry = await complaint_cache.get_or_load(str(complaint_uuid), load)
+    if entry is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
-    return {
-        "complaint_id": str(c.complaint_id),
-        "reporter_name": c.reporter_name,
-        "reporter_phone": c.reporter_phone,
-        "reporter_email": c.reporter_email,
-        "reporter_location": c.reporter_location,
-        "cattle_count": c.cattle_count,
-        "cattle_type": c.cattle_type,
-        "cattle_condition": c.cattle_condition,
-        "description": c.description,
-        "photo_path": c.photo_path,
-        "spotted_date": c.spotted_date.isoformat(),
-        "exact_location": c.exact_location,
-        "gps_latitude": c.gps_latitude,
-        "gps_longitude": c.gps_longitude,
-        "nearest_landmark": c.nearest_landmark,
-        "status": c.complaint_status,
-        "created_at": c.created_at.isoformat(),
-        "updated_at": c.updated_at.isoformat()
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    # weak comparison, as RFC 9110 requires for If-None-Match
+    return any(t.removeprefix("W/") == etag for t in candidates)
+
+@router.get("/cattle/{complaint_id}/photo")
+async def get_cattle_complaint_photo(
+        complaint_id: str,
+        request: Request,
+        variant: str = Query("original", pattern="^(original|web|thumb)$"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Serve a complaint photo with strong ETags, conditional GET and Range support."""
+    from sqlalchemy import select
+    try:
+        complaint_uuid = uuid.UUID(complaint_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid complaint ID format")
+
+    result = await db.execute(
+        select(
+            CattleComplaint.photo_path,
+            CattleComplaint.photo_sha256,
+            CattleComplaint.photo_web_path,
+            CattleComplaint.photo_thumb_path,
+        ).where(CattleComplaint.complaint_id == complaint_uuid)
+    )
+    row = result.one_or_none()
+    if row is None or not row.photo_path:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    # derivatives may still be processing; fall back to the original until they exist
+    path, served = row.photo_path, "original"
+    if variant == "web" and row.photo_web_path:
+        path, served = row.photo_web_path, "web"
+    elif variant == "thumb" and row.photo_thumb_path:
+        path, served = row.photo_thumb_path, "thumb"
+
+    try:
+        st = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    if row.photo_sha256:
+        etag = f'"{row.photo_sha256}-{served}"'
+    else:
+        # legacy uploads are never rewritten, so size+mtime identifies the bytes
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    # a fallback original stands in for a derivative that is still being
+    # made; have caches revalidate so they pick the derivative up once it exists
+    cache_control = f"public, max-age={settings.PHOTO_CACHE_MAX_AGE}" if served == variant else "no-cache"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
     }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if served != "original":
+        media_type = "image/webp"
+    else:
+        # content-addressed files have no extension; sniff those
+        media_type = mimetypes.guess_type(path)[0] or await asyncio.to_thread(image_media_type, path)
+    # FileResponse answers Range/If-Range itself and uses the server's
+    # pathsend/sendfile extension when it offers one.
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+# status -> statuses it may move to
+# allowed moves, shared by the single and batch status endpoints; setting a
+# complaint to the status it already has is always accepted as a no-op
+STATUS_TRANSITIONS = {
+    "Open": ("In Progress", "Resolved", "Closed"),
+    "In Progress": ("Open", "Resolved", "Closed"),
+    "Resolved": ("In Progress", "Closed"),
+    "Closed": ("Open",),
+}
+
+@router.put("/cattle/batch/status")
+async def update_complaint_statuses(payload: ComplaintStatusBatchUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Move many complaints to one status with a single UPDATE ... RETURNING.
+
+    Each id gets an outcome: updated, unchanged, invalid_transition,
+    not_found or invalid_id. Counters, dispatch capacity and the detail
+    cache are adjusted once for the whole batch.
+    """
+    from sqlalchemy import select, update
+
+    new_status = payload.status
+    if new_status not in STATUS_TRANSITIONS:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    if len(payload.complaint_ids) > settings.BULK_STATUS_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_STATUS_MAX_IDS} complaints per request")
+
+    outcomes: dict[str, dict] = {}
+    ids: list[uuid.UUID] = []
+    for raw in payload.complaint_ids:
+        try:
+            cid = uuid.UUID(raw)
+        except ValueError:
+            outcomes[raw] = {"complaint_id": raw, "outcome": "invalid_id"}
+            continue
+        if str(cid) not in outcomes:
+            outcomes[str(cid)] = None
+            ids.append(cid)
+
+    rows = []
+    if ids:
+        sources = [old for old, targets in STATUS_TRANSITIONS.items() if new_status in targets]
+        # lock the eligible rows (in id order, so overlapping batches cannot deadlock)
+        # and remember their old status; the UPDATE joins against it
+        target = (
+            select(CattleComplaint.complaint_id, CattleComplaint.complaint_status.label("old_status"))
+            .where(CattleComplaint.complaint_id.in_(ids), CattleComplaint.complaint_status.in_(sources))
+            .order_by(CattleComplaint.complaint_id)
+            .with_for_update()
+            .cte("target")
+        )
+        stmt = (
+            update(CattleComplaint)
+            .where(CattleComplaint.complaint_id == target.c.complaint_id)
+            .values(complaint_status=new_status, updated_at=datetime.utcnow())
+            .returning(CattleComplaint.complaint_id, target.c.old_status, CattleComplaint.assigned_shelter_id,
+                       CattleComplaint.gps_latitude, CattleComplaint.gps_longitude)
+        )
+        rows = (await db.execute(stmt, execution_options={"synchronize_session": False})).all()
+
+        deltas: dict[str, int] = {}
+        for row in rows:
+            deltas[row.old_status] = deltas.get(row.old_status, 0) - 1
+        deltas[new_status] = len(rows)
+        await adjust_counters(db, deltas)
+        await publish(db, [
+            complaint_event("status", row.complaint_id, new_status, row.gps_latitude, row.gps_longitude,
+                            row.assigned_shelter_id, row.old_status)
+            for row in rows
+        ])
+        await db.commit()
+
+        for complaint_id, old_status, *_ in rows:
+            outcomes[str(complaint_id)] = {
+                "complaint_id": str(complaint_id), "outcome": "updated", "previous_status": old_status}
+
+        skipped = [cid for cid in ids if outcomes[str(cid)] is None]
+        if skipped:
+            current = dict((await db.execute(
+                select(CattleComplaint.complaint_id, CattleComplaint.complaint_status)
+                .where(CattleComplaint.complaint_id.in_(skipped))
+            )).all())
+            for cid in skipped:
+                status = current.get(cid)
+                if status is None:
+                    outcome = {"outcome": "not_found"}
+                elif status == new_status:
+                    outcome = {"outcome": "unchanged", "previous_status": status}
+                else:
+                    outcome = {"outcome": "invalid_transition", "previous_status": status}
+                outcomes[str(cid)] = {"complaint_id": str(cid), **outcome}
+
+    # downstream effects, once per batch
+    for _, old_status, shelter_id, *_ in rows:
+        was_active, is_active = old_status in ACTIVE_STATUSES, new_status in ACTIVE_STATUSES
+        if was_active and not is_active:
+            dispatcher.release(shelter_id)
+        elif is_active and not was_active:
+            dispatcher.reserve(shelter_id)
+    await complaint_cache.invalidate(*(str(row.complaint_id) for row in rows))
+
+    return {"status": new_status, "updated": len(rows), "results": list(outcomes.values())}
+
 
 @router.put("/cattle/{complaint_id}/status")
 async def update_complaint_status(complaint_id: str, new_status: str, db: AsyncSession = Depends(get_db)):
+    """Move one complaint to ``new_status``.
+
+    Only moves listed in STATUS_TRANSITIONS are accepted, as on the batch
+    endpoint; any other move (e.g. Closed to Resolved, which used to
+    succeed) is refused with 409 and the complaint is left unchanged. An
+    unknown status is 400.
+    """
     from sqlalchemy import select
     import uuid
     
-    if new_status not in ['Open','In Progress','Resolved','Closed']:
+    if new_status not in STATUS_TRANSITIONS:
         raise HTTPException(status_code=400, detail="Invalid status")
     
     try:
@@ -221,12 +909,25 @@ async def update_complaint_status(complaint_id: str, new_status: str, db: AsyncS
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid complaint ID format")
     
-    query = select(CattleComplaint).where(CattleComplaint.complaint_id == complaint_uuid)
+    query = select(CattleComplaint).where(CattleComplaint.complaint_id == complaint_uuid).with_for_update()
     result = await db.execute(query)
     c = result.scalar_one_or_none()
     if not c:
         raise HTTPException(status_code=404, detail="Complaint not found")
+    old_status = c.complaint_status
+    if old_status != new_status and new_status not in STATUS_TRANSITIONS.get(old_status, ()):
+        raise HTTPException(status_code=409, detail=f"A complaint cannot move from {old_status} to {new_status}")
+    if old_status != new_status:
+        await adjust_counters(db, {old_status: -1, new_status: 1})
+        await publish(db, [complaint_event("status", c.complaint_id, new_status, c.gps_latitude, c.gps_longitude,
+                                           c.assigned_shelter_id, old_status)])
     c.complaint_status = new_status
     c.updated_at = datetime.utcnow()
     await db.commit()
+    await complaint_cache.invalidate(str(complaint_uuid))
+    was_active, is_active = old_status in ACTIVE_STATUSES, new_status in ACTIVE_STATUSES
+    if was_active and not is_active:
+        dispatcher.release(c.assigned_shelter_id)
+    elif is_active and not was_active:
+        dispatcher.reserve(c.assigned_shelter_id)
     return {"message":"Complaint status updated successfully","complaint_id": str(complaint_id),"new_status": new_status}
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+from app.services.telemetry import (
+    TelemetryBufferFull, parse_json_array, parse_msgpack, parse_ndjson, telemetry_buffer,
+)
+import asyncio
+import hmac
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"], default_response_class=ORJSONResponse)
+
+# bodies above this are parsed in a thread so one large batch cannot stall the event loop
+_INLINE_PARSE_BYTES = 64 * 1024
+
+_PARSERS = {
+    "application/x-ndjson": parse_ndjson,
+    "application/json": parse_json_array,
+    "application/msgpack": parse_msgpack,
+    "application/x-msgpack": parse_msgpack,
+}
+
+
+@router.post("/readings", status_code=202)
+async def ingest_readings(request: Request, x_telemetry_token: str | None = Header(None)):
+    """
+    Accept a batch of sensor readings as NDJSON, a JSON array, or msgpack.
+
+    Readings are buffered and written in bulk shortly after; 202 means the
+    batch was accepted, not that it is on disk yet. Invalid readings are
+    reported by index and do not affect the rest of the batch.
+    """
+    if not settings.TELEMETRY_INGEST_TOKEN or not hmac.compare_digest(
+            x_telemetry_token or "", settings.TELEMETRY_INGEST_TOKEN):
+        raise HTTPException(403, "Telemetry ingestion is not allowed")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parse = _PARSERS.get(content_type)
+    if parse is None:
+        raise HTTPException(415, "Send application/x-ndjson, application/json or application/msgpack")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.TELEMETRY_MAX_BODY_BYTES:
+        raise HTTPException(413, f"Batches are limited to {settings.TELEMETRY_MAX_BODY_BYTES} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.TELEMETRY_MAX_BODY_BYTES:
+            raise HTTPException(413, f"Batches are limited to {settings.TELEMETRY_MAX_BODY_BYTES} bytes")
+
+    if len(body) > _INLINE_PARSE_BYTES:
+        batch = await asyncio.to_thread(parse, bytes(body))
+    else:
+        batch = parse(bytes(body))
+
+    try:
+        telemetry_buffer.add(batch.rows)
+    except TelemetryBufferFull:
+        raise HTTPException(503, "Telemetry buffer is full, please retry shortly", headers={"Retry-After": "1"})
+    return {"accepted": len(batch.rows), "rejected": batch.rejected, "errors": batch.errors}
@@ -9,8 +9,35 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str = "/api/v1"
     DEBUG: bool = True
     SECRET_KEY: str
+    METRICS_ENABLED: bool = True
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Tokens
+    JWT_ALGORITHM: str = "HS256"
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    CURRENT_USER_CACHE_SECONDS: float = 300
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 15
+
+    # Login Rate Limits
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_IDENTIFIER: int = 5
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_BACKEND: str = "local"  # "local" or "redis"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+
+    # Bulk User Import
+    USER_IMPORT_TOKEN: str | None = None  # import endpoint is disabled unless set
+    USER_IMPORT_BATCH_SIZE: int = 500
+    USER_IMPORT_MAX_ROWS: int = 100000
+
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int | None = None  # defaults to the CPU count
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
     
     DB_USER: str
     DB_PASSWORD: str
@@ -18,6 +45,21 @@ class Settings(BaseSettings):
     DB_PORT: int
     DB_NAME: str
     DATABASE_URL: AnyUrl
+    DB_SSL: bool = True  # verify the server against DB_SSL_CA_FILE (default core/ca.pem)
+    DB_SSL_CA_FILE: str | None = None
+
+    # Database Pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True  # one extra round trip per checkout; recycle alone is cheaper
+    DB_POOL_USE_LIFO: bool = False
+    DB_ECHO: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg statement cache; 0 behind pgbouncer in transaction mode
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy's per-connection prepared statement cache
+    DB_SLOW_QUERY_SECONDS: float = 0.2
+    SERVER_TIMING_HEADER: bool = False  # query count and durations per response; for debugging
 
     # Mail Settings
     MAIL_SERVER: str
@@ -27,6 +69,15 @@ class Settings(BaseSettings):
     MAIL_FROM_NAME: str | None = "LifeTag Support"
     MAIL_USE_SSL: bool = True
     MAIL_USE_TLS: bool = False
+    MAIL_BACKEND: str = "smtp"  # "smtp", or "null" to spool and then drop mail (benchmarks, local runs)
+    MAIL_SPOOL_DIR: str = "mail_spool"
+    MAIL_POOL_SIZE: int = 2  # long-lived SMTP sessions per worker
+    MAIL_BATCH_SIZE: int = 20
+    MAIL_MAX_RETRIES: int = 5
+    MAIL_RETRY_BASE_SECONDS: float = 2.0
+    MAIL_RETRY_MAX_SECONDS: float = 300.0
+    MAIL_CONNECTION_IDLE_SECONDS: float = 60.0
+    MAIL_DRAIN_TIMEOUT_SECONDS: float = 10.0
 
    
     FRONTEND_URL: str = "http://localhost:5173"
@@ -36,6 +87,63 @@ class Settings(BaseSettings):
     UPLOAD_FOLDER: str = "uploads"
     MAX_UPLOAD_SIZE_MB: int = 16
 
+    # Image Pipeline
+    IMAGE_PIPELINE_WORKERS: int = 2  # 0 disables thumbnails/recompression
+    IMAGE_PIPELINE_SWEEP_LIMIT: int = 1000
+    IMAGE_PIPELINE_SWEEP_SECONDS: int = 300
+    IMAGE_PIPELINE_MAX_ATTEMPTS: int = 3
+    IMAGE_PIPELINE_RETRY_SECONDS: int = 600  # a failed photo is not retried sooner than this
+    IMAGE_MAX_DIMENSION: int = 1600
+    IMAGE_WEB_QUALITY: int = 80
+    IMAGE_THUMBNAIL_SIZE: int = 320
+    IMAGE_THUMBNAIL_QUALITY: int = 70
+    PHOTO_CACHE_MAX_AGE: int = 86400
+    PHOTO_GC_INTERVAL_SECONDS: int = 3600
+    PHOTO_GC_GRACE_SECONDS: int = 3600  # unreferenced files are kept this long before removal
+    PHOTO_GC_BATCH_SIZE: int = 500
+
+    # Complaint Counters
+    COMPLAINT_COUNTER_SHARDS: int = 8
+    COMPLAINT_COUNTER_RECONCILE_SECONDS: int = 900
+
+    # Shelter Dispatch
+    DISPATCH_REFRESH_SECONDS: int = 300
+
+    # Complaint Export / Bulk Ingest
+    EXPORT_BATCH_SIZE: int = 1000
+    BULK_COMPLAINT_MAX_RECORDS: int = 1000
+    BULK_COMPLAINT_MAX_BODY_BYTES: int = 4 * 1024 * 1024
+    BULK_STATUS_MAX_IDS: int = 500
+
+    # Complaint Feed
+    FEED_CHANNEL: str = "lifetag_complaints"
+    FEED_QUEUE_SIZE: int = 256  # events buffered per subscriber before it is told to resync
+    FEED_MAX_SUBSCRIBERS: int = 1000  # per worker
+    FEED_HEARTBEAT_SECONDS: float = 15
+    FEED_RECONNECT_MAX_SECONDS: float = 30
+
+    # Telemetry Ingestion
+    TELEMETRY_INGEST_TOKEN: str | None = None  # ingestion endpoint is disabled unless set
+    TELEMETRY_MAX_BODY_BYTES: int = 4 * 1024 * 1024
+    TELEMETRY_FLUSH_ROWS: int = 5000
+    TELEMETRY_FLUSH_SECONDS: float = 1.0
+    TELEMETRY_MAX_BUFFERED_ROWS: int = 200000  # per worker; beyond this ingestion answers 503
+    TELEMETRY_MAX_AGE_DAYS: int = 7  # oldest reading accepted
+    TELEMETRY_MAX_CLOCK_SKEW_SECONDS: int = 300  # how far in the future a reading may be
+    TELEMETRY_PARTITIONS_AHEAD_DAYS: int = 2
+    TELEMETRY_RETENTION_DAYS: int = 90  # 0 keeps every partition
+    TELEMETRY_PARTITION_CHECK_SECONDS: int = 3600
+
+    # Response Cache
+    # "redis" shares entries and invalidations across workers; with "local"
+    # each worker only sees its own invalidations, so run a single worker or
+    # keep CACHE_TTL_SECONDS short
+    CACHE_BACKEND: str = "local"  # "local" or "redis"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL_SECONDS: float = 60
+    CACHE_LOCAL_TTL_SECONDS: float = 5  # local tier TTL when CACHE_BACKEND="redis"
+    CACHE_MAX_ENTRIES: int = 10000
+
    
     model_config = SettingsConfigDict(
         env_file=".env",
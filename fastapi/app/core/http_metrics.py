@@ -0,0 +1,65 @@
+"""
+HTTP request metrics.
+
+``HTTPMetricsMiddleware`` is a plain ASGI middleware: it wraps ``send`` to
+catch the status code and records, per method and route template, a latency
+histogram and a response counter by status. Route templates (e.g.
+``/api/complaints/cattle/{complaint_id}``) keep label cardinality bounded;
+requests that match no route share the ``unmatched`` label. In-flight
+requests are tracked per router, since the route is only known after
+routing.
+"""
+import time
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+http_request_seconds = Histogram(
+    "lifetag_http_request_seconds", "HTTP request latency by route", ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+http_responses = Counter("lifetag_http_responses", "HTTP responses by route and status", ["method", "route", "status"])
+http_requests_in_flight = Gauge("lifetag_http_requests_in_flight", "HTTP requests being handled", ["router"])
+
+# path prefix -> router label for the in-flight gauge
+ROUTER_PREFIXES = (
+    ("/api/auth", "auth"),
+    ("/api/complaints", "complaints"),
+)
+
+
+def _router_for(path: str) -> str:
+    for prefix, name in ROUTER_PREFIXES:
+        if path.startswith(prefix):
+            return name
+    return "other"
+
+
+class HTTPMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = _router_for(scope["path"])
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(router=router)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(router=router)
+            # the router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_seconds.observe(time.perf_counter() - start, method=method, route=template)
+            http_responses.inc(method=method, route=template, status=status)
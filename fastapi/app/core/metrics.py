@@ -0,0 +1,222 @@
+"""
+Lightweight in-process metrics registry.
+
+Counters, gauges and histograms keep their samples in plain dicts keyed by
+label values, so recording a sample is a dict lookup plus an add. Metrics
+register themselves in ``REGISTRY`` when they are created, and
+``render_prometheus`` writes the registry in the Prometheus text format.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> "_Metric | None":
+        return self._metrics.get(name)
+
+    def collect(self) -> List["_Metric"]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if not self.labelnames:
+            return ()
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("_total", self._labels(k), v) for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value lazily at collection time."""
+        self._function = fn
+
+    def value(self, **labels) -> float:
+        if self._function is not None and not labels:
+            return float(self._function())
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        if self._function is not None:
+            return [("", {}, float(self._function()))]
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._labels(k), v) for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # per label key: [bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        buckets = self.buckets
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(buckets) + 2)
+            i = 0
+            for bound in buckets:
+                if value <= bound:
+                    break
+                i += 1
+            state[i] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return sum(state[:-1]) if state else 0.0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        out: List[Sample] = []
+        for key, state in items:
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, state):
+                cumulative += n
+                out.append(("_bucket", {**labels, "le": _format_bound(bound)}, cumulative))
+            cumulative += state[len(self.buckets)]
+            out.append(("_bucket", {**labels, "le": "+Inf"}, cumulative))
+            out.append(("_sum", labels, state[-1]))
+            out.append(("_count", labels, cumulative))
+        return out
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(registry: Registry = REGISTRY) -> str:
+    lines: List[str] = []
+    for metric in sorted(registry.collect(), key=lambda m: m.name):
+        try:
+            samples = metric.samples()
+        except Exception:
+            # a failing gauge callback should not take the whole scrape down
+            logger.exception("Collecting metric %s failed", metric.name)
+            continue
+        doc = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {metric.name} {doc}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in samples:
+            if labels:
+                label_text = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items())
+                lines.append(f"{metric.name}{suffix}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{metric.name}{suffix} {_format_value(value)}")
+    lines.append("")
+    return "\n".join(lines)
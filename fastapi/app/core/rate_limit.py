@@ -0,0 +1,174 @@
+"""
+Login throttling.
+
+Each limit is a token bucket per key (client IP, or role + identifier) held
+in a bounded per-worker dict, so a check is a dict lookup and a little
+arithmetic. With RATE_LIMIT_BACKEND="redis" the limits are enforced across
+workers with a sliding-window counter in Redis instead; if Redis is not
+reachable the worker falls back to its local buckets rather than failing
+logins. A missing ``redis`` package is a configuration error and stops
+startup, since per-worker buckets would multiply the configured limits.
+
+Checks run before any database lookup or password hashing, so a flood of
+guesses against one account or from one address is turned away for the
+price of a dict lookup and never queues behind legitimate bcrypt work.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.schemas.auth import _normalize_aadhaar
+
+logger = logging.getLogger(__name__)
+
+rate_limited = Counter("lifetag_rate_limited", "Requests rejected by a rate limit", ["limit"])
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller is over a limit; ``retry_after`` is in seconds."""
+
+    def __init__(self, limit: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """``rate`` requests per ``per`` seconds, with bursts of up to ``rate``."""
+
+    def __init__(self, name: str, rate: int, per: float, max_keys: int):
+        self.name = name
+        self.rate = rate
+        self.per = per
+        self.max_keys = max_keys
+        self._refill = rate / per
+        # key -> (tokens, last update); least recently used first
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def hit(self, key: str) -> float:
+        """Take a token; returns 0 if allowed, otherwise seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - updated) * self._refill)
+        allowed = tokens >= 1
+        self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / self._refill
+
+    def reset(self, key: str) -> None:
+        self._buckets.pop(key, None)
+
+
+class SlidingWindowLimiter:
+    """Cross-worker limit: weighted count over the current and previous fixed window in Redis."""
+
+    def __init__(self, name: str, rate: int, per: float, backend):
+        self.name = name
+        self.rate = rate
+        self.per = per
+        self._backend = backend
+
+    async def hit(self, key: str) -> float:
+        now = time.time()
+        window = int(now // self.per)
+        elapsed = now / self.per - window
+        base = f"lifetag:rl:{self.name}:{key}"
+        previous, current = await self._backend.incr_window(
+            f"{base}:{window}", self.per * 2, f"{base}:{window - 1}")
+        if previous * (1 - elapsed) + current <= self.rate:
+            return 0.0
+        return (1 - elapsed) * self.per
+
+    async def reset(self, key: str) -> None:
+        window = int(time.time() // self.per)
+        base = f"lifetag:rl:{self.name}:{key}"
+        await self._backend.delete(f"{base}:{window}", f"{base}:{window - 1}")
+
+
+class LoginThrottle:
+    def __init__(self):
+        window = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+        self.by_ip = TokenBucketLimiter(
+            "login_ip", settings.LOGIN_RATE_LIMIT_PER_IP, window, settings.RATE_LIMIT_MAX_KEYS)
+        self.by_identifier = TokenBucketLimiter(
+            "login_identifier", settings.LOGIN_RATE_LIMIT_PER_IDENTIFIER, window, settings.RATE_LIMIT_MAX_KEYS)
+
+    def check_backend(self) -> None:
+        """Called at startup: refuse to run without the backend the settings ask for."""
+        from app.services.cache import redis_available
+
+        if settings.RATE_LIMIT_BACKEND == "redis" and not redis_available():
+            raise RuntimeError('RATE_LIMIT_BACKEND is "redis" but the redis package is not installed')
+
+    def _shared(self, local: TokenBucketLimiter) -> SlidingWindowLimiter | None:
+        if settings.RATE_LIMIT_BACKEND != "redis":
+            return None
+        from app.services.cache import redis_backend
+
+        backend = redis_backend(settings.RATE_LIMIT_REDIS_URL)
+        if backend is None:
+            return None
+        return SlidingWindowLimiter(local.name, local.rate, local.per, backend)
+
+    async def _hit(self, limiter: TokenBucketLimiter, key: str) -> None:
+        shared = self._shared(limiter)
+        wait = None
+        if shared is not None:
+            try:
+                wait = await shared.hit(key)
+            except Exception:
+                logger.exception("Shared rate limit check failed; using local limits")
+        if wait is None:
+            wait = limiter.hit(key)
+        if wait > 0:
+            rate_limited.inc(limit=limiter.name)
+            raise RateLimitExceeded(limiter.name, wait)
+
+    async def check(self, client_ip: str | None, role: str, identifier: str) -> None:
+        """Raise RateLimitExceeded if this login attempt is over either limit."""
+        if client_ip:
+            await self._hit(self.by_ip, client_ip)
+        await self._hit(self.by_identifier, identifier_key(role, identifier))
+
+    async def succeeded(self, role: str, identifier: str) -> None:
+        """A correct password clears the per-identifier budget."""
+        key = identifier_key(role, identifier)
+        self.by_identifier.reset(key)
+        shared = self._shared(self.by_identifier)
+        if shared is not None:
+            try:
+                await shared.reset(key)
+            except Exception:
+                logger.exception("Shared rate limit reset failed")
+
+
+def identifier_key(role: str, identifier: str) -> str:
+    # key on the same normalized value login looks up, so "2345-6789-0123" and
+    # "2345 6789 0123" share one bucket
+    if role == "farmer":
+        try:
+            return f"{role}:{_normalize_aadhaar(identifier)}"
+        except ValueError:
+            pass
+        return f"{role}:{''.join(identifier.split()).lower()}"
+    return f"{role}:{identifier.strip().lower()}"
+
+
+def client_ip(request) -> str | None:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+login_throttle = LoginThrottle()
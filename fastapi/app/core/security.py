@@ -1,7 +1,17 @@
+import asyncio
 import hashlib
 import logging
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from jose import JWTError, jwt
 from passlib.hash import bcrypt_sha256
 
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
 try:
     import bcrypt as _bcrypt
     _HAVE_BCRYPT = True
@@ -16,7 +26,7 @@ _BCRYPT_OK = False
 if _HAVE_BCRYPT:
     try:
         _test_digest = hashlib.sha256(b"test-password").digest()
-        _test_h = _bcrypt.hashpw(_test_digest, _bcrypt.gensalt())
+        _test_h = _bcrypt.hashpw(_test_digest, _bcrypt.gensalt(rounds=4))
         if _bcrypt.checkpw(_test_digest, _test_h):
             _BCRYPT_OK = True
     except Exception:
@@ -37,13 +47,13 @@ def hash_password(password: str) -> str:
     if _BCRYPT_OK:
         try:
             digest = hashlib.sha256(password.encode("utf-8")).digest()
-            hashed = _bcrypt.hashpw(digest, _bcrypt.gensalt())
+            hashed = _bcrypt.hashpw(digest, _bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
             return hashed.decode("utf-8")
         except Exception as e:
             logging.warning(f"bcrypt.hashpw failed, falling back to passlib: {e}")
 
     # Fallback to passlib's bcrypt_sha256 (compatible format)
-    return bcrypt_sha256.hash(password)
+    return bcrypt_sha256.using(rounds=settings.BCRYPT_ROUNDS).hash(password)
 
 
 # -------------------------------------------------------------------
@@ -89,3 +99,167 @@ def verify_password(plain: str, hashed: str) -> bool:
     # Unknown format
     logging.warning("Unrecognized hash format")
     return False
+
+
+# -------------------------------------------------------------------
+# Async variants backed by a bounded worker pool
+# -------------------------------------------------------------------
+class PasswordHashPoolBusy(RuntimeError):
+    """Raised when the hashing queue is full; callers should shed the request."""
+
+
+password_hash_in_flight = Gauge(
+    "lifetag_password_hash_in_flight", "Password hash/verify jobs running in the worker pool")
+password_hash_queued = Gauge(
+    "lifetag_password_hash_queued", "Password hash/verify jobs waiting for a free worker")
+password_hash_rejected = Counter(
+    "lifetag_password_hash_rejected", "Password hash/verify jobs rejected because the queue was full", ["op"])
+password_hash_wait_seconds = Histogram(
+    "lifetag_password_hash_wait_seconds", "Time a password job waited for a worker", ["op"])
+password_hash_run_seconds = Histogram(
+    "lifetag_password_hash_run_seconds", "Time a worker spent hashing or verifying", ["op"])
+
+_executor: Executor | None = None
+_admitted = 0
+
+
+def _pool_workers() -> int:
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = _pool_workers()
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # bcrypt releases the GIL, so threads already scale across cores
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+    return _executor
+
+
+def _timed_call(fn, *args):
+    # Runs inside the worker; CLOCK_MONOTONIC is system-wide on Linux so the
+    # start time is comparable across processes.
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+def _update_gauges() -> None:
+    workers = _pool_workers()
+    password_hash_in_flight.set(min(_admitted, workers))
+    password_hash_queued.set(max(0, _admitted - workers))
+
+
+async def _run_in_pool(op: str, fn, *args):
+    global _admitted
+    if _admitted >= _pool_workers() + settings.PASSWORD_HASH_QUEUE_SIZE:
+        password_hash_rejected.inc(op=op)
+        raise PasswordHashPoolBusy("Password hashing queue is full")
+
+    _admitted += 1
+    _update_gauges()
+    submitted = time.monotonic()
+    try:
+        loop = asyncio.get_running_loop()
+        result, started, finished = await loop.run_in_executor(_get_executor(), _timed_call, fn, *args)
+    finally:
+        _admitted -= 1
+        _update_gauges()
+    password_hash_wait_seconds.observe(max(0.0, started - submitted), op=op)
+    password_hash_run_seconds.observe(finished - started, op=op)
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the worker pool without blocking the event loop."""
+    return await _run_in_pool("hash", hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """Verify a password in the worker pool without blocking the event loop."""
+    return await _run_in_pool("verify", verify_password, plain, hashed)
+
+
+async def hash_passwords_async(passwords: list[str], concurrency: int | None = None) -> list[str]:
+    """
+    Hash many passwords across the worker pool, preserving order.
+
+    At most ``concurrency`` jobs (default: one per worker) are admitted at a
+    time, so a bulk job keeps every core busy without filling the admission
+    queue that interactive signups and logins rely on.
+    """
+    slots = asyncio.Semaphore(concurrency or _pool_workers())
+
+    async def one(password: str) -> str:
+        async with slots:
+            return await hash_password_async(password)
+
+    # let every admitted job finish before surfacing a rejection, so none is left running unobserved
+    results = await asyncio.gather(*(one(p) for p in passwords), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def password_pool_stats() -> dict:
+    workers = _pool_workers()
+    return {
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "workers": workers,
+        "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE,
+        "in_flight": min(_admitted, workers),
+        "queued": max(0, _admitted - workers),
+    }
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+# -------------------------------------------------------------------
+# Access / refresh tokens
+# -------------------------------------------------------------------
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+def create_token(subject, role: str, token_type: str, expires_delta: timedelta) -> tuple[str, dict]:
+    """Sign a token for ``subject``; returns (token, claims)."""
+    now = datetime.now(timezone.utc)
+    claims = {
+        "sub": str(subject),
+        "role": role,
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": int(now.timestamp()),
+        "exp": int((now + expires_delta).timestamp()),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM), claims
+
+
+def create_access_token(subject, role: str) -> tuple[str, dict]:
+    return create_token(subject, role, ACCESS_TOKEN, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(subject, role: str) -> tuple[str, dict]:
+    return create_token(subject, role, REFRESH_TOKEN, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+def decode_token(token: str, token_type: str) -> dict:
+    """
+    Verify signature and expiry and return the claims.
+
+    Raises ``JWTError`` for anything invalid, including a token of the wrong
+    type (a refresh token presented as an access token, or vice versa).
+    """
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    if claims.get("type") != token_type or not claims.get("sub") or not claims.get("jti"):
+        raise JWTError("Wrong token type")
+    return claims
@@ -6,3 +6,6 @@ class Base(DeclarativeBase):
 
 from app.models import user 
 from app.models import complaint  
+from app.models import photo
+from app.models import token
+from app.models import telemetry
@@ -0,0 +1,163 @@
+"""
+Per-request database query instrumentation.
+
+Cursor events on the engine time every statement. The totals for the current
+request accumulate in a ``QueryStats`` held in a context variable, which
+SQLAlchemy's greenlet bridge carries into the sync event handlers.
+``QueryTimingMiddleware`` (plain ASGI, so it adds no task or body buffering)
+installs the stats for each request. With SERVER_TIMING_HEADER on, it
+reports the query count and durations in a ``Server-Timing`` header; the
+header never carries SQL. Statements slower than DB_SLOW_QUERY_SECONDS are
+logged with normalized SQL and the types of their parameters, never the
+values.
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger("app.db.slow_query")
+
+db_query_seconds = Histogram(
+    "lifetag_db_query_seconds", "Database statement latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+db_queries_per_request = Histogram(
+    "lifetag_db_queries_per_request", "Database statements issued per HTTP request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+
+_MAX_SQL_LENGTH = 2000
+_MAX_PARAM_TYPES = 20
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "slowest_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.slowest_seconds = max(self.slowest_seconds, elapsed)
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar("lifetag_query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+# a bind placeholder in any paramstyle, with the ::TYPE cast asyncpg adds
+# (e.g. $1::VARCHAR, $2::TIMESTAMP WITHOUT TIME ZONE, $3::NUMERIC(?, ?))
+_PLACEHOLDER = r"(?:\$\d+|\?|%\(\w+\)s)(?:::\w+(?: \w+)*(?:\([^()]*\))?(?:\[\])*)?"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+# a parenthesized row, allowing one level of nesting for casts like VARCHAR(?)
+_ROW = r"\((?:[^()]|\([^()]*\))*\)"
+_VALUES_ROWS = re.compile(rf"(VALUES\s*{_ROW})(?:\s*,\s*{_ROW})+", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals, IN-lists and multi-row VALUES so similar statements group together."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUES_ROWS.sub(r"\1, ...", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    if len(sql) > _MAX_SQL_LENGTH:
+        sql = sql[:_MAX_SQL_LENGTH] + "..."
+    return sql
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Describe parameters by type and count only."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {parameter_shape(first)}"
+    if isinstance(parameters, dict):
+        items = [f"{k}:{type(v).__name__}" for k, v in list(parameters.items())[:_MAX_PARAM_TYPES]]
+        more = len(parameters) - len(items)
+    elif isinstance(parameters, (list, tuple)):
+        items = [type(v).__name__ for v in parameters[:_MAX_PARAM_TYPES]]
+        more = len(parameters) - len(items)
+    else:
+        return type(parameters).__name__
+    if more > 0:
+        items.append(f"+{more} more")
+    return "(" + ", ".join(items) + ")"
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    # durations only: statement text would show clients the schema
+    value = (f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+             f'app;dur={total_seconds * 1000:.1f}')
+    if stats.count:
+        value += f', db-slowest;dur={stats.slowest_seconds * 1000:.1f}'
+    return value
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("lifetag_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["lifetag_query_start"].pop()
+    db_query_seconds.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(elapsed)
+    if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed * 1000, normalize_sql(statement), parameter_shape(parameters, executemany),
+        )
+
+
+def _handle_error(exception_context):
+    # the statement never reached after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("lifetag_query_start")
+        if starts:
+            starts.pop()
+
+
+def install_query_instrumentation(engine) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryTimingMiddleware:
+    """Collect query stats per HTTP request and expose them as Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_HEADER:
+                value = server_timing(stats, time.perf_counter() - start)
+                message = {**message, "headers": [*message.get("headers", ()),
+                                                  (b"server-timing", value.encode("ascii", "replace"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            db_queries_per_request.observe(stats.count)
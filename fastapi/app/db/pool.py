@@ -0,0 +1,51 @@
+"""
+Connection pool with checkout instrumentation.
+
+``InstrumentedAsyncPool`` times every checkout (the wait for a free
+connection, plus connecting when the pool grows) and counts timeouts. Pool
+occupancy is read straight from the pool at collection time, so the gauges
+cost nothing on the request path.
+"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+db_pool_checkout_seconds = Histogram(
+    "lifetag_db_pool_checkout_seconds", "Time to obtain a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0))
+db_pool_timeouts = Counter("lifetag_db_pool_timeouts", "Checkouts that gave up waiting for a connection")
+db_pool_checked_out = Gauge("lifetag_db_pool_checked_out", "Connections currently checked out")
+db_pool_overflow = Gauge("lifetag_db_pool_overflow", "Connections open beyond pool_size")
+db_pool_idle = Gauge("lifetag_db_pool_idle", "Connections idle in the pool")
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - start)
+
+
+def pool_stats(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+
+
+def register_pool_metrics(pool) -> None:
+    db_pool_checked_out.set_function(pool.checkedout)
+    db_pool_overflow.set_function(lambda: max(0, pool.overflow()))
+    db_pool_idle.set_function(pool.checkedin)
@@ -1,25 +1,39 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncPool, pool_stats, register_pool_metrics
+from app.db.instrumentation import install_query_instrumentation
 import ssl, os
 
 
-CA_CERT_PATH = os.path.join(os.path.dirname(__file__), "../core/ca.pem")
+CA_CERT_PATH = settings.DB_SSL_CA_FILE or os.path.join(os.path.dirname(__file__), "../core/ca.pem")
 
-ssl_context = ssl.create_default_context(cafile=CA_CERT_PATH)
-ssl_context.check_hostname = True
-ssl_context.verify_mode = ssl.CERT_REQUIRED
+connect_args = {
+    "server_settings": {"search_path": "public"},
+    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+}
+if settings.DB_SSL:
+    ssl_context = ssl.create_default_context(cafile=CA_CERT_PATH)
+    ssl_context.check_hostname = True
+    ssl_context.verify_mode = ssl.CERT_REQUIRED
+    connect_args["ssl"] = ssl_context
 
 
 engine = create_async_engine(
     str(settings.DATABASE_URL),
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    connect_args={"ssl": ssl_context,
-                  "server_settings":{"search_path":"public"}
-                  },  
-    
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    connect_args=connect_args,
 )
+register_pool_metrics(engine.pool)
+install_query_instrumentation(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -30,3 +44,7 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def db_pool_stats() -> dict:
+    return pool_stats(engine.pool)
@@ -1,10 +1,28 @@
+import logging
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.core.config import settings
+from app.core.http_metrics import HTTPMetricsMiddleware
+from app.core.metrics import CONTENT_TYPE_LATEST, render_prometheus
+from app.core.security import PasswordHashPoolBusy, shutdown_password_pool
+from app.core.rate_limit import RateLimitExceeded, login_throttle, retry_after_header
+from app.services.mail_queue import mail_queue
+from app.services import complaint_counters
+from app.services.dispatch import dispatcher
+from app.services.image_pipeline import image_pipeline
+from app.services.photos import photo_collector
+from app.services.cache import close_caches
+from app.services.token_revocation import revocation_list
+from app.services.complaint_feed import complaint_feed
+from app.services.telemetry import telemetry_buffer, telemetry_partitions
 from app.db.session import engine
+from app.db.instrumentation import QueryTimingMiddleware
 from app.db.base import Base
-from app.api.v1 import auth, complaints
+from app.api.v1 import auth, complaints, telemetry
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="LifeTag API")
 
@@ -15,16 +33,65 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryTimingMiddleware)
+app.add_middleware(HTTPMetricsMiddleware)
+
+@app.exception_handler(PasswordHashPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordHashPoolBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many attempts, please retry later"},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(render_prometheus(), media_type=CONTENT_TYPE_LATEST)
 
 app.include_router(auth.router, prefix="/api/auth")
 app.include_router(complaints.router, prefix="/api")
+app.include_router(telemetry.router, prefix="/api")
 
 @app.on_event("startup")
 async def startup_event():
+    login_throttle.check_backend()
     os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
+    await mail_queue.start()
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        print("Database tables created successfully or already exist.")
-    except Exception as e:
-        print(f"Database startup failed: {e}")
+        logger.info("Database tables created successfully or already exist.")
+    except Exception:
+        logger.exception("Database startup failed")
+    complaint_counters.start_reconciler()
+    dispatcher.start()
+    image_pipeline.start()
+    photo_collector.start()
+    revocation_list.start()
+    complaint_feed.start()
+    telemetry_partitions.start()
+    telemetry_buffer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await complaint_feed.stop()
+    await telemetry_buffer.stop()
+    await telemetry_partitions.stop()
+    await revocation_list.stop()
+    await photo_collector.stop()
+    await image_pipeline.stop()
+    await dispatcher.stop()
+    await complaint_counters.stop_reconciler()
+    await mail_queue.stop()
+    await close_caches()
+    shutdown_password_pool()
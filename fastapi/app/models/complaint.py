@@ -1,14 +1,36 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, Float, Text, func
+from sqlalchemy import String, Integer, BigInteger, DateTime, Float, Text, Index, ForeignKey, Computed, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 import uuid
 
 from app.db.base import Base
 
+# text search configuration used for both the stored vector and queries
+SEARCH_CONFIG = "english"
+
+# place names rank above the free-text description, the reporter's own location last
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(exact_location, '') || ' ' "
+    f"|| coalesce(nearest_landmark, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(reporter_location, '')), 'C')"
+)
+
 
 class CattleComplaint(Base):
     __tablename__ = "cattle_complaints"
-
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, complaint_id DESC
+        Index("ix_cattle_complaints_created_at_id", "created_at", "complaint_id"),
+        Index("ix_cattle_complaints_status_created_at_id", "complaint_status", "created_at", "complaint_id"),
+        Index("ix_cattle_complaints_geo_cell", "geo_cell"),
+        Index("ix_cattle_complaints_assigned_shelter", "assigned_shelter_id", "complaint_status"),
+        Index("ix_cattle_complaints_search_vector", "search_vector", postgresql_using="gin"),
+        # image pipeline sweep: photos still waiting for derivatives, oldest first
+        Index("ix_cattle_complaints_photo_pending", "created_at",
+              postgresql_where=text("photo_path IS NOT NULL AND photo_thumb_path IS NULL")),
+    )
 
     complaint_id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True,
@@ -28,6 +50,13 @@ class CattleComplaint(Base):
     cattle_condition: Mapped[str] = mapped_column(String(30), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     photo_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    photo_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    photo_web_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    photo_thumb_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # failed derivative attempts; the sweep backs off and eventually gives up.
+    # photo_failed_at is also stamped when the sweep claims a row for a retry.
+    photo_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    photo_failed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     # Location Details
     spotted_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -35,8 +64,27 @@ class CattleComplaint(Base):
     gps_latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     gps_longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     nearest_landmark: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # interleaved lat/lon grid cell (see app.utils.geo) for radius/bbox lookups
+    geo_cell: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # maintained by Postgres (generated column); deferred so ORM loads never fetch it
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=True, deferred=True
+    )
 
     
     complaint_status: Mapped[str] = mapped_column(String(20), default='Open')
+    assigned_shelter_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("shelters.sid", ondelete="SET NULL"), nullable=True
+    )
+    assigned_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class ComplaintCounter(Base):
+    """Per-status complaint totals, sharded to spread row-lock contention."""
+    __tablename__ = "complaint_counters"
+
+    complaint_status: Mapped[str] = mapped_column(String(20), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
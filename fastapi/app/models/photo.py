@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, DateTime, func
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class PhotoBlob(Base):
+    """One stored photo file, shared by every complaint that uploaded the same bytes."""
+    __tablename__ = "photo_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
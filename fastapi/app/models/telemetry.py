@@ -0,0 +1,21 @@
+from sqlalchemy import Table, Column, String, DateTime, Float, Index
+
+from app.db.base import Base
+
+# Core table rather than a mapped class: readings are only ever written with
+# COPY and read in bulk, and a partitioned table has no natural primary key.
+# Partitions (one per UTC day) are created and dropped by
+# app.services.telemetry.TelemetryPartitions.
+telemetry_readings = Table(
+    "telemetry_readings",
+    Base.metadata,
+    Column("tag_id", String(64), nullable=False),
+    Column("recorded_at", DateTime, nullable=False),
+    Column("temperature", Float, nullable=True),
+    Column("activity", Float, nullable=True),
+    Column("rumination", Float, nullable=True),
+    Index("ix_telemetry_readings_tag_recorded_at", "tag_id", "recorded_at"),
+    postgresql_partition_by="RANGE (recorded_at)",
+)
+
+TELEMETRY_COLUMNS = ("tag_id", "recorded_at", "temperature", "activity", "rumination")
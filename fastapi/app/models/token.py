@@ -0,0 +1,14 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime, func
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    """A token id that must no longer be accepted, kept until the token would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=func.now(), index=True)
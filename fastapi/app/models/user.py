@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, func, Index
+from sqlalchemy import String, Integer, DateTime, Float, func, Index
 from datetime import datetime
 import uuid 
 
@@ -70,4 +70,6 @@ class Shelter(Base):
     sregistration: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     saddress: Mapped[str] = mapped_column(String(200), nullable=False)
     scapacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    slatitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    slongitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
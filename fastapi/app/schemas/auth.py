@@ -69,6 +69,8 @@ class ShelterCreate(BaseModel):
     sregistration: str
     saddress: str
     scapacity: int
+    slatitude: Optional[float] = None
+    slongitude: Optional[float] = None
     password: str
 
     @field_validator('sphone', mode='before')
@@ -83,6 +85,14 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class DeleteUserRequest(BaseModel):
     role: str
     user_id: str
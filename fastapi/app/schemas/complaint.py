@@ -19,6 +19,10 @@ class CattleComplaintCreate(BaseModel):
     gps_longitude: Optional[float] = None
     nearest_landmark: Optional[str] = None
 
+class ComplaintStatusBatchUpdate(BaseModel):
+    complaint_ids: list[str]
+    status: str
+
 class CattleComplaintRead(BaseModel):
     complaint_id: int
     reporter_name: str
@@ -0,0 +1,224 @@
+"""
+Read-through caching.
+
+``TieredCache`` keeps a per-worker LRU with TTL in front of an optional
+shared backend (Redis, when CACHE_BACKEND="redis" and the ``redis`` package
+is installed). Writers call ``invalidate``; a load that raced with an
+invalidation is not written back, so a reader cannot re-cache a value it
+read before the write committed. With a shared backend the local tier uses
+the shorter CACHE_LOCAL_TTL_SECONDS, which bounds how long another worker
+can serve a value invalidated elsewhere.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+try:
+    import redis.asyncio as _redis
+    _HAVE_REDIS = True
+except Exception:
+    _redis = None
+    _HAVE_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+cache_requests = Counter("lifetag_cache_requests", "Cache lookups by cache and result", ["cache", "result"])
+cache_lookup_seconds = Histogram(
+    "lifetag_cache_lookup_seconds", "Cache lookup latency including loads on a miss", ["cache", "result"],
+    buckets=(0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small LRU with per-entry expiry, for use from a single event loop."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared state for the cache tier and rate limits; values must be bytes."""
+
+    def __init__(self, url: str):
+        self._client = _redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def incr_window(self, key: str, ttl: float, previous_key: str) -> tuple[int, int]:
+        """Increment ``key`` (expiring after ``ttl``) and return (previous count, new count)."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            pipe.pexpire(key, int(ttl * 1000))
+            pipe.get(previous_key)
+            current, _, previous = await pipe.execute()
+        return int(previous or 0), int(current)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_redis_backends: dict[str, RedisBackend] = {}
+_warned_missing_redis = False
+
+
+def redis_available() -> bool:
+    return _HAVE_REDIS
+
+
+def redis_backend(url: str) -> RedisBackend | None:
+    """Shared Redis client for ``url``, or None when the redis package is missing."""
+    global _warned_missing_redis
+    if not _HAVE_REDIS:
+        if not _warned_missing_redis:
+            logger.warning("Redis backend requested but the redis package is not installed; using local state only")
+            _warned_missing_redis = True
+        return None
+    backend = _redis_backends.get(url)
+    if backend is None:
+        backend = _redis_backends[url] = RedisBackend(url)
+    return backend
+
+
+def shared_backend() -> RedisBackend | None:
+    if settings.CACHE_BACKEND != "redis":
+        return None
+    return redis_backend(settings.CACHE_REDIS_URL)
+
+
+class TieredCache:
+    def __init__(self, name: str, encode: Callable[[Any], bytes] | None = None,
+                 decode: Callable[[bytes], Any] | None = None, ttl: float | None = None):
+        self.name = name
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL_SECONDS
+        self._encode = encode
+        self._decode = decode
+        local_ttl = self.ttl
+        if settings.CACHE_BACKEND == "redis":
+            local_ttl = min(local_ttl, settings.CACHE_LOCAL_TTL_SECONDS)
+        self.local = TTLCache(settings.CACHE_MAX_ENTRIES, local_ttl)
+        self._generation: dict[str, int] = {}
+
+    def _key(self, key: str) -> str:
+        return f"lifetag:{self.name}:{key}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or call ``loader``; a None result is not cached."""
+        start = time.perf_counter()
+        value = self.local.get(key, _MISSING)
+        result = "hit"
+        if value is _MISSING:
+            value = await self._get_shared(key)
+            if value is not _MISSING:
+                result = "shared"
+                self.local.set(key, value)
+            else:
+                result = "miss"
+                generation = self._generation.get(key, 0)
+                value = await loader()
+                if value is not None and self._generation.get(key, 0) == generation:
+                    await self._set(key, value)
+        cache_requests.inc(cache=self.name, result=result)
+        cache_lookup_seconds.observe(time.perf_counter() - start, cache=self.name, result=result)
+        return value
+
+    async def _get_shared(self, key: str) -> Any:
+        backend = shared_backend()
+        if backend is None or self._decode is None:
+            return _MISSING
+        try:
+            raw = await backend.get(self._key(key))
+        except Exception:
+            logger.exception("Shared cache read failed")
+            return _MISSING
+        return _MISSING if raw is None else self._decode(raw)
+
+    async def _set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        backend = shared_backend()
+        if backend is not None and self._encode is not None:
+            try:
+                await backend.set(self._key(key), self._encode(value), self.ttl)
+            except Exception:
+                logger.exception("Shared cache write failed")
+
+    async def invalidate(self, *keys: str) -> None:
+        for key in keys:
+            self.local.delete(key)
+            self._generation[key] = self._generation.get(key, 0) + 1
+        # keep the generation map from growing without bound
+        if len(self._generation) > settings.CACHE_MAX_ENTRIES * 2:
+            self._generation.clear()
+            self.local.clear()
+        backend = shared_backend()
+        if backend is not None and keys:
+            try:
+                await backend.delete(*(self._key(k) for k in keys))
+            except Exception:
+                logger.exception("Shared cache invalidation failed")
+
+
+def _encode_entry(entry: tuple[str, bytes]) -> bytes:
+    etag, body = entry
+    return etag.encode("ascii") + b"\n" + body
+
+
+def _decode_entry(raw: bytes) -> tuple[str, bytes]:
+    etag, _, body = raw.partition(b"\n")
+    return etag.decode("ascii"), body
+
+
+# complaint detail responses, stored as (etag, json body)
+complaint_cache = TieredCache("complaint", encode=_encode_entry, decode=_decode_entry)
+
+# authenticated user snapshots for the current-user dependency, keyed "<role>:<id>"
+user_cache = TieredCache("user", encode=orjson.dumps, decode=orjson.loads, ttl=settings.CURRENT_USER_CACHE_SECONDS)
+
+
+async def close_caches() -> None:
+    backends = list(_redis_backends.values())
+    _redis_backends.clear()
+    for backend in backends:
+        await backend.close()
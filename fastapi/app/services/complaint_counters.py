@@ -0,0 +1,120 @@
+"""
+Incrementally maintained complaint totals.
+
+Write paths call ``adjust_counters`` inside their own transaction, so the
+counters commit (or roll back) together with the complaint rows. Each call
+bumps one randomly chosen shard per status; reads sum the shards, which is a
+handful of rows regardless of table size. ``reconcile_counters`` compares
+the totals with ``cattle_complaints`` and applies the difference as one more
+adjustment, so it never blocks writers.
+"""
+import asyncio
+import logging
+import random
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.complaint import CattleComplaint, ComplaintCounter
+
+logger = logging.getLogger(__name__)
+
+# arbitrary key for pg_try_advisory_xact_lock so only one worker reconciles at a time
+_RECONCILE_LOCK_KEY = 0x4C54_0004
+
+_reconciler_task: asyncio.Task | None = None
+
+
+async def adjust_counters(db: AsyncSession, deltas: dict[str, int]) -> None:
+    """Apply {status: delta} to the counters in the caller's transaction."""
+    rows = sorted(
+        (
+            {"complaint_status": status, "shard": random.randrange(settings.COMPLAINT_COUNTER_SHARDS), "total": delta}
+            for status, delta in deltas.items()
+            if delta
+        ),
+        # lock rows in one global order so concurrent multi-status updates cannot deadlock
+        key=lambda r: (r["complaint_status"], r["shard"]),
+    )
+    if not rows:
+        return
+    stmt = insert(ComplaintCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ComplaintCounter.complaint_status, ComplaintCounter.shard],
+        set_={"total": ComplaintCounter.total + stmt.excluded.total},
+    )
+    await db.execute(stmt)
+
+
+async def read_counters(db: AsyncSession) -> dict[str, int]:
+    result = await db.execute(
+        select(ComplaintCounter.complaint_status, func.sum(ComplaintCounter.total))
+        .group_by(ComplaintCounter.complaint_status)
+    )
+    return {status: int(total) for status, total in result.all() if total}
+
+
+async def reconcile_counters(db: AsyncSession) -> bool:
+    """Correct counter drift from the complaints table. Returns False if another worker holds the lock."""
+    got_lock = await db.scalar(select(func.pg_try_advisory_xact_lock(_RECONCILE_LOCK_KEY)))
+    if not got_lock:
+        await db.rollback()
+        return False
+
+    # Counter updates commit together with the complaint rows they describe,
+    # so comparing both within one statement (one snapshot) gives the exact
+    # drift. Adding it is commutative with concurrent adjustments; nothing
+    # needs to be locked.
+    actual = (
+        select(CattleComplaint.complaint_status.label("status"), func.count().label("n"))
+        .group_by(CattleComplaint.complaint_status)
+        .subquery()
+    )
+    counted = (
+        select(ComplaintCounter.complaint_status.label("status"), func.sum(ComplaintCounter.total).label("n"))
+        .group_by(ComplaintCounter.complaint_status)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            func.coalesce(actual.c.status, counted.c.status),
+            func.coalesce(actual.c.n, 0) - func.coalesce(counted.c.n, 0),
+        ).select_from(actual.join(counted, actual.c.status == counted.c.status, full=True))
+    )
+    drift = {status: int(delta) for status, delta in result.all() if delta}
+
+    if drift:
+        await adjust_counters(db, drift)
+    await db.commit()
+
+    if drift:
+        logger.warning("Complaint counters drifted; corrected by %s", drift)
+    return True
+
+
+async def _reconcile_loop() -> None:
+    from app.db.session import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await reconcile_counters(db)
+        except Exception:
+            logger.exception("Complaint counter reconciliation failed")
+        await asyncio.sleep(settings.COMPLAINT_COUNTER_RECONCILE_SECONDS)
+
+
+def start_reconciler() -> None:
+    global _reconciler_task
+    if _reconciler_task is None and settings.COMPLAINT_COUNTER_RECONCILE_SECONDS > 0:
+        _reconciler_task = asyncio.create_task(_reconcile_loop(), name="complaint-counter-reconciler")
+
+
+async def stop_reconciler() -> None:
+    global _reconciler_task
+    if _reconciler_task is not None:
+        _reconciler_task.cancel()
+        await asyncio.gather(_reconciler_task, return_exceptions=True)
+        _reconciler_task = None
@@ -0,0 +1,209 @@
+"""
+Live complaint feed.
+
+Writers queue compact change events with ``pg_notify`` inside their own
+transaction, so an event goes out only if the change commits, and every
+worker sees changes made by every other worker. Each worker holds one
+dedicated LISTEN connection (outside the pool), decodes each notification
+once, and fans the events out to its subscribers. A subscriber's filters
+(statuses, bounding box) are checked as each event is published, and the
+event is encoded as an SSE frame once, no matter how many subscribers get it.
+
+Each subscriber has a bounded queue. A client that falls FEED_QUEUE_SIZE
+events behind loses its backlog and is sent a single ``resync`` event telling
+it to refetch the list. One slow dashboard therefore never holds memory or
+delays anyone else. The same ``resync`` goes to everybody after the LISTEN
+connection has been re-established, since notifications sent while it was
+down are gone.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+feed_events = Counter("lifetag_feed_events", "Complaint feed events received from Postgres")
+feed_dropped = Counter("lifetag_feed_dropped", "Complaint feed events dropped for slow subscribers")
+feed_subscribers = Gauge("lifetag_feed_subscribers", "Open complaint feed subscriptions")
+
+# pg_notify payloads are limited to 8000 bytes
+_MAX_PAYLOAD = 7900
+
+_NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+def complaint_event(kind: str, complaint_id, status: str, lat: float | None, lon: float | None,
+                    shelter_id=None, previous_status: str | None = None) -> dict:
+    event = {
+        "type": kind,
+        "id": str(complaint_id),
+        "status": status,
+        "lat": lat,
+        "lon": lon,
+        "shelter": str(shelter_id) if shelter_id else None,
+        "at": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+    if previous_status is not None:
+        event["prev"] = previous_status
+    return event
+
+
+def _payloads(events: list[dict]) -> list[str]:
+    """Pack events into JSON arrays that each fit in one notification."""
+    payloads, chunk, size = [], [], 2
+    for event in events:
+        encoded = orjson.dumps(event)
+        if chunk and size + len(encoded) + 1 > _MAX_PAYLOAD:
+            payloads.append(b"[" + b",".join(chunk) + b"]")
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded) + 1
+    if chunk:
+        payloads.append(b"[" + b",".join(chunk) + b"]")
+    return [p.decode() for p in payloads]
+
+
+async def publish(db: AsyncSession, events: list[dict]) -> None:
+    """Queue ``events`` on the caller's transaction; they are delivered on commit."""
+    if events:
+        await db.execute(_NOTIFY, {"channel": settings.FEED_CHANNEL, "payloads": _payloads(events)})
+
+
+class Subscription:
+    def __init__(self, statuses: set[str] | None, box: tuple[float, float, float, float] | None):
+        self.statuses = statuses
+        self.box = box
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=settings.FEED_QUEUE_SIZE)
+
+    def wants(self, event: dict) -> bool:
+        if event["type"] == "resync":
+            return True
+        if self.statuses is not None and event["status"] not in self.statuses \
+                and event.get("prev") not in self.statuses:
+            return False
+        if self.box is not None:
+            lat, lon = event["lat"], event["lon"]
+            min_lat, min_lon, max_lat, max_lon = self.box
+            if lat is None or lon is None or not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                return False
+        return True
+
+    def offer(self, frame: bytes) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            feed_dropped.inc(self.queue.qsize() + 1)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+
+
+def sse_frame(event: dict) -> bytes:
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+RESYNC_FRAME = sse_frame({"type": "resync"})
+
+
+class ComplaintFeed:
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+        feed_subscribers.set_function(lambda: len(self._subscribers))
+
+    def full(self) -> bool:
+        return len(self._subscribers) >= settings.FEED_MAX_SUBSCRIBERS
+
+    def subscribe(self, statuses: set[str] | None = None,
+                  box: tuple[float, float, float, float] | None = None) -> Subscription:
+        sub = Subscription(statuses, box)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def dispatch(self, events: list[dict]) -> None:
+        for event in events:
+            frame = None
+            for sub in self._subscribers:
+                if sub.wants(event):
+                    if frame is None:
+                        frame = sse_frame(event)
+                    sub.offer(frame)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            events = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring malformed complaint feed payload")
+            return
+        feed_events.inc(len(events))
+        self.dispatch(events)
+
+    # ---------------------------------------------------------------
+    # LISTEN connection
+    # ---------------------------------------------------------------
+    async def _connect(self):
+        import asyncpg
+        from app.db.session import connect_args
+
+        url = make_url(str(settings.DATABASE_URL)).set(drivername="postgresql")
+        return await asyncpg.connect(
+            url.render_as_string(hide_password=False),
+            ssl=connect_args.get("ssl"),
+            server_settings=connect_args.get("server_settings"),
+        )
+
+    async def _listen_loop(self) -> None:
+        delay = 1.0
+        reconnected = False
+        while True:
+            conn = None
+            try:
+                conn = await self._connect()
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(settings.FEED_CHANNEL, self._on_notification)
+                if reconnected:
+                    # anything sent while we were disconnected is gone
+                    self.dispatch([{"type": "resync"}])
+                delay = 1.0
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), settings.FEED_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        # a half-open TCP connection never reports termination
+                        await conn.execute("SELECT 1", timeout=settings.FEED_HEARTBEAT_SECONDS)
+                logger.warning("Complaint feed LISTEN connection lost; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Complaint feed LISTEN connection failed; retrying in %.0fs", delay)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            reconnected = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.FEED_RECONNECT_MAX_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_loop(), name="complaint-feed-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+complaint_feed = ComplaintFeed()
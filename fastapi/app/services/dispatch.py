@@ -0,0 +1,114 @@
+"""
+Nearest-shelter dispatch for new complaints.
+
+Each worker keeps a KD-tree of shelter locations with their remaining
+capacity (scapacity minus active assigned complaints). Assignment is a
+nearest-neighbour lookup plus a local capacity reservation; the tree is
+rebuilt from the database every DISPATCH_REFRESH_SECONDS, which also
+reconciles reservations made by other workers. A shelter deleted through
+another worker can still be picked until then; inserts that hit the
+assigned-shelter foreign key drop it from the tree and assign again.
+"""
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.complaint import CattleComplaint
+from app.models.user import Shelter
+from app.utils.geo import valid_coordinates
+from app.utils.kdtree import CapacityKDTree
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("Open", "In Progress")
+
+ASSIGNED_SHELTER_FK = "cattle_complaints_assigned_shelter_id_fkey"
+
+
+def missing_shelter_violation(exc: Exception) -> bool:
+    """True if ``exc`` is an insert rejected because its assigned shelter no longer exists."""
+    return isinstance(exc, IntegrityError) and ASSIGNED_SHELTER_FK in str(exc.orig)
+
+
+class DispatchEngine:
+    def __init__(self):
+        self.index = CapacityKDTree()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def refresh(self, db: AsyncSession) -> None:
+        active = (
+            select(CattleComplaint.assigned_shelter_id, func.count().label("active"))
+            .where(
+                CattleComplaint.assigned_shelter_id.isnot(None),
+                CattleComplaint.complaint_status.in_(ACTIVE_STATUSES),
+            )
+            .group_by(CattleComplaint.assigned_shelter_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(
+                Shelter.sid,
+                Shelter.slatitude,
+                Shelter.slongitude,
+                Shelter.scapacity - func.coalesce(active.c.active, 0),
+            )
+            .outerjoin(active, active.c.assigned_shelter_id == Shelter.sid)
+            .where(Shelter.slatitude.isnot(None), Shelter.slongitude.isnot(None))
+        )
+        self.index.rebuild(result.all())
+
+    def add_shelter(self, sid: uuid.UUID, lat: float | None, lon: float | None, capacity: int) -> None:
+        if valid_coordinates(lat, lon):
+            self.index.upsert(sid, lat, lon, capacity)
+
+    def remove_shelter(self, sid: uuid.UUID) -> None:
+        self.index.remove(sid)
+
+    def assign(self, lat: float | None, lon: float | None) -> tuple[uuid.UUID, float] | None:
+        """Reserve a slot at the nearest shelter with room; returns (sid, distance_km)."""
+        if not valid_coordinates(lat, lon):
+            return None
+        picked = self.index.nearest_available(lat, lon)
+        if picked is not None:
+            self.index.adjust(picked[0], -1)
+        return picked
+
+    def release(self, sid: uuid.UUID | None) -> None:
+        if sid is not None:
+            self.index.adjust(sid, 1)
+
+    def reserve(self, sid: uuid.UUID | None) -> None:
+        if sid is not None:
+            self.index.adjust(sid, -1)
+
+    # ---------------------------------------------------------------
+    # Periodic refresh
+    # ---------------------------------------------------------------
+    async def _refresh_loop(self) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.refresh(db)
+            except Exception:
+                logger.exception("Dispatch index refresh failed")
+            await asyncio.sleep(settings.DISPATCH_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop(), name="dispatch-refresh")
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+
+dispatcher = DispatchEngine()
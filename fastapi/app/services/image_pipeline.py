@@ -0,0 +1,215 @@
+"""
+Background image processing for complaint photos.
+
+After a complaint with a photo commits, ``image_pipeline.submit`` hands the
+original to a process pool that writes a recompressed WebP copy and a small
+WebP thumbnail next to it (same content-addressed name, ``.web.webp`` and
+``.thumb.webp`` suffixes), then records both paths on the complaint.
+
+Every IMAGE_PIPELINE_SWEEP_SECONDS a sweep queues photos still missing
+derivatives, oldest first: jobs lost to a restart and failed jobs due for a
+retry. A failed job is counted on the complaint and retried no sooner than
+IMAGE_PIPELINE_RETRY_SECONDS later, up to IMAGE_PIPELINE_MAX_ATTEMPTS, so a
+corrupt upload is not retried forever. The sweep holds an advisory lock and
+stamps the rows it claims, so across all workers a photo is queued once per
+retry window.
+
+Pillow is optional; without it the pipeline logs a warning and does nothing.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.models.complaint import CattleComplaint
+from app.services.cache import complaint_cache
+
+try:
+    from PIL import Image, ImageOps
+    _HAVE_PIL = True
+except Exception:
+    Image = ImageOps = None
+    _HAVE_PIL = False
+
+logger = logging.getLogger(__name__)
+
+# arbitrary key for pg_try_advisory_xact_lock so only one worker sweeps at a time
+_SWEEP_LOCK_KEY = 0x4C54_000A
+
+
+def _derivative_path(src_path: str, variant: str) -> str:
+    base, _ = os.path.splitext(src_path)
+    return f"{base}.{variant}.webp"
+
+
+def derivative_paths(src_path: str) -> tuple[str, str]:
+    """(web, thumb) paths for an original, whether or not they exist yet."""
+    return _derivative_path(src_path, "web"), _derivative_path(src_path, "thumb")
+
+
+def _save_webp(img, path: str, quality: int) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    img.save(tmp, "WEBP", quality=quality, method=4)
+    os.replace(tmp, path)
+
+
+def process_image(src_path: str, max_dimension: int, thumb_size: int,
+                  web_quality: int, thumb_quality: int) -> tuple[str, str]:
+    """Runs in a worker process. Returns (web_path, thumb_path)."""
+    web_path, thumb_path = derivative_paths(src_path)
+    if os.path.exists(web_path) and os.path.exists(thumb_path):
+        return web_path, thumb_path  # same content was processed before
+
+    with Image.open(src_path) as img:
+        img.seek(0)  # first frame of animated GIFs
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+
+        web = img.copy()
+        web.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        _save_webp(web, web_path, web_quality)
+
+        img.thumbnail((thumb_size, thumb_size), Image.Resampling.LANCZOS)
+        _save_webp(img, thumb_path, thumb_quality)
+    return web_path, thumb_path
+
+
+class ImagePipeline:
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._slots: asyncio.Semaphore | None = None
+        self._pending: set[uuid.UUID] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return _HAVE_PIL and settings.IMAGE_PIPELINE_WORKERS > 0
+
+    def start(self) -> None:
+        if not _HAVE_PIL:
+            logger.warning("Pillow is not installed; complaint photo thumbnails are disabled")
+            return
+        if not self.enabled or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PIPELINE_WORKERS)
+        # bound in-flight jobs so a surge queues here instead of piling up in the pool
+        self._slots = asyncio.Semaphore(settings.IMAGE_PIPELINE_WORKERS * 4)
+        self._spawn(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._executor is None:
+            return
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def submit(self, complaint_id: uuid.UUID, photo_path: str) -> None:
+        if self._executor is not None and complaint_id not in self._pending:
+            self._pending.add(complaint_id)
+            self._spawn(self._run(complaint_id, photo_path))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, complaint_id: uuid.UUID, photo_path: str) -> None:
+        try:
+            await self._process(complaint_id, photo_path)
+        finally:
+            self._pending.discard(complaint_id)
+
+    async def _process(self, complaint_id: uuid.UUID, photo_path: str) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        async with self._slots:
+            try:
+                loop = asyncio.get_running_loop()
+                web_path, thumb_path = await loop.run_in_executor(
+                    self._executor,
+                    process_image,
+                    photo_path,
+                    settings.IMAGE_MAX_DIMENSION,
+                    settings.IMAGE_THUMBNAIL_SIZE,
+                    settings.IMAGE_WEB_QUALITY,
+                    settings.IMAGE_THUMBNAIL_QUALITY,
+                )
+            except Exception:
+                logger.exception("Image processing failed for complaint %s", complaint_id)
+                await self._record_failure(complaint_id)
+                return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(CattleComplaint)
+                .where(CattleComplaint.complaint_id == complaint_id)
+                .values(photo_web_path=web_path, photo_thumb_path=thumb_path)
+            )
+            await db.commit()
+        await complaint_cache.invalidate(str(complaint_id))
+
+    async def _record_failure(self, complaint_id: uuid.UUID) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(CattleComplaint)
+                    .where(CattleComplaint.complaint_id == complaint_id)
+                    .values(photo_attempts=CattleComplaint.photo_attempts + 1, photo_failed_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Could not record image processing failure for complaint %s", complaint_id)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await self._sweep()
+            await asyncio.sleep(settings.IMAGE_PIPELINE_SWEEP_SECONDS)
+
+    async def _sweep(self) -> None:
+        """Queue photos that never got derivatives (e.g. the worker restarted mid-job) or are due a retry."""
+        from app.db.session import AsyncSessionLocal
+
+        now = datetime.utcnow()
+        retry_before = now - timedelta(seconds=settings.IMAGE_PIPELINE_RETRY_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                if not await db.scalar(select(func.pg_try_advisory_xact_lock(_SWEEP_LOCK_KEY))):
+                    return  # another worker is sweeping
+                rows = (await db.execute(
+                    select(CattleComplaint.complaint_id, CattleComplaint.photo_path)
+                    .where(
+                        CattleComplaint.photo_path.isnot(None),
+                        CattleComplaint.photo_thumb_path.is_(None),
+                        CattleComplaint.photo_attempts < settings.IMAGE_PIPELINE_MAX_ATTEMPTS,
+                        # a fresh upload gets a retry window for its first job too,
+                        # which is still running in whichever worker took it
+                        func.coalesce(CattleComplaint.photo_failed_at, CattleComplaint.created_at) < retry_before,
+                    )
+                    .order_by(CattleComplaint.created_at)
+                    .limit(settings.IMAGE_PIPELINE_SWEEP_LIMIT)
+                )).all()
+                if rows:
+                    # claim the rows: the next sweep, here or elsewhere, waits out a retry window
+                    await db.execute(
+                        update(CattleComplaint)
+                        .where(CattleComplaint.complaint_id.in_([r.complaint_id for r in rows]))
+                        .values(photo_failed_at=now)
+                    )
+                await db.commit()
+        except Exception:
+            logger.exception("Image pipeline sweep failed")
+            return
+        for complaint_id, photo_path in rows:
+            self.submit(complaint_id, photo_path)
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,351 @@
+"""
+Durable outbound mail queue.
+
+Messages are spooled to disk before they are acknowledged, then delivered by
+a small pool of long-lived SMTP sessions. Each uvicorn worker owns a spool
+directory guarded by an flock; on startup a worker adopts the directories of
+workers that are no longer running, so nothing is lost across restarts.
+
+Spool layout::
+
+    MAIL_SPOOL_DIR/
+      .<token>/                   a worker's directory while it is being set up
+      workers/<token>/.lock       held for the lifetime of the owning worker
+      workers/<token>/<id>.json   one file per undelivered message
+      dead/<id>.json              messages that exhausted their retries
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Iterable
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# a staging directory this old belongs to a worker that died during startup
+_STAGING_STALE_SECONDS = 60
+
+mail_queue_depth = Gauge("lifetag_mail_queue_depth", "Messages waiting to be delivered (including retries)")
+mail_send_seconds = Histogram("lifetag_mail_send_seconds", "SMTP delivery latency per message")
+mail_messages = Counter("lifetag_mail_messages", "Mail delivery attempts by outcome", ["outcome"])
+
+
+def build_message(subject: str, to_email: str, body: str, is_html: bool = False) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = settings.MAIL_USERNAME
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    if is_html:
+        msg.set_content("This email requires an HTML-compatible email client.")
+        msg.add_alternative(body, subtype="html")
+    else:
+        msg.set_content(body)
+    return msg
+
+
+def _write_atomic(path: Path, record: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(record, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class MailQueue:
+    def __init__(self):
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retry_handles: set[asyncio.TimerHandle] = set()
+        self._spool: Path | None = None
+        self._dead: Path | None = None
+        self._lock_fd: int | None = None
+        self._closing = False
+        mail_queue_depth.set_function(self.depth)
+
+    # ---------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._closing = False
+        recovered = await asyncio.to_thread(self._open_spool)
+        for record in recovered:
+            self._queue.put_nowait(record)
+        if recovered:
+            logger.info("Recovered %d undelivered mail(s) from spool", len(recovered))
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"mail-worker-{i}")
+            for i in range(max(1, settings.MAIL_POOL_SIZE))
+        ]
+
+    async def stop(self) -> None:
+        """Stop accepting mail, drain what we can, and leave the rest spooled."""
+        if self._queue is None:
+            return
+        self._closing = True
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=settings.MAIL_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Mail queue drain timed out; %d message(s) left in spool", self._queue.qsize())
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def depth(self) -> int:
+        if self._queue is None:
+            return 0
+        return self._queue.qsize() + len(self._retry_handles)
+
+    # ---------------------------------------------------------------
+    # Enqueue
+    # ---------------------------------------------------------------
+    async def enqueue(self, subject: str, to_email: str, body: str, is_html: bool = False) -> str:
+        ids = await self.enqueue_many([(subject, to_email, body, is_html)])
+        return ids[0]
+
+    async def enqueue_many(self, messages: Iterable[tuple]) -> list[str]:
+        """Spool (subject, to_email, body, is_html) tuples with one thread hop."""
+        if self._queue is None or self._closing:
+            raise RuntimeError("Mail queue is not running")
+        records = [
+            {
+                "id": uuid.uuid4().hex,
+                "subject": subject,
+                "to": to_email,
+                "body": body,
+                "is_html": is_html,
+                "attempts": 0,
+                "created_at": time.time(),
+            }
+            for subject, to_email, body, is_html in messages
+        ]
+        await asyncio.to_thread(self._spool_records, records)
+        for record in records:
+            self._queue.put_nowait(record)
+        return [r["id"] for r in records]
+
+    # ---------------------------------------------------------------
+    # Spool handling (runs in a thread)
+    # ---------------------------------------------------------------
+    def _open_spool(self) -> list[dict]:
+        root = Path(settings.MAIL_SPOOL_DIR)
+        workers_dir = root / "workers"
+        self._dead = root / "dead"
+        workers_dir.mkdir(parents=True, exist_ok=True)
+        self._dead.mkdir(parents=True, exist_ok=True)
+
+        # Build and lock the directory outside workers/ and rename it in, so
+        # an adopter never sees it before its lock is held.
+        token = uuid.uuid4().hex
+        staging = root / f".{token}"
+        staging.mkdir()
+        self._lock_fd = os.open(staging / ".lock", os.O_CREAT | os.O_RDWR)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._spool = workers_dir / token
+        os.rename(staging, self._spool)
+        self._remove_stale_staging(root)
+
+        recovered = []
+        for other in workers_dir.iterdir():
+            if other == self._spool or not other.is_dir():
+                continue
+            fd = os.open(other / ".lock", os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue  # owner is still alive
+            try:
+                for path in other.glob("*.json"):
+                    try:
+                        record = json.loads(path.read_text(encoding="utf-8"))
+                    except Exception:
+                        logger.exception("Unreadable spooled mail %s; moving to dead letters", path)
+                        os.replace(path, self._dead / path.name)
+                        continue
+                    os.replace(path, self._spool / path.name)
+                    recovered.append(record)
+                for leftover in other.iterdir():
+                    leftover.unlink()
+                other.rmdir()
+            finally:
+                os.close(fd)
+        recovered.sort(key=lambda r: r.get("created_at", 0))
+        return recovered
+
+    @staticmethod
+    def _remove_stale_staging(root: Path) -> None:
+        """Remove staging directories left by workers that died before renaming them."""
+        cutoff = time.time() - _STAGING_STALE_SECONDS
+        for other in root.glob(".*"):
+            try:
+                if not other.is_dir() or other.stat().st_mtime > cutoff:
+                    continue  # possibly still being set up
+                fd = os.open(other / ".lock", os.O_CREAT | os.O_RDWR)
+            except FileNotFoundError:
+                continue  # renamed into place meanwhile
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                for leftover in other.iterdir():
+                    leftover.unlink()
+                other.rmdir()
+            except (BlockingIOError, FileNotFoundError):
+                continue
+            finally:
+                os.close(fd)
+
+    def _spool_records(self, records: list[dict]) -> None:
+        for record in records:
+            _write_atomic(self._spool / f"{record['id']}.json", record)
+
+    def _delete(self, record: dict) -> None:
+        try:
+            os.remove(self._spool / f"{record['id']}.json")
+        except FileNotFoundError:
+            pass
+
+    def _bury(self, record: dict) -> None:
+        _write_atomic(self._dead / f"{record['id']}.json", record)
+        self._delete(record)
+
+    # ---------------------------------------------------------------
+    # Delivery
+    # ---------------------------------------------------------------
+    def _new_client(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME or None,
+            password=settings.MAIL_PASSWORD or None,
+            use_tls=settings.MAIL_USE_SSL,
+            start_tls=settings.MAIL_USE_TLS,
+        )
+
+    async def _worker(self, index: int) -> None:
+        client: aiosmtplib.SMTP | None = None
+        queue = self._queue
+        try:
+            while True:
+                try:
+                    timeout = settings.MAIL_CONNECTION_IDLE_SECONDS if client is not None else None
+                    record = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    await self._close_client(client)
+                    client = None
+                    continue
+
+                batch = [record]
+                while len(batch) < settings.MAIL_BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                for record in batch:
+                    try:
+                        client = await self._deliver(client, record)
+                    finally:
+                        queue.task_done()
+        finally:
+            await self._close_client(client)
+
+    async def _deliver(self, client: aiosmtplib.SMTP | None, record: dict) -> aiosmtplib.SMTP | None:
+        msg = build_message(record["subject"], record["to"], record["body"], record["is_html"])
+        if settings.MAIL_BACKEND == "null":
+            mail_messages.inc(outcome="discarded")
+            await asyncio.to_thread(self._delete, record)
+            return client
+        start = time.perf_counter()
+        try:
+            if client is None or not client.is_connected:
+                client = self._new_client()
+                await client.connect()
+            await client.send_message(msg)
+        except aiosmtplib.SMTPResponseException as e:
+            mail_send_seconds.observe(time.perf_counter() - start)
+            if e.code >= 500:
+                logger.error("Mail to %s permanently rejected: %s", record["to"], e)
+                mail_messages.inc(outcome="dead")
+                await asyncio.to_thread(self._bury, record)
+            else:
+                await self._retry(record, e)
+            return client
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            # every recipient was refused; the session itself is still usable
+            mail_send_seconds.observe(time.perf_counter() - start)
+            if any(r.code >= 500 for r in e.recipients):
+                logger.error("Mail to %s permanently rejected: %s", record["to"], e)
+                mail_messages.inc(outcome="dead")
+                await asyncio.to_thread(self._bury, record)
+            else:
+                await self._retry(record, e)
+            return client
+        except Exception as e:
+            mail_send_seconds.observe(time.perf_counter() - start)
+            await self._close_client(client)
+            await self._retry(record, e)
+            return None
+
+        mail_send_seconds.observe(time.perf_counter() - start)
+        mail_messages.inc(outcome="sent")
+        await asyncio.to_thread(self._delete, record)
+        return client
+
+    async def _retry(self, record: dict, error: Exception) -> None:
+        record["attempts"] += 1
+        if record["attempts"] >= settings.MAIL_MAX_RETRIES:
+            logger.error("Mail to %s failed after %d attempts: %s", record["to"], record["attempts"], error)
+            mail_messages.inc(outcome="dead")
+            await asyncio.to_thread(self._bury, record)
+            return
+
+        mail_messages.inc(outcome="retry")
+        delay = min(
+            settings.MAIL_RETRY_MAX_SECONDS,
+            settings.MAIL_RETRY_BASE_SECONDS * (2 ** (record["attempts"] - 1)),
+        )
+        logger.warning("Mail to %s failed (%s); retrying in %.0fs", record["to"], error, delay)
+        await asyncio.to_thread(_write_atomic, self._spool / f"{record['id']}.json", record)
+        if self._closing:
+            return  # stays in the spool for the next start
+
+        loop = asyncio.get_running_loop()
+        handle: asyncio.TimerHandle
+
+        def _requeue():
+            self._retry_handles.discard(handle)
+            if self._queue is not None and not self._closing:
+                self._queue.put_nowait(record)
+
+        handle = loop.call_later(delay, _requeue)
+        self._retry_handles.add(handle)
+
+    @staticmethod
+    async def _close_client(client: aiosmtplib.SMTP | None) -> None:
+        if client is None or not client.is_connected:
+            return
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+
+mail_queue = MailQueue()
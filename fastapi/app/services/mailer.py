@@ -1,27 +1,13 @@
-import aiosmtplib
-from email.message import EmailMessage
-from app.core.config import settings
+from typing import Iterable
 
-async def send_email(subject: str, to_email: str, body: str, is_html: bool = False):
-    msg = EmailMessage()
-    msg["From"] = settings.MAIL_USERNAME
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    if is_html:
-        msg.set_content("This email requires an HTML-compatible email client.")
-        msg.add_alternative(body, subtype="html")
-    else:
-        msg.set_content(body)
+from app.services.mail_queue import mail_queue
 
-    try:
-        await aiosmtplib.send(
-            msg,
-            hostname=settings.MAIL_SERVER,
-            port=settings.MAIL_PORT,
-            username=settings.MAIL_USERNAME,
-            password=settings.MAIL_PASSWORD,
-            use_tls=settings.MAIL_USE_SSL,
-            start_tls=settings.MAIL_USE_TLS
-        )
-    except Exception as e:
-        print(f"Mail sending failed: {e}")
+
+async def send_email(subject: str, to_email: str, body: str, is_html: bool = False) -> str:
+    """Queue an email for delivery. Returns once the message is spooled to disk."""
+    return await mail_queue.enqueue(subject, to_email, body, is_html)
+
+
+async def send_emails(messages: Iterable[tuple]) -> list[str]:
+    """Queue many (subject, to_email, body, is_html) messages in one go."""
+    return await mail_queue.enqueue_many(messages)
@@ -0,0 +1,143 @@
+"""
+Reference counting for content-addressed photos.
+
+Complaints point at a shared file by sha256. Each reference bumps
+``photo_blobs.ref_count`` in the caller's transaction; releasing only
+decrements. Files are removed later by ``collect_unreferenced_photos`` once
+they have been unreferenced for a grace period.
+
+The ``photo_blobs`` row lock orders file placement against collection:
+``add_photo_reference`` upserts the row (locking it until the caller's
+transaction ends) *before* moving the staged upload into place, and the
+collector locks the row and removes the file before its delete commits. An
+upload racing a collection therefore either waits for the delete and then
+writes a fresh file, or holds the row so the collector skips it.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.models.photo import PhotoBlob
+from app.utils.file import StoredFile, commit_upload, discard_upload
+
+logger = logging.getLogger(__name__)
+
+photos_collected = Counter("lifetag_photos_collected", "Unreferenced photo files removed")
+
+
+async def add_photo_reference(db: AsyncSession, stored: StoredFile) -> StoredFile:
+    """Reference ``stored`` in the caller's transaction and move its bytes into place."""
+    stmt = insert(PhotoBlob).values(sha256=stored.sha256, path=stored.path, size=stored.size, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PhotoBlob.sha256],
+        set_={"ref_count": PhotoBlob.ref_count + 1, "updated_at": datetime.utcnow()},
+    )
+    await db.execute(stmt)
+    return await asyncio.to_thread(commit_upload, stored)
+
+
+async def abandon_photo(stored: StoredFile) -> None:
+    """
+    Clean up after a transaction that referenced ``stored`` rolled back.
+
+    A staged file is simply deleted. A file this request moved into place is
+    recorded as unreferenced rather than deleted, since another upload of the
+    same bytes may already be using it; the collector removes it after the
+    grace period if nothing does.
+    """
+    from app.db.session import AsyncSessionLocal
+
+    await asyncio.to_thread(discard_upload, stored)
+    if not stored.created:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(PhotoBlob)
+                .values(sha256=stored.sha256, path=stored.path, size=stored.size, ref_count=0)
+                .on_conflict_do_update(index_elements=[PhotoBlob.sha256],
+                                       set_={"updated_at": datetime.utcnow()})
+            )
+            await db.commit()
+    except Exception:
+        logger.exception("Could not record abandoned photo %s", stored.path)
+
+
+async def release_photo_reference(db: AsyncSession, sha256: str) -> None:
+    await db.execute(
+        update(PhotoBlob)
+        .where(PhotoBlob.sha256 == sha256)
+        .values(ref_count=PhotoBlob.ref_count - 1, updated_at=datetime.utcnow())
+    )
+
+
+def _remove_files(paths: list[str]) -> None:
+    from app.services.image_pipeline import derivative_paths
+
+    for path in paths:
+        for p in (path, *derivative_paths(path)):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.exception("Could not remove unreferenced photo %s", p)
+
+
+async def collect_unreferenced_photos(db: AsyncSession, grace_seconds: int = 3600, limit: int = 500) -> int:
+    """Delete blobs unreferenced for longer than the grace period. Returns the number removed."""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    rows = (await db.execute(
+        select(PhotoBlob.sha256, PhotoBlob.path)
+        .where(PhotoBlob.ref_count <= 0, PhotoBlob.updated_at < cutoff)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        return 0
+    # remove the files while the rows are still locked; see the module docstring
+    await asyncio.to_thread(_remove_files, [r.path for r in rows])
+    await db.execute(delete(PhotoBlob).where(PhotoBlob.sha256.in_([r.sha256 for r in rows])))
+    await db.commit()
+    photos_collected.inc(len(rows))
+    return len(rows)
+
+
+class PhotoCollector:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def _loop(self) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        while True:
+            try:
+                while True:
+                    async with AsyncSessionLocal() as db:
+                        removed = await collect_unreferenced_photos(
+                            db, settings.PHOTO_GC_GRACE_SECONDS, settings.PHOTO_GC_BATCH_SIZE)
+                    if removed < settings.PHOTO_GC_BATCH_SIZE:
+                        break
+            except Exception:
+                logger.exception("Photo collection failed")
+            await asyncio.sleep(settings.PHOTO_GC_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="photo-collector")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+photo_collector = PhotoCollector()
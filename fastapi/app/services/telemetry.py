@@ -0,0 +1,319 @@
+"""
+Sensor telemetry ingestion.
+
+Devices post batches of readings (tag id, timestamp, temperature, activity,
+rumination) as NDJSON, a JSON array, or msgpack. A reading is either an
+object with those keys or a compact array in that order. Parsing is plain
+Python over orjson/msgpack output (no model per reading), and readings
+outside the partitioned time window are rejected individually rather than
+failing the batch.
+
+Accepted rows go into a per-worker buffer that is written with one COPY when
+it reaches TELEMETRY_FLUSH_ROWS or every TELEMETRY_FLUSH_SECONDS, whichever
+comes first. A failed COPY puts the rows back for the next attempt; once the
+buffer holds TELEMETRY_MAX_BUFFERED_ROWS, new batches get a 503 so devices
+back off instead of the worker growing without bound. Acknowledged readings
+that are still buffered are lost if the worker dies.
+
+``telemetry_readings`` is range-partitioned by day. TelemetryPartitions keeps
+a partition for every day a reading may be accepted for and drops partitions
+past TELEMETRY_RETENTION_DAYS.
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+import msgpack
+import orjson
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.models.telemetry import TELEMETRY_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+telemetry_readings = Counter(
+    "lifetag_telemetry_readings", "Telemetry readings by outcome", ["outcome"])
+telemetry_flush_seconds = Histogram(
+    "lifetag_telemetry_flush_seconds", "Time to COPY one telemetry buffer flush",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+telemetry_buffered = Gauge("lifetag_telemetry_buffered", "Telemetry readings waiting to be written")
+
+_MAX_TAG_LENGTH = 64
+_MAX_REPORTED_ERRORS = 100
+# epoch values above this are taken to be milliseconds
+_EPOCH_MS_THRESHOLD = 1e11
+
+_PARTITION_PREFIX = "telemetry_readings_p"
+
+
+class TelemetryBufferFull(Exception):
+    """Raised when the worker already holds TELEMETRY_MAX_BUFFERED_ROWS unwritten readings."""
+
+
+class ParsedBatch(NamedTuple):
+    rows: list[tuple]
+    rejected: int
+    errors: list[dict]
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, bool):
+        raise ValueError("timestamp must be epoch seconds or ISO 8601")
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if value > _EPOCH_MS_THRESHOLD else value
+        return datetime.utcfromtimestamp(seconds)
+    if isinstance(value, str):
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+    raise ValueError("timestamp must be epoch seconds or ISO 8601")
+
+
+def _measurement(value, name: str) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    return float(value)
+
+
+class _Parser:
+    def __init__(self):
+        self.rows: list[tuple] = []
+        self.rejected = 0
+        self.errors: list[dict] = []
+        self.index = 0
+        now = datetime.utcnow()
+        self.earliest = datetime.combine(now.date() - timedelta(days=settings.TELEMETRY_MAX_AGE_DAYS),
+                                         datetime.min.time())
+        self.latest = now + timedelta(seconds=settings.TELEMETRY_MAX_CLOCK_SKEW_SECONDS)
+
+    def reject(self, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append({"index": self.index, "error": message})
+        self.index += 1
+
+    def add(self, reading) -> None:
+        try:
+            if isinstance(reading, dict):
+                tag_id, ts = reading.get("tag_id"), reading.get("timestamp")
+                values = (reading.get("temperature"), reading.get("activity"), reading.get("rumination"))
+            elif isinstance(reading, (list, tuple)) and 2 <= len(reading) <= 5:
+                tag_id, ts, *values = reading
+                values = (*values, *(None,) * (3 - len(values)))
+            else:
+                raise ValueError("reading must be an object or [tag_id, timestamp, temperature, activity, rumination]")
+            if not isinstance(tag_id, str) or not 0 < len(tag_id) <= _MAX_TAG_LENGTH:
+                raise ValueError(f"tag_id must be a string of 1-{_MAX_TAG_LENGTH} characters")
+            if ts is None:
+                raise ValueError("timestamp is required")
+            recorded_at = _timestamp(ts)
+            if not self.earliest <= recorded_at <= self.latest:
+                raise ValueError("timestamp is outside the accepted window")
+            row = (tag_id, recorded_at,
+                   _measurement(values[0], "temperature"),
+                   _measurement(values[1], "activity"),
+                   _measurement(values[2], "rumination"))
+        except (ValueError, TypeError, OverflowError, OSError) as e:
+            self.reject(str(e))
+            return
+        self.rows.append(row)
+        self.index += 1
+
+    def result(self) -> ParsedBatch:
+        if self.rejected:
+            telemetry_readings.inc(self.rejected, outcome="rejected")
+        return ParsedBatch(self.rows, self.rejected, self.errors)
+
+
+def parse_ndjson(body: bytes) -> ParsedBatch:
+    """One reading per line."""
+    parser = _Parser()
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            reading = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            parser.reject("invalid JSON")
+            continue
+        parser.add(reading)
+    return parser.result()
+
+
+def parse_json_array(body: bytes) -> ParsedBatch:
+    """One JSON array holding every reading."""
+    parser = _Parser()
+    try:
+        readings = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        parser.reject("invalid JSON")
+        return parser.result()
+    if not isinstance(readings, list):
+        parser.reject("body must be a JSON array of readings")
+        return parser.result()
+    for reading in readings:
+        parser.add(reading)
+    return parser.result()
+
+
+def parse_msgpack(body: bytes) -> ParsedBatch:
+    """A stream of msgpack objects, each one reading or an array of readings."""
+    parser = _Parser()
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=max(len(body), 1024))
+    unpacker.feed(body)
+    try:
+        for obj in unpacker:
+            if isinstance(obj, list) and obj and isinstance(obj[0], (list, dict)):
+                for reading in obj:
+                    parser.add(reading)
+            else:
+                parser.add(obj)
+    except (msgpack.UnpackException, ValueError):
+        parser.reject("invalid msgpack; the rest of the body was skipped")
+    return parser.result()
+
+
+class TelemetryBuffer:
+    def __init__(self):
+        self._rows: list[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        telemetry_buffered.set_function(lambda: len(self._rows))
+
+    def add(self, rows: list[tuple]) -> None:
+        if len(self._rows) + len(rows) > settings.TELEMETRY_MAX_BUFFERED_ROWS:
+            telemetry_readings.inc(len(rows), outcome="refused")
+            raise TelemetryBufferFull()
+        telemetry_readings.inc(len(rows), outcome="accepted")
+        self._rows.extend(rows)
+        if len(self._rows) >= settings.TELEMETRY_FLUSH_ROWS:
+            self._wakeup.set()
+
+    async def _copy(self, rows: list[tuple]) -> None:
+        from app.db.session import engine
+
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "telemetry_readings", records=rows, columns=TELEMETRY_COLUMNS)
+            await conn.commit()
+
+    async def flush(self) -> None:
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        start = time.perf_counter()
+        try:
+            await self._copy(rows)
+        except Exception:
+            logger.exception("Telemetry COPY of %d readings failed", len(rows))
+            room = settings.TELEMETRY_MAX_BUFFERED_ROWS - len(self._rows)
+            if room > 0:
+                self._rows[:0] = rows[-room:]
+            if len(rows) > room:
+                telemetry_readings.inc(len(rows) - max(room, 0), outcome="dropped")
+            return
+        telemetry_flush_seconds.observe(time.perf_counter() - start)
+        telemetry_readings.inc(len(rows), outcome="written")
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.TELEMETRY_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._flush_loop(), name="telemetry-flush")
+
+    async def stop(self) -> None:
+        # let the loop finish a COPY in flight rather than cancelling it, which
+        # would lose rows already swapped out of the buffer
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+def partition_name(day: date) -> str:
+    return f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+class TelemetryPartitions:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def maintain(self) -> None:
+        """Create the partitions readings may be accepted for and drop expired ones."""
+        from app.db.session import engine
+
+        today = datetime.utcnow().date()
+        first = today - timedelta(days=settings.TELEMETRY_MAX_AGE_DAYS)
+        last = today + timedelta(days=settings.TELEMETRY_PARTITIONS_AHEAD_DAYS)
+        async with engine.begin() as conn:
+            # every worker runs this; serialize the DDL across them
+            await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('lifetag_telemetry_partitions'))"))
+            existing = set((await conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'telemetry_readings'::regclass"
+            ))).scalars())
+
+            day = first
+            while day <= last:
+                name = partition_name(day)
+                if name not in existing:
+                    await conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF telemetry_readings "
+                        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                    ))
+                    logger.info("Created telemetry partition %s", name)
+                day += timedelta(days=1)
+
+            if settings.TELEMETRY_RETENTION_DAYS > 0:
+                cutoff = today - timedelta(days=settings.TELEMETRY_RETENTION_DAYS)
+                for name in sorted(existing):
+                    try:
+                        partition_day = datetime.strptime(name.removeprefix(_PARTITION_PREFIX), "%Y%m%d").date()
+                    except ValueError:
+                        continue
+                    if partition_day < cutoff:
+                        await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                        logger.info("Dropped telemetry partition %s", name)
+
+    # ---------------------------------------------------------------
+    # Periodic maintenance
+    # ---------------------------------------------------------------
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                logger.exception("Telemetry partition maintenance failed")
+            await asyncio.sleep(settings.TELEMETRY_PARTITION_CHECK_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="telemetry-partitions")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+telemetry_buffer = TelemetryBuffer()
+telemetry_partitions = TelemetryPartitions()
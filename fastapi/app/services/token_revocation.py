@@ -0,0 +1,100 @@
+"""
+Token revocation list.
+
+Revoked token ids live in the ``revoked_tokens`` table and in a per-worker
+dict, so checking a token is a single dict lookup. Each worker pulls rows
+revoked by other workers every TOKEN_REVOCATION_SYNC_SECONDS and drops ids
+whose tokens have expired; a revocation made elsewhere therefore takes
+effect within one sync interval, and immediately on the worker that made it.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import Gauge
+from app.models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+revoked_tokens_gauge = Gauge("lifetag_revoked_tokens", "Unexpired revoked token ids held in memory")
+
+# re-read a little history each sync so rows from transactions that committed
+# out of revoked_at order are not missed
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationList:
+    def __init__(self):
+        self._revoked: dict[str, datetime] = {}
+        self._synced_to: datetime | None = None
+        self._sync_task: asyncio.Task | None = None
+        revoked_tokens_gauge.set_function(lambda: len(self._revoked))
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    async def revoke(self, db: AsyncSession, jti: str, exp: int) -> bool:
+        """
+        Revoke a token id until its ``exp`` claim; the caller commits.
+
+        Returns False if the id was already revoked, which lets refresh-token
+        rotation reject a token presented twice concurrently.
+        """
+        expires_at = datetime.utcfromtimestamp(exp)
+        inserted = await db.scalar(
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            .returning(RevokedToken.jti)
+        )
+        self._revoked[jti] = expires_at
+        return inserted is not None
+
+    async def sync(self, db: AsyncSession) -> None:
+        now = datetime.utcnow()
+        query = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > now)
+        if self._synced_to is not None:
+            query = query.where(RevokedToken.revoked_at > self._synced_to - _SYNC_OVERLAP)
+        for jti, expires_at, revoked_at in (await db.execute(query)).all():
+            self._revoked[jti] = expires_at
+            if self._synced_to is None or revoked_at > self._synced_to:
+                self._synced_to = revoked_at
+        if self._synced_to is None:
+            self._synced_to = now
+
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await db.commit()
+
+    # ---------------------------------------------------------------
+    # Periodic sync
+    # ---------------------------------------------------------------
+    async def _sync_loop(self) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.sync(db)
+            except Exception:
+                logger.exception("Token revocation sync failed")
+            await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+
+    def start(self) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop(), name="token-revocation-sync")
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+
+revocation_list = RevocationList()
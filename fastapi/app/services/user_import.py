@@ -0,0 +1,295 @@
+"""
+Bulk user onboarding from CSV.
+
+The upload is read a batch of rows at a time (parsing runs in a thread), and
+each batch goes through the same steps a single signup does, but set-based:
+
+1. validate and normalize every row with the signup schema, and check string
+   values against the column lengths
+2. reject duplicates within the file, then check the batch against the
+   existing unique columns with one ``IN`` query per column
+3. hash the passwords across the password worker pool
+4. insert the batch with one multi-row ``INSERT ... ON CONFLICT DO NOTHING``
+   (a concurrent signup that wins a race is reported like any duplicate);
+   if the database still rejects a value, the batch is retried row by row
+   so only the offending rows fail
+5. queue the welcome mails with a single spool write
+
+Every rejected row is reported with its CSV line number and reasons. If the
+password pool is saturated by interactive traffic, the import stops after
+the last committed batch and returns a partial report (``complete`` is
+false) that marks where to resume.
+"""
+import asyncio
+import csv
+import io
+import logging
+import uuid
+from typing import Any, NamedTuple
+
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import DataError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import PasswordHashPoolBusy, hash_passwords_async
+from app.models.user import Farmer, Vet, Shelter
+from app.schemas.auth import FarmerCreate, VetCreate, ShelterCreate
+from app.services.dispatch import dispatcher
+from app.services.mailer import send_emails
+from app.services.welcome_mail import welcome_email
+
+logger = logging.getLogger(__name__)
+
+_MAX_BIND_PARAMS = 32767
+
+
+class ImportSpec(NamedTuple):
+    model: Any
+    schema: type[BaseModel]
+    id_attr: str
+    name_attr: str
+    email_attr: str
+    # (column, message) pairs, in the order the signup route checks them
+    unique: tuple[tuple[str, str], ...]
+
+
+IMPORT_SPECS = {
+    "farmer": ImportSpec(Farmer, FarmerCreate, "fid", "fname", "femail", (
+        ("faadhar", "Farmer already registered with this Aadhar"),
+        ("femail", "Email already registered"),
+    )),
+    "vet": ImportSpec(Vet, VetCreate, "vid", "vname", "vemail", (
+        ("vemail", "Email already registered"),
+        ("vlicense", "License number already registered"),
+    )),
+    "shelter": ImportSpec(Shelter, ShelterCreate, "sid", "sname", "semail", (
+        ("semail", "Email already registered"),
+        ("sregistration", "Registration number already exists"),
+    )),
+}
+
+
+def _read_batch(reader: csv.DictReader, size: int) -> list[tuple[int, dict]]:
+    rows = []
+    for row in reader:
+        rows.append((reader.line_num, row))
+        if len(rows) >= size:
+            break
+    return rows
+
+
+def _length_messages(model, values: dict) -> list[str]:
+    """String values longer than their column allows, which the INSERT would reject."""
+    messages = []
+    for col in model.__table__.columns:
+        v = values.get(col.key)
+        limit = getattr(col.type, "length", None)
+        if isinstance(v, str) and limit and len(v) > limit:
+            messages.append(f"{col.key}: String should have at most {limit} characters")
+    return messages
+
+
+def _validation_messages(error: ValidationError) -> list[str]:
+    messages = []
+    for err in error.errors():
+        field = ".".join(str(part) for part in err["loc"])
+        messages.append(f"{field}: {err['msg']}" if field else err["msg"])
+    return messages
+
+
+class UserImport:
+    def __init__(self, db: AsyncSession, role: str):
+        self.db = db
+        self.role = role
+        self.spec = IMPORT_SPECS[role]
+        self.seen: dict[str, set] = {column: set() for column, _ in self.spec.unique}
+        self.rows = 0
+        self.created = 0
+        self.errors: list[dict] = []
+        self.complete = True
+        # rows the database rejected outright, so they are not reported as duplicates
+        self.failed_ids: set = set()
+
+    def _reject(self, line: int, messages: list[str]) -> None:
+        self.errors.append({"line": line, "errors": messages})
+
+    async def run(self, upload: UploadFile) -> dict:
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            reader = csv.DictReader(text)
+            header = await asyncio.to_thread(lambda: reader.fieldnames)
+            required = {name for name, field in self.spec.schema.model_fields.items() if field.is_required()}
+            missing = sorted(required - set(header or ()))
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+            columns = len(self.spec.model.__table__.columns)
+            batch_size = max(1, min(settings.USER_IMPORT_BATCH_SIZE, _MAX_BIND_PARAMS // columns))
+            while True:
+                try:
+                    batch = await asyncio.to_thread(_read_batch, reader, batch_size)
+                except (UnicodeDecodeError, csv.Error) as e:
+                    # rows before this point are already imported; report where parsing stopped
+                    self._reject(reader.line_num + 1, [f"Unreadable CSV, import stopped here: {e}"])
+                    self.complete = False
+                    break
+                if not batch:
+                    break
+                if self.rows + len(batch) > settings.USER_IMPORT_MAX_ROWS:
+                    self._reject(batch[0][0], [f"Import is limited to {settings.USER_IMPORT_MAX_ROWS} rows; "
+                                               "this and later rows were not processed"])
+                    self.complete = False
+                    break
+                try:
+                    await self._import_batch(batch)
+                except PasswordHashPoolBusy:
+                    # nothing from this batch was written; report it and the rest as not processed
+                    await self.db.rollback()
+                    first_line = batch[0][0]
+                    self.errors = [e for e in self.errors if e["line"] < first_line]
+                    self._reject(first_line, ["Password hashing is busy; this and later rows were not "
+                                              "processed, retry them later"])
+                    self.complete = False
+                    break
+                self.rows += len(batch)
+        finally:
+            text.detach()
+
+        self.errors.sort(key=lambda e: e["line"])
+        return {
+            "role": self.role,
+            "rows": self.rows,
+            "created": self.created,
+            "failed": len(self.errors),
+            "complete": self.complete,
+            "errors": self.errors,
+        }
+
+    def _validate(self, batch: list[tuple[int, dict]]) -> list[tuple[int, BaseModel]]:
+        valid = []
+        for line, raw in batch:
+            if None in raw:
+                self._reject(line, ["Row has more fields than the header"])
+                continue
+            # blank cells mean "not provided", so optional columns fall back to their defaults
+            data = {k: v.strip() for k, v in raw.items() if v is not None and v.strip() != ""}
+            try:
+                payload = self.spec.schema(**data)
+            except ValidationError as e:
+                self._reject(line, _validation_messages(e))
+                continue
+            too_long = _length_messages(self.spec.model, payload.model_dump(exclude={"password"}))
+            if too_long:
+                self._reject(line, too_long)
+                continue
+
+            duplicates = [
+                f"{message} (duplicate in file)"
+                for column, message in self.spec.unique
+                if getattr(payload, column) in self.seen[column]
+            ]
+            if duplicates:
+                self._reject(line, duplicates)
+                continue
+            for column, _ in self.spec.unique:
+                self.seen[column].add(getattr(payload, column))
+            valid.append((line, payload))
+        return valid
+
+    async def _insert(self, records: list[dict]) -> set:
+        id_col = getattr(self.spec.model, self.spec.id_attr)
+        result = await self.db.execute(
+            insert(self.spec.model).values(records).on_conflict_do_nothing().returning(id_col)
+        )
+        inserted = set(result.scalars().all())
+        await self.db.commit()
+        return inserted
+
+    async def _insert_each(self, records: dict) -> set:
+        """Insert one row per transaction so a value the database rejects fails only its row."""
+        inserted = set()
+        for user_id, (line, record) in records.items():
+            try:
+                inserted |= await self._insert([record])
+            except DataError as e:
+                await self.db.rollback()
+                self.failed_ids.add(user_id)
+                self._reject(line, [f"Rejected by the database: {e.orig}"])
+        return inserted
+
+    async def _import_batch(self, batch: list[tuple[int, dict]]) -> None:
+        valid = self._validate(batch)
+        if not valid:
+            return
+
+        # one set-based query per unique column instead of per-row SELECTs
+        taken: dict[str, set] = {}
+        for column, _ in self.spec.unique:
+            col = getattr(self.spec.model, column)
+            values = [getattr(p, column) for _, p in valid]
+            taken[column] = set(await self.db.scalars(select(col).where(col.in_(values))))
+
+        fresh = []
+        for line, payload in valid:
+            conflicts = [message for column, message in self.spec.unique
+                         if getattr(payload, column) in taken[column]]
+            if conflicts:
+                self._reject(line, conflicts)
+            else:
+                fresh.append((line, payload))
+        if not fresh:
+            return
+
+        hashes = await hash_passwords_async([p.password for _, p in fresh])
+        records = {}
+        for (line, payload), password_hash in zip(fresh, hashes):
+            record = payload.model_dump(exclude={"password"})
+            record[self.spec.id_attr] = uuid.uuid4()
+            record["password_hash"] = password_hash
+            records[record[self.spec.id_attr]] = (line, record)
+
+        try:
+            inserted = await self._insert([record for _, record in records.values()])
+        except DataError:
+            await self.db.rollback()
+            inserted = await self._insert_each(records)
+
+        created = []
+        for user_id, (line, record) in records.items():
+            if user_id in inserted:
+                created.append(record)
+            elif user_id not in self.failed_ids:
+                self._reject(line, ["Already registered"])
+        self.created += len(created)
+
+        if self.role == "shelter":
+            for record in created:
+                dispatcher.add_shelter(record["sid"], record.get("slatitude"), record.get("slongitude"),
+                                       record["scapacity"])
+        if not created:
+            return
+        try:
+            await send_emails(
+                welcome_email(self.role, r[self.spec.name_attr], r[self.spec.email_attr]) for r in created
+            )
+        except Exception:
+            logger.exception("Failed to queue %d welcome email(s) for imported %ss", len(created), self.role)
+
+
+async def import_users(db: AsyncSession, role: str, upload: UploadFile) -> dict:
+    """Import a CSV of ``role`` accounts; raises ValueError for an unusable file."""
+    return await UserImport(db, role).run(upload)
+
+
+def error_report_csv(report: dict) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["line", "error"])
+    for entry in report["errors"]:
+        for message in entry["errors"]:
+            writer.writerow([entry["line"], message])
+    return out.getvalue()
@@ -0,0 +1,70 @@
+"""
+Welcome emails sent after a user account is created.
+
+``welcome_email`` returns a (subject, to_email, body, is_html) tuple so the
+same message can go through ``send_email`` for one signup or ``send_emails``
+for a bulk import.
+"""
+import html
+
+FARMER_WELCOME_SUBJECT = "Welcome to LifeTag – Your Farmer Registration is Successful"
+VET_WELCOME_SUBJECT = "Welcome to LifeTag - Veterinarian Account"
+SHELTER_WELCOME_SUBJECT = "Welcome to LifeTag - Shelter Account"
+
+
+def _farmer_welcome_html(name: str) -> str:
+    safe_name = html.escape(name)
+    return f"""
+    <!DOCTYPE html>
+    <html>
+      <body style="font-family: Arial, sans-serif; background-color: #f4f7fa; padding: 20px;">
+        <div style="max-width: 600px; margin: auto; background-color: #ffffff; border-radius: 10px; padding: 25px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+          <div style="text-align: center;">
+            <img src="https://upload.wikimedia.org/wikipedia/commons/6/6b/Cow_icon.png" alt="LifeTag Logo" width="60" />
+            <h2 style="color: #2c7be5;">Welcome to LifeTag</h2>
+            <p style="color: #444;">Empowering Farmers • Ensuring Livestock Welfare</p>
+          </div>
+          <hr style="margin: 20px 0;">
+          <p>Dear <b>{safe_name}</b>,</p>
+          <p>We are delighted to inform you that your <b>LifeTag Farmer Account</b> has been successfully created. You are now part of India’s growing digital livestock ecosystem aimed at ensuring traceability, welfare, and transparency.</p>
+
+          <p>With your LifeTag account, you can now:</p>
+          <ul>
+            <li>Access your registered cattle details and vaccination records.</li>
+            <li>Update ownership and track health history.</li>
+            <li>Connect with veterinary officers and nearby shelters.</li>
+            <li>Receive notifications about upcoming vaccinations and welfare schemes.</li>
+          </ul>
+
+          <p style="margin-top: 20px;">You can log in anytime at:  
+            <a href="https://lifetag.in/login" style="color: #2c7be5; text-decoration: none;">https://lifetag.in/login</a>
+          </p>
+
+          <p>If you have any questions or need assistance, feel free to contact our support team at  
+            <a href="mailto:support@lifetag.in">support@lifetag.in</a>.
+          </p>
+
+          <p style="margin-top: 30px;">Warm regards,<br>
+          <b>The LifeTag Support Team</b><br>
+          Department of Digital Livestock Management<br>
+          Ministry of Animal Husbandry & Dairying (Prototype)</p>
+
+          <hr style="margin: 30px 0;">
+          <p style="font-size: 12px; color: #888; text-align: center;">
+            This is an auto-generated email. Please do not reply.<br>
+            © 2025 LifeTag. All Rights Reserved.
+          </p>
+        </div>
+      </body>
+    </html>
+    """
+
+
+def welcome_email(role: str, name: str, email: str) -> tuple[str, str, str, bool]:
+    if role == "farmer":
+        return FARMER_WELCOME_SUBJECT, email, _farmer_welcome_html(name), True
+    if role == "vet":
+        return VET_WELCOME_SUBJECT, email, f"Hello Dr. {name}, your vet account has been created.", False
+    if role == "shelter":
+        return SHELTER_WELCOME_SUBJECT, email, f"Hello {name}, your shelter account has been created.", False
+    raise ValueError(f"Unknown role: {role}")
@@ -1,12 +1,20 @@
+import asyncio
+import hashlib
 import os
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
-from datetime import datetime
+from app.core.metrics import Counter, Histogram
 from pathlib import Path
+from typing import NamedTuple
 import uuid
 
 ALLOWED_EXT = {"png", "jpg", "jpeg", "gif"}
 
+upload_bytes = Histogram(
+    "lifetag_upload_bytes", "Size of stored uploads",
+    buckets=(16e3, 64e3, 256e3, 512e3, 1e6, 2e6, 4e6, 8e6, 16e6, 32e6))
+uploads_deduplicated = Counter("lifetag_uploads_deduplicated", "Uploads whose content was already stored")
+
 
 def allowed_file(filename: str) -> bool:
     if not filename or "." not in filename:
@@ -15,17 +23,98 @@ def allowed_file(filename: str) -> bool:
     return ext in ALLOWED_EXT
 
 
-async def save_upload_file(upload_file: UploadFile, folder: str = None) -> str:
+class StoredFile(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    created: bool  # False when identical content was already stored
+    tmp_path: str | None = None  # staged upload not yet moved to ``path``
+
+
+def _content_path(folder: str, digest: str) -> str:
+    # keyed on the digest alone, like photo_blobs, so the same bytes uploaded
+    # as .png and .jpg share one file; two levels of 256-way sharding keep
+    # every directory small
+    return os.path.join(folder, digest[:2], digest[2:4], digest)
+
+
+def _write_chunk(fh, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    fh.write(chunk)
+
+
+def _open_temp(folder: str) -> tuple:
+    incoming = os.path.join(folder, ".incoming")
+    os.makedirs(incoming, exist_ok=True)
+    tmp_path = os.path.join(incoming, f"{uuid.uuid4().hex}.part")
+    return tmp_path, open(tmp_path, "wb")
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _commit_temp(tmp_path: str, final_path: str) -> bool:
+    """Move the upload into place; returns False if the content already existed."""
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    if os.path.exists(final_path):
+        _discard(tmp_path)
+        return False
+    os.replace(tmp_path, final_path)
+    return True
+
+
+def commit_upload(stored: StoredFile) -> StoredFile:
+    """Move a staged upload to its content path (blocking; run in a thread)."""
+    if stored.tmp_path is None:
+        return stored
+    created = _commit_temp(stored.tmp_path, stored.path)
+    if not created:
+        uploads_deduplicated.inc()
+    return stored._replace(created=created, tmp_path=None)
+
+
+def discard_upload(stored: StoredFile) -> None:
+    """Remove a staged upload that was never committed."""
+    if stored.tmp_path is not None:
+        _discard(stored.tmp_path)
+
+
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def image_media_type(path: str) -> str:
+    """Media type from the file's magic bytes; content paths carry no extension."""
+    with open(path, "rb") as fh:
+        head = fh.read(8)
+    for signature, media_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    return "application/octet-stream"
+
+
+async def store_upload_file(upload_file: UploadFile, folder: str = None) -> StoredFile:
     """
-    Save an UploadFile to disk using a safe generated filename.
+    Stream an UploadFile into a staging file and hash it.
     - strips any path components from the provided filename
     - enforces allowed extensions
     - enforces maximum upload size from settings.MAX_UPLOAD_SIZE_MB
-    - writes file in chunks to avoid loading large files wholly into memory
-    Returns absolute path to saved file.
+    - hashes and writes each chunk in a worker thread so the event loop never blocks on disk
+
+    The returned ``path`` is <folder>/<h[:2]>/<h[2:4]>/<sha256>, but the bytes
+    stay in ``tmp_path`` until ``add_photo_reference`` moves them there while
+    holding the photo_blobs row lock (see app.services.photos). Callers that
+    do not go on to commit must call ``discard_upload``.
     """
     folder = folder or settings.UPLOAD_FOLDER
-    Path(folder).mkdir(parents=True, exist_ok=True)
 
     original_name = Path(upload_file.filename).name
     if "." not in original_name:
@@ -33,35 +122,42 @@ async def save_upload_file(upload_file: UploadFile, folder: str = None) -> str:
     ext = original_name.rsplit(".", 1)[1].lower()
     if ext not in ALLOWED_EXT:
         raise HTTPException(status_code=400, detail="Invalid file type")
-    
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    unique = uuid.uuid4().hex
-    safe_name = f"{timestamp}_{unique}.{ext}"
-    path = os.path.join(folder, safe_name)
 
     max_mb = getattr(settings, "MAX_UPLOAD_SIZE_MB", 16)
     max_bytes = int(max_mb) * 1024 * 1024
 
+    hasher = hashlib.sha256()
     size = 0
+    tmp_path, buffer = await asyncio.to_thread(_open_temp, folder)
     try:
-        with open(path, "wb") as buffer:
+        try:
             while True:
                 chunk = await upload_file.read(1024 * 1024)  # 1MB
                 if not chunk:
                     break
                 size += len(chunk)
                 if size > max_bytes:
-                    buffer.close()
-                    try:
-                        os.remove(path)
-                    except Exception:
-                        pass
                     raise HTTPException(status_code=413, detail="Uploaded file is too large")
-                buffer.write(chunk)
+                await asyncio.to_thread(_write_chunk, buffer, hasher, chunk)
+        finally:
+            await asyncio.to_thread(buffer.close)
+    except BaseException:
+        await asyncio.to_thread(_discard, tmp_path)
+        raise
     finally:
         try:
             await upload_file.seek(0)
         except Exception:
             pass
 
-    return path
+    digest = hasher.hexdigest()
+    upload_bytes.observe(size)
+    return StoredFile(path=_content_path(folder, digest), sha256=digest, size=size, created=False,
+                      tmp_path=tmp_path)
+
+
+async def save_upload_file(upload_file: UploadFile, folder: str = None) -> str:
+    """Store an untracked upload (not reference counted) and return its path."""
+    stored = await store_upload_file(upload_file, folder)
+    stored = await asyncio.to_thread(commit_upload, stored)
+    return stored.path
@@ -0,0 +1,116 @@
+"""
+Geo helpers: haversine distance and integer geohash-style grid cells.
+
+A cell id interleaves quantized longitude and latitude bits (longitude
+first, like geohash), so every prefix of a cell id is itself a coarser
+cell. A coarse cell therefore maps to one contiguous range of full-precision
+ids, and a bounding box can be covered by a few B-tree range scans.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GEO_CELL_BITS = 52  # 26 bits per axis, well under a metre of precision
+
+
+def valid_coordinates(lat: float | None, lon: float | None) -> bool:
+    return lat is not None and lon is not None and -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """
+    (min_lat, min_lon, max_lat, max_lon) enclosing a circle.
+
+    A box that crosses the antimeridian comes back with min_lon > max_lon;
+    ``split_box`` turns it into boxes that do not.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat < 1e-9 or dlat / cos_lat >= 180.0:
+        # the circle reaches a pole or wraps the globe: every longitude is in range
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = dlat / cos_lat
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def split_box(min_lat: float, min_lon: float, max_lat: float,
+              max_lon: float) -> list[tuple[float, float, float, float]]:
+    """One box, or two when it crosses the antimeridian (min_lon > max_lon)."""
+    if min_lon <= max_lon:
+        return [(min_lat, min_lon, max_lat, max_lon)]
+    return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+
+
+def _quantize(value: float, low: float, high: float, bits: int) -> int:
+    n = 1 << bits
+    i = int((value - low) / (high - low) * n)
+    return min(max(i, 0), n - 1)
+
+
+def _interleave(lon_idx: int, lat_idx: int, bits: int) -> int:
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    code = 0
+    for i in range(bits):
+        if i % 2 == 0:
+            bit = (lon_idx >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (lat_idx >> (lat_bits - 1 - i // 2)) & 1
+        code = (code << 1) | bit
+    return code
+
+
+def encode_cell(lat: float, lon: float, bits: int = GEO_CELL_BITS) -> int:
+    lon_idx = _quantize(lon, -180.0, 180.0, (bits + 1) // 2)
+    lat_idx = _quantize(lat, -90.0, 90.0, bits // 2)
+    return _interleave(lon_idx, lat_idx, bits)
+
+
+def cover_ranges(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                 max_cells: int = 16) -> list[tuple[int, int]]:
+    """
+    Half-open [lo, hi) ranges of full-precision cell ids covering a box.
+
+    Picks the finest prefix length whose cells still cover the box with at
+    most ``max_cells`` cells, then merges adjacent ranges.
+    """
+    def span(bits: int):
+        lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+        lons = range(_quantize(min_lon, -180.0, 180.0, lon_bits), _quantize(max_lon, -180.0, 180.0, lon_bits) + 1)
+        lats = range(_quantize(min_lat, -90.0, 90.0, lat_bits), _quantize(max_lat, -90.0, 90.0, lat_bits) + 1)
+        return lons, lats
+
+    bits = 0
+    for candidate in range(1, GEO_CELL_BITS + 1):
+        lons, lats = span(candidate)
+        if len(lons) * len(lats) > max_cells:
+            break
+        bits = candidate
+    if bits == 0:
+        return [(0, 1 << GEO_CELL_BITS)]
+
+    lons, lats = span(bits)
+    shift = GEO_CELL_BITS - bits
+    prefixes = sorted(_interleave(x, y, bits) for x in lons for y in lats)
+    ranges: list[tuple[int, int]] = []
+    for p in prefixes:
+        lo, hi = p << shift, (p + 1) << shift
+        if ranges and ranges[-1][1] == lo:
+            ranges[-1] = (ranges[-1][0], hi)
+        else:
+            ranges.append((lo, hi))
+    return ranges
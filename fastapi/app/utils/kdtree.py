@@ -0,0 +1,128 @@
+"""
+KD-tree over points on the sphere with per-key remaining capacity.
+
+Points are stored as 3D unit vectors, so straight-line (chord) distance is
+monotonic with great-circle distance and no special handling is needed near
+the poles or the antimeridian. Keys with no capacity left stay in the tree
+but are never returned; ``rebuild`` rebalances the tree from scratch.
+"""
+import math
+from typing import Hashable, Iterable
+
+from app.utils.geo import EARTH_RADIUS_KM
+
+
+def to_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    p = math.radians(lat)
+    l = math.radians(lon)
+    c = math.cos(p)
+    return (c * math.cos(l), c * math.sin(l), math.sin(p))
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class _Node:
+    __slots__ = ("point", "key", "axis", "left", "right", "alive")
+
+    def __init__(self, point, key, axis):
+        self.point = point
+        self.key = key
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.alive = True
+
+
+class CapacityKDTree:
+    def __init__(self):
+        self._root: _Node | None = None
+        self._nodes: dict[Hashable, _Node] = {}
+        self.capacity: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def rebuild(self, items: Iterable[tuple[Hashable, float, float, int]]) -> None:
+        """Replace the contents with (key, lat, lon, remaining) items, balanced."""
+        entries = [(to_unit_vector(lat, lon), key, remaining) for key, lat, lon, remaining in items]
+        self._nodes = {}
+        self.capacity = {key: remaining for _, key, remaining in entries}
+
+        def build(chunk, depth):
+            if not chunk:
+                return None
+            axis = depth % 3
+            chunk.sort(key=lambda e: e[0][axis])
+            mid = len(chunk) // 2
+            node = _Node(chunk[mid][0], chunk[mid][1], axis)
+            self._nodes[node.key] = node
+            node.left = build(chunk[:mid], depth + 1)
+            node.right = build(chunk[mid + 1:], depth + 1)
+            return node
+
+        self._root = build(entries, 0)
+
+    def upsert(self, key: Hashable, lat: float, lon: float, remaining: int) -> None:
+        """Insert a key or move it; the tree is rebalanced on the next rebuild."""
+        point = to_unit_vector(lat, lon)
+        self.capacity[key] = remaining
+        old = self._nodes.get(key)
+        if old is not None:
+            if old.point == point:
+                return
+            old.alive = False
+
+        if self._root is None:
+            node = self._root = _Node(point, key, 0)
+        else:
+            parent = self._root
+            while True:
+                side = "left" if point[parent.axis] < parent.point[parent.axis] else "right"
+                child = getattr(parent, side)
+                if child is None:
+                    node = _Node(point, key, (parent.axis + 1) % 3)
+                    setattr(parent, side, node)
+                    break
+                parent = child
+        self._nodes[key] = node
+
+    def remove(self, key: Hashable) -> None:
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            node.alive = False
+        self.capacity.pop(key, None)
+
+    def adjust(self, key: Hashable, delta: int) -> None:
+        if key in self.capacity:
+            self.capacity[key] += delta
+
+    def nearest_available(self, lat: float, lon: float) -> tuple[Hashable, float] | None:
+        """(key, distance_km) of the closest key with capacity left, or None."""
+        target = to_unit_vector(lat, lon)
+        tx, ty, tz = target
+        capacity = self.capacity
+        best_key = None
+        best_d2 = math.inf
+        # (node, lower bound on squared distance to anything in its subtree)
+        stack = [(self._root, 0.0)] if self._root is not None else []
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_d2:
+                continue
+            px, py, pz = node.point
+            d2 = (px - tx) ** 2 + (py - ty) ** 2 + (pz - tz) ** 2
+            if d2 < best_d2 and node.alive and capacity.get(node.key, 0) > 0:
+                best_d2 = d2
+                best_key = node.key
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            # push far first so the near side is explored first
+            if far is not None and diff * diff < best_d2:
+                stack.append((far, diff * diff))
+            if near is not None:
+                stack.append((near, 0.0))
+        if best_key is None:
+            return None
+        return best_key, chord_to_km(math.sqrt(best_d2))
@@ -0,0 +1,30 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(*values) -> str:
+    """Pack keyset values (datetimes, UUIDs, numbers, strings) into an opaque token."""
+    packed = []
+    for v in values:
+        if isinstance(v, datetime):
+            packed.append(v.isoformat())
+        elif isinstance(v, uuid.UUID):
+            packed.append(v.hex)
+        else:
+            packed.append(v)
+    raw = json.dumps(packed, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    """Inverse of encode_cursor; raises ValueError on a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list):
+        raise ValueError("Malformed cursor")
+    return values
@@ -0,0 +1,17 @@
+"""Placeholder settings so app modules import without a .env; benchmarks never use them."""
+import os
+
+_DEFAULTS = {
+    "SECRET_KEY": "bench",
+    "DB_USER": "bench",
+    "DB_PASSWORD": "bench",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "bench",
+    "DATABASE_URL": "postgresql+asyncpg://bench@localhost/bench",
+    "MAIL_SERVER": "localhost",
+    "MAIL_PORT": "25",
+}
+
+for _key, _value in _DEFAULTS.items():
+    os.environ.setdefault(_key, _value)
@@ -0,0 +1,60 @@
+"""
+Per-request authentication cost: token check vs. re-verifying a password.
+
+Times what get_current_user does on a warm worker (JWT verification,
+revocation lookup, current-user cache hit) against one bcrypt verify, which
+is what re-posting credentials costs. Needs no database.
+
+    cd fastapi && python -m benchmarks.bench_auth --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from benchmarks import _env  # noqa: F401
+from app.core.security import ACCESS_TOKEN, create_access_token, decode_token, hash_password, verify_password
+from app.services.cache import user_cache
+from app.services.token_revocation import revocation_list
+
+
+async def _token_path(token: str, n: int) -> list[float]:
+    async def load():
+        return {"name": "bench", "email": "bench@example.com"}
+
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        claims = decode_token(token, ACCESS_TOKEN)
+        revocation_list.is_revoked(claims["jti"])
+        await user_cache.get_or_load(f"{claims['role']}:{claims['sub']}", load)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def _report(name: str, latencies: list[float]) -> None:
+    q = statistics.quantiles(sorted(latencies), n=100)
+    print(f"{name:<10} p50={q[49] * 1e6:,.1f}us p95={q[94] * 1e6:,.1f}us p99={q[98] * 1e6:,.1f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--bcrypt-samples", type=int, default=20)
+    args = parser.parse_args()
+
+    token, _ = create_access_token(uuid.uuid4(), "farmer")
+    _report("token", asyncio.run(_token_path(token, args.requests)))
+
+    hashed = hash_password("correct horse battery staple")
+    latencies = []
+    for _ in range(args.bcrypt_samples):
+        t0 = time.perf_counter()
+        verify_password("correct horse battery staple", hashed)
+        latencies.append(time.perf_counter() - t0)
+    _report("bcrypt", latencies)
+
+
+if __name__ == "__main__":
+    main()
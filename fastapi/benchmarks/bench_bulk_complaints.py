@@ -0,0 +1,116 @@
+"""
+Complaint ingestion rows/s, single-insert form endpoint vs the batch endpoint.
+
+Boots the app in-process against the local Postgres from
+benchmarks/docker-compose.yml (same defaults as benchmarks.loadtest) and
+creates the same number of complaints twice: one multipart POST
+/complaints/cattle per complaint, then JSON arrays to
+/complaints/cattle/batch. Both run at the same client concurrency; the
+target for the batch path is at least 10x the single path's rows/s.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    cd fastapi && python -m benchmarks.bench_bulk_complaints --create-schema --records 2000 --batch 500
+"""
+from benchmarks import loadtest  # noqa: F401  (local Postgres defaults; must precede app imports)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import random  # noqa: E402
+import time  # noqa: E402
+
+import httpx  # noqa: E402
+
+
+def _complaint(rng: random.Random) -> dict:
+    return {
+        "reporter_name": "Bulk Bench",
+        "reporter_phone": "9876543210",
+        "reporter_email": "bulk-reporter@example.com",
+        "reporter_location": "Pune",
+        "cattle_count": rng.randint(1, 5),
+        "cattle_type": rng.choice(["Cow", "Bull", "Calf"]),
+        "cattle_condition": rng.choice(["Injured", "Sick", "Stray"]),
+        "description": "Generated by benchmarks.bench_bulk_complaints",
+        "exact_location": "Near the market",
+        "gps_latitude": round(rng.uniform(8.0, 30.0), 6),
+        "gps_longitude": round(rng.uniform(70.0, 88.0), 6),
+    }
+
+
+async def _run_jobs(jobs, concurrency: int) -> float:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(job):
+        async with slots:
+            await job()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(job) for job in jobs))
+    return time.perf_counter() - start
+
+
+async def single(client: httpx.AsyncClient, records: list[dict], concurrency: int) -> float:
+    def job(record):
+        async def post():
+            r = await client.post("/api/complaints/cattle", data={k: str(v) for k, v in record.items()})
+            assert r.status_code == 201, r.text
+        return post
+
+    return await _run_jobs([job(r) for r in records], concurrency)
+
+
+async def batched(client: httpx.AsyncClient, records: list[dict], batch: int, concurrency: int) -> float:
+    def job(chunk):
+        async def post():
+            r = await client.post("/api/complaints/cattle/batch", json=chunk)
+            assert r.status_code == 200 and r.json()["created"] == len(chunk), r.text
+        return post
+
+    chunks = [records[i:i + batch] for i in range(0, len(records), batch)]
+    return await _run_jobs([job(c) for c in chunks], concurrency)
+
+
+async def _main(args) -> None:
+    from app.main import app
+
+    if args.create_schema:
+        from app.db.base import Base
+        from app.db.session import engine
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await app.router.startup()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+    rng = random.Random(args.seed)
+    try:
+        # warm the pool and caches on both paths before measuring
+        await single(client, [_complaint(rng) for _ in range(20)], args.concurrency)
+        await batched(client, [_complaint(rng) for _ in range(20)], args.batch, args.concurrency)
+
+        one_by_one = await single(client, [_complaint(rng) for _ in range(args.records)], args.concurrency)
+        in_batches = await batched(client, [_complaint(rng) for _ in range(args.records)], args.batch,
+                                   args.concurrency)
+    finally:
+        await client.aclose()
+        await app.router.shutdown()
+
+    single_rate, batch_rate = args.records / one_by_one, args.records / in_batches
+    print(f"single   {args.records} rows in {one_by_one:6.2f}s  {single_rate:10,.0f} rows/s")
+    print(f"batch    {args.records} rows in {in_batches:6.2f}s  {batch_rate:10,.0f} rows/s  "
+          f"({args.batch} per request)")
+    print(f"speedup  {batch_rate / single_rate:.1f}x (target 10x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables before the run")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500, help="complaints per batch request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
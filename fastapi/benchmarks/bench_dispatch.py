@@ -0,0 +1,61 @@
+"""
+Dispatch assignment throughput.
+
+Builds a shelter index spread over India and assigns synthetic complaints
+to the nearest shelter with free capacity, the same way
+DispatchEngine.assign does. Pure CPU; needs no database or settings.
+
+    cd fastapi && python -m benchmarks.bench_dispatch --shelters 5000 --complaints 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.utils.kdtree import CapacityKDTree
+
+# rough bounding box of mainland India
+LAT_RANGE = (8.0, 35.0)
+LON_RANGE = (68.0, 97.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shelters", type=int, default=5000)
+    parser.add_argument("--complaints", type=int, default=100_000)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = CapacityKDTree()
+    start = time.perf_counter()
+    index.rebuild(
+        (i, rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE), rng.randint(1, args.capacity))
+        for i in range(args.shelters)
+    )
+    build_ms = (time.perf_counter() - start) * 1000
+
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.complaints)]
+    latencies = []
+    unassigned = 0
+    start = time.perf_counter()
+    for lat, lon in points:
+        t0 = time.perf_counter()
+        picked = index.nearest_available(lat, lon)
+        if picked is None:
+            unassigned += 1
+        else:
+            index.adjust(picked[0], -1)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    print(f"shelters={args.shelters} complaints={args.complaints} build={build_ms:.1f}ms")
+    print(f"throughput={args.complaints / elapsed:,.0f} assignments/s unassigned={unassigned}")
+    print(f"latency p50={q[49] * 1e6:.1f}us p95={q[94] * 1e6:.1f}us p99={q[98] * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
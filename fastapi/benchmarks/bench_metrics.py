@@ -0,0 +1,75 @@
+"""
+Overhead of request metrics.
+
+Drives a trivial FastAPI route through ASGI directly (no sockets), with and
+without HTTPMetricsMiddleware, and reports the added cost per request. Also
+times rendering the /metrics payload. Needs no database.
+
+    cd fastapi && python -m benchmarks.bench_metrics --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import _env  # noqa: F401
+from fastapi import FastAPI
+
+from app.core.http_metrics import HTTPMetricsMiddleware
+from app.core.metrics import render_prometheus
+
+
+def _build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/complaints/cattle/{complaint_id}")
+    async def detail(complaint_id: str):
+        return {"complaint_id": complaint_id}
+
+    if with_metrics:
+        app.add_middleware(HTTPMetricsMiddleware)
+    return app
+
+
+async def _drive(app, n: int) -> list[float]:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    latencies = []
+    for i in range(n):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/complaints/cattle/{i}", "raw_path": b"", "query_string": b"",
+            "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        t0 = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    results = {}
+    for label, with_metrics in (("baseline", False), ("metrics", True)):
+        app = _build_app(with_metrics)
+        asyncio.run(_drive(app, 1000))  # warm up
+        latencies = asyncio.run(_drive(app, args.requests))
+        results[label] = statistics.median(latencies)
+        q = statistics.quantiles(latencies, n=100)
+        print(f"{label:<9} p50={q[49] * 1e6:.1f}us p99={q[98] * 1e6:.1f}us")
+    print(f"overhead  p50={(results['metrics'] - results['baseline']) * 1e6:.1f}us/request")
+
+    start = time.perf_counter()
+    payload = render_prometheus()
+    print(f"render    {(time.perf_counter() - start) * 1000:.2f}ms for {len(payload.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
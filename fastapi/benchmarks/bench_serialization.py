@@ -0,0 +1,130 @@
+"""
+Complaint list page: ORM entities + dicts + jsonable_encoder + json
+(the old read path) against column projection + orjson (the current one).
+
+Runs the real queries against an in-memory SQLite copy of the schema, so
+row fetching and ORM hydration are included; tracemalloc reports the bytes
+allocated per page.
+
+    cd fastapi && python -m benchmarks.bench_serialization --rows 5000 --per-page 50
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks import _env  # noqa: F401  (must precede app imports)
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.api.v1.complaints import LIST_COLUMNS, _list_item  # noqa: E402
+from app.models.complaint import CattleComplaint  # noqa: E402
+
+
+def setup(rows: int):
+    engine = create_engine("sqlite://")
+    # SQLite has no tsvector or foreign shelters table; the list query touches neither
+    Table("cattle_complaints", MetaData(), *(
+        Column(c.name, c.type, primary_key=c.primary_key)
+        for c in CattleComplaint.__table__.columns if c.name != "search_vector"
+    )).create(engine)
+    rng = random.Random(1)
+    now = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(CattleComplaint), [{
+            "complaint_id": uuid.uuid4(),
+            "reporter_name": "Reporter %d" % i,
+            "reporter_phone": "98765%05d" % i,
+            "reporter_email": "r%d@example.com" % i,
+            "reporter_location": "Village %d" % i,
+            "cattle_count": rng.randint(1, 9),
+            "cattle_type": "cow",
+            "cattle_condition": "injured",
+            "description": "x" * rng.randint(200, 2000),
+            "photo_path": "uploads/ab/cd/%064x.jpg" % i,
+            "spotted_date": now - timedelta(minutes=i),
+            "exact_location": "Near the old temple, ward %d" % i,
+            "gps_latitude": rng.uniform(8, 35),
+            "gps_longitude": rng.uniform(68, 97),
+            "complaint_status": "Open",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        } for i in range(rows)])
+    return engine
+
+
+def old_page(engine, offset, per_page) -> bytes:
+    with Session(engine) as db:
+        items = db.execute(
+            select(CattleComplaint).order_by(CattleComplaint.created_at.desc()).offset(offset).limit(per_page)
+        ).scalars().all()
+        res = [{
+            "complaint_id": str(c.complaint_id),
+            "reporter_name": c.reporter_name,
+            "reporter_phone": c.reporter_phone,
+            "reporter_email": c.reporter_email,
+            "cattle_count": c.cattle_count,
+            "cattle_type": c.cattle_type,
+            "cattle_condition": c.cattle_condition,
+            "exact_location": c.exact_location,
+            "spotted_date": c.spotted_date.isoformat(),
+            "status": c.complaint_status,
+            "created_at": c.created_at.isoformat(),
+            "has_photo": bool(c.photo_path),
+            "photo_url": f"/api/complaints/cattle/{c.complaint_id}/photo?variant=thumb" if c.photo_path else None,
+        } for c in items]
+        content = jsonable_encoder({"complaints": res, "total": 0, "page": 1})
+        # what starlette's JSONResponse.render does
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def new_page(engine, offset, per_page) -> bytes:
+    with Session(engine) as db:
+        rows = db.execute(
+            select(*LIST_COLUMNS).order_by(CattleComplaint.created_at.desc()).offset(offset).limit(per_page)
+        ).all()
+        return orjson.dumps({"complaints": [_list_item(r) for r in rows], "total": 0, "page": 1})
+
+
+def run(fn, engine, pages, per_page, rows):
+    offsets = [(i * per_page) % max(1, rows - per_page) for i in range(pages)]
+    fn(engine, 0, per_page)  # warm up statement caches
+    start = time.perf_counter()
+    for off in offsets:
+        fn(engine, off, per_page)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn(engine, offsets[-1], per_page)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return elapsed / pages * 1e6, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = setup(args.rows)
+    results = {}
+    for name, fn in (("orm+json", old_page), ("projection+orjson", new_page)):
+        results[name] = run(fn, engine, args.pages, args.per_page, args.rows)
+        us, peak = results[name]
+        print(f"{name:>18}: {us:8.1f} us/page  peak alloc {peak / 1024:8.1f} KiB/page")
+    (old_us, old_peak), (new_us, new_peak) = results.values()
+    print(f"{'speedup':>18}: {old_us / new_us:.2f}x CPU, {old_peak / new_peak:.2f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Telemetry ingestion parse throughput, NDJSON vs JSON array vs msgpack.
+
+Builds batches of realistic readings in each encoding and times
+parse_ndjson / parse_json_array / parse_msgpack, which is the per-request
+CPU cost of the ingestion endpoint before rows reach the buffer. Needs no
+database.
+
+    cd fastapi && python -m benchmarks.bench_telemetry --batch 2000 --batches 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks import _env  # noqa: F401
+import msgpack
+import orjson
+from app.services.telemetry import parse_json_array, parse_msgpack, parse_ndjson
+
+
+def _readings(n: int, compact: bool) -> list:
+    now = time.time()
+    readings = []
+    for i in range(n):
+        values = (f"TAG-{i % 500:05d}", round(now - random.uniform(0, 60), 3),
+                  round(random.gauss(38.6, 0.4), 2), random.randint(0, 200), random.randint(0, 60))
+        if compact:
+            readings.append(list(values))
+        else:
+            readings.append(dict(zip(("tag_id", "timestamp", "temperature", "activity", "rumination"), values)))
+    return readings
+
+
+def _time(name: str, parse, body: bytes, batch: int, batches: int) -> None:
+    latencies = []
+    for _ in range(batches):
+        t0 = time.perf_counter()
+        result = parse(body)
+        latencies.append(time.perf_counter() - t0)
+        assert len(result.rows) == batch, result.errors[:3]
+    q = statistics.quantiles(sorted(latencies), n=100)
+    rate = batch / statistics.median(latencies)
+    print(f"{name:<16} {len(body) / batch:5.1f} B/reading  p50={q[49] * 1000:.2f}ms "
+          f"p95={q[94] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms  {rate:,.0f} readings/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--batches", type=int, default=50)
+    args = parser.parse_args()
+
+    for compact in (False, True):
+        label = "compact" if compact else "object"
+        readings = _readings(args.batch, compact)
+        ndjson = b"\n".join(orjson.dumps(r) for r in readings)
+        _time(f"ndjson/{label}", parse_ndjson, ndjson, args.batch, args.batches)
+        _time(f"json/{label}", parse_json_array, orjson.dumps(readings), args.batch, args.batches)
+        _time(f"msgpack/{label}", parse_msgpack, msgpack.packb(readings), args.batch, args.batches)
+
+
+if __name__ == "__main__":
+    main()
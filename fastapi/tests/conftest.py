@@ -0,0 +1,17 @@
+"""Placeholder settings so app modules import without a .env; tests never connect."""
+import os
+
+_DEFAULTS = {
+    "SECRET_KEY": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DATABASE_URL": "postgresql+asyncpg://test@localhost/test",
+    "MAIL_SERVER": "localhost",
+    "MAIL_PORT": "25",
+}
+
+for _key, _value in _DEFAULTS.items():
+    os.environ.setdefault(_key, _value)
@@ -0,0 +1,102 @@
+import asyncio
+
+from app.services.cache import TieredCache
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_load_is_cached_until_invalidated():
+    cache = TieredCache("test")
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return len(loads)
+
+    async def scenario():
+        assert await cache.get_or_load("k", loader) == 1
+        assert await cache.get_or_load("k", loader) == 1
+        await cache.invalidate("k")
+        assert await cache.get_or_load("k", loader) == 2
+
+    _run(scenario())
+
+
+def test_load_that_raced_an_invalidation_is_not_cached():
+    cache = TieredCache("test")
+    calls = []
+
+    async def stale_loader():
+        calls.append("stale")
+        # a writer commits and invalidates while this read is in flight
+        await cache.invalidate("k")
+        return "before write"
+
+    async def fresh_loader():
+        calls.append("fresh")
+        return "after write"
+
+    async def scenario():
+        assert await cache.get_or_load("k", stale_loader) == "before write"
+        assert await cache.get_or_load("k", fresh_loader) == "after write"
+        assert await cache.get_or_load("k", fresh_loader) == "after write"
+
+    _run(scenario())
+    assert calls == ["stale", "fresh"]
+
+
+def test_concurrent_loads_around_an_invalidation():
+    cache = TieredCache("test")
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_loader():
+        started.set()
+        await release.wait()
+        return "old"
+
+    async def new_loader():
+        return "new"
+
+    async def scenario():
+        reader = asyncio.create_task(cache.get_or_load("k", slow_loader))
+        await started.wait()
+        await cache.invalidate("k")
+        release.set()
+        assert await reader == "old"
+        # the slow read finished after the invalidation, so it was not kept
+        assert await cache.get_or_load("k", new_loader) == "new"
+
+    _run(scenario())
+
+
+def test_invalidating_another_key_does_not_block_caching():
+    cache = TieredCache("test")
+
+    async def loader():
+        await cache.invalidate("other")
+        return "value"
+
+    async def never():
+        raise AssertionError("should have been cached")
+
+    async def scenario():
+        await cache.get_or_load("k", loader)
+        assert await cache.get_or_load("k", never) == "value"
+
+    _run(scenario())
+
+
+def test_none_is_not_cached():
+    cache = TieredCache("test")
+    results = iter([None, "found"])
+
+    async def loader():
+        return next(results)
+
+    async def scenario():
+        assert await cache.get_or_load("k", loader) is None
+        assert await cache.get_or_load("k", loader) == "found"
+
+    _run(scenario())
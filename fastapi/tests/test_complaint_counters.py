@@ -0,0 +1,93 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import complaint_counters
+from app.services.complaint_counters import adjust_counters, reconcile_counters
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, got_lock=True, drift_rows=()):
+        self.got_lock = got_lock
+        self.drift_rows = list(drift_rows)
+        self.statements = []
+        self.committed = self.rolled_back = False
+
+    async def scalar(self, stmt):
+        return self.got_lock
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.drift_rows)
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+def _adjustments(monkeypatch):
+    applied = []
+
+    async def adjust(db, deltas):
+        applied.append(deltas)
+
+    monkeypatch.setattr(complaint_counters, "adjust_counters", adjust)
+    return applied
+
+
+def test_reconcile_applies_only_nonzero_deltas(monkeypatch):
+    applied = _adjustments(monkeypatch)
+    # (status, actual - counted) as the full outer join returns them
+    db = _FakeSession(drift_rows=[("Open", 3), ("Closed", 0), ("Resolved", -2)])
+    assert asyncio.run(reconcile_counters(db)) is True
+    assert applied == [{"Open": 3, "Resolved": -2}]
+    assert db.committed
+
+
+def test_reconcile_without_drift_adjusts_nothing(monkeypatch):
+    applied = _adjustments(monkeypatch)
+    db = _FakeSession(drift_rows=[("Open", 0)])
+    assert asyncio.run(reconcile_counters(db)) is True
+    assert applied == []
+    assert db.committed
+
+
+def test_reconcile_skips_when_another_worker_holds_the_lock(monkeypatch):
+    applied = _adjustments(monkeypatch)
+    db = _FakeSession(got_lock=False, drift_rows=[("Open", 3)])
+    assert asyncio.run(reconcile_counters(db)) is False
+    assert applied == [] and db.statements == []
+    assert db.rolled_back and not db.committed
+
+
+def test_reconcile_compares_both_sides_in_one_statement():
+    db = _FakeSession()
+    asyncio.run(reconcile_counters(db))
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    # statuses present on only one side still produce a delta
+    assert "FULL OUTER JOIN" in sql
+
+
+def test_adjust_counters_skips_zero_deltas_and_orders_rows(monkeypatch):
+    monkeypatch.setattr(complaint_counters.random, "randrange", lambda n: n - 1)
+    db = _FakeSession()
+    asyncio.run(adjust_counters(db, {"Resolved": 1, "Closed": 0, "Open": -1}))
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    statuses = [v for k, v in params.items() if k.startswith("complaint_status")]
+    assert statuses == ["Open", "Resolved"]
+
+
+def test_adjust_counters_with_no_deltas_issues_no_statement():
+    db = _FakeSession()
+    asyncio.run(adjust_counters(db, {"Open": 0}))
+    assert db.statements == []
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from app.utils.geo import GEO_CELL_BITS, bounding_box, cover_ranges, encode_cell, haversine_km, split_box
+
+
+def _covered(ranges, lat, lon):
+    cell = encode_cell(lat, lon)
+    return any(lo <= cell < hi for lo, hi in ranges)
+
+
+def _cover(box):
+    return [r for part in split_box(*box) for r in cover_ranges(*part)]
+
+
+def test_box_across_the_antimeridian_wraps():
+    min_lat, min_lon, max_lat, max_lon = bounding_box(0.0, 179.5, 200)
+    assert min_lon > max_lon
+    assert min_lon > 175 and max_lon < -175
+    parts = split_box(min_lat, min_lon, max_lat, max_lon)
+    assert [(p[1], p[3]) for p in parts] == [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+def test_box_away_from_the_antimeridian_is_not_split():
+    box = bounding_box(18.5, 73.8, 50)
+    assert split_box(*box) == [box]
+
+
+@pytest.mark.parametrize("center_lon", [179.9, -179.9, 180.0, -180.0])
+def test_cover_includes_points_on_both_sides_of_the_antimeridian(center_lon):
+    center_lat, radius = -16.5, 150
+    ranges = _cover(bounding_box(center_lat, center_lon, radius))
+    rng = random.Random(5)
+    checked = 0
+    while checked < 500:
+        lat = center_lat + rng.uniform(-1.5, 1.5)
+        lon = (center_lon + rng.uniform(-1.5, 1.5) + 180.0) % 360.0 - 180.0
+        if haversine_km(center_lat, center_lon, lat, lon) <= radius:
+            assert _covered(ranges, lat, lon), (lat, lon)
+            checked += 1
+
+
+def test_cover_stays_near_the_antimeridian():
+    ranges = _cover(bounding_box(0.0, 179.9, 50))
+    assert not _covered(ranges, 0.0, 0.0)
+    assert not _covered(ranges, 0.0, 90.0)
+
+
+def test_box_touching_a_pole_spans_every_longitude():
+    assert bounding_box(89.9, 10.0, 50)[1::2] == (-180.0, 180.0)
+
+
+def test_cover_ranges_are_sorted_and_disjoint():
+    ranges = _cover(bounding_box(0.0, -179.8, 300))
+    for lo, hi in ranges:
+        assert 0 <= lo < hi <= 1 << GEO_CELL_BITS
+    for part in split_box(*bounding_box(0.0, -179.8, 300)):
+        part_ranges = cover_ranges(*part)
+        assert all(a[1] < b[0] for a, b in zip(part_ranges, part_ranges[1:]))
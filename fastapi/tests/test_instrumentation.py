@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.db.instrumentation import QueryStats, normalize_sql, server_timing
+from app.models.complaint import CattleComplaint
+
+
+def _asyncpg_sql(stmt) -> str:
+    """Compile as the engine does at execution time, expanding IN lists."""
+    return str(stmt.compile(dialect=asyncpg.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+def test_in_lists_of_any_length_normalize_alike():
+    def query(n):
+        ids = [uuid.uuid4() for _ in range(n)]
+        return normalize_sql(_asyncpg_sql(
+            select(CattleComplaint.complaint_id)
+            .where(CattleComplaint.complaint_id.in_(ids), CattleComplaint.complaint_status.in_(["Open", "Closed"]))
+        ))
+
+    sql = query(3)
+    assert "::" not in sql
+    assert sql.count("IN (...)") == 2
+    assert sql == query(40)
+
+
+def test_multi_row_values_collapse():
+    def rows(n):
+        return [{"reporter_name": "r", "reporter_phone": "p", "reporter_location": "l", "cattle_count": i,
+                 "cattle_type": "cow", "cattle_condition": "ok", "exact_location": "x",
+                 "spotted_date": datetime(2026, 1, 1)} for i in range(n)]
+
+    sql = normalize_sql(_asyncpg_sql(insert(CattleComplaint).values(rows(5))))
+    # rows carry casts and server defaults like now(); only the first is kept
+    assert "::TIMESTAMP WITHOUT TIME ZONE, " in sql
+    assert sql.endswith(", now(), now()), ...")
+    assert sql == normalize_sql(_asyncpg_sql(insert(CattleComplaint).values(rows(2))))
+
+
+def test_literals_are_masked():
+    sql = normalize_sql("SELECT *  FROM t\n WHERE name = 'O''Brien' AND n > 42 AND id = $1::UUID")
+    assert sql == "SELECT * FROM t WHERE name = ? AND n > ? AND id = $1::UUID"
+
+
+def test_server_timing_reports_durations_without_sql():
+    stats = QueryStats()
+    stats.record(0.004)
+    stats.record(0.012)
+    value = server_timing(stats, 0.05)
+    assert value == 'db;dur=16.0;desc="2 queries", app;dur=50.0, db-slowest;dur=12.0'
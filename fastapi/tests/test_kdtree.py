@@ -0,0 +1,65 @@
+import random
+
+from app.utils.geo import haversine_km
+from app.utils.kdtree import CapacityKDTree
+
+
+def _brute_force(points, capacity, lat, lon):
+    candidates = [(haversine_km(lat, lon, plat, plon), key)
+                  for key, (plat, plon) in points.items() if capacity.get(key, 0) > 0]
+    return min(candidates)[1] if candidates else None
+
+
+def test_nearest_available_matches_brute_force():
+    rng = random.Random(7)
+    points = {i: (rng.uniform(-60, 60), rng.uniform(-180, 180)) for i in range(300)}
+    capacity = {i: rng.choice([0, 0, 1, 3]) for i in points}
+    tree = CapacityKDTree()
+    tree.rebuild((k, lat, lon, capacity[k]) for k, (lat, lon) in points.items())
+    for _ in range(200):
+        lat, lon = rng.uniform(-70, 70), rng.uniform(-180, 180)
+        found = tree.nearest_available(lat, lon)
+        assert (found[0] if found else None) == _brute_force(points, capacity, lat, lon)
+
+
+def test_keys_without_capacity_are_skipped_until_adjusted():
+    tree = CapacityKDTree()
+    tree.rebuild([("near", 18.52, 73.85, 1), ("far", 19.07, 72.88, 1)])
+    assert tree.nearest_available(18.5, 73.8)[0] == "near"
+    tree.adjust("near", -1)
+    assert tree.nearest_available(18.5, 73.8)[0] == "far"
+    tree.adjust("far", -1)
+    assert tree.nearest_available(18.5, 73.8) is None
+    tree.adjust("near", 1)
+    assert tree.nearest_available(18.5, 73.8)[0] == "near"
+
+
+def test_removed_key_is_never_returned():
+    tree = CapacityKDTree()
+    tree.rebuild([("a", 0.0, 0.0, 5), ("b", 0.0, 1.0, 5)])
+    tree.remove("a")
+    assert len(tree) == 1 and "a" not in tree.capacity
+    assert tree.nearest_available(0.0, 0.0)[0] == "b"
+    tree.adjust("a", 1)  # a late release for a removed key is ignored
+    assert "a" not in tree.capacity
+    tree.remove("b")
+    assert tree.nearest_available(0.0, 0.0) is None
+
+
+def test_upsert_moves_a_key():
+    tree = CapacityKDTree()
+    tree.rebuild([("a", 0.0, 0.0, 1), ("b", 0.0, 10.0, 1)])
+    tree.upsert("a", 0.0, 20.0, 1)
+    assert tree.nearest_available(0.0, 0.0)[0] == "b"
+    assert tree.nearest_available(0.0, 21.0)[0] == "a"
+    tree.upsert("c", 0.0, 0.5, 2)
+    assert tree.nearest_available(0.0, 0.0)[0] == "c"
+
+
+def test_nearest_across_the_antimeridian():
+    tree = CapacityKDTree()
+    tree.rebuild([("east", 0.0, 179.9, 1), ("west", 0.0, -179.9, 1), ("inland", 0.0, 170.0, 1)])
+    key, km = tree.nearest_available(0.0, -179.95)
+    assert key == "west"
+    assert km < 10
+    assert tree.nearest_available(0.0, 179.99)[0] == "east"
@@ -0,0 +1,42 @@
+import base64
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    created = datetime(2026, 10, 18, 9, 30, 15, 123456)
+    cid = uuid.uuid4()
+    token = encode_cursor(0.25, created, cid)
+    assert "=" not in token
+    rank, created_s, cid_s = decode_cursor(token)
+    assert rank == 0.25
+    assert datetime.fromisoformat(created_s) == created
+    assert uuid.UUID(cid_s) == cid
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "not a cursor",
+    "%%%%",
+    encode_cursor(datetime(2026, 1, 1), uuid.uuid4())[:-3],
+    base64.urlsafe_b64encode(b'{"a": 1}').decode().rstrip("="),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode().rstrip("="),
+])
+def test_tampered_tokens_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_edited_values_fail_keyset_parsing():
+    # a well-formed token with edited values decodes, but the endpoints parse
+    # every value back and answer 400 on anything that is not a datetime/UUID
+    token = base64.urlsafe_b64encode(b'["yesterday","not-a-uuid"]').decode().rstrip("=")
+    created_s, cid_s = decode_cursor(token)
+    with pytest.raises(ValueError):
+        datetime.fromisoformat(created_s)
+    with pytest.raises(ValueError):
+        uuid.UUID(cid_s)
@@ -0,0 +1,68 @@
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import TokenBucketLimiter, identifier_key
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_up_to_rate_then_wait(clock):
+    limiter = TokenBucketLimiter("t", rate=5, per=60, max_keys=100)
+    assert [limiter.hit("k") for _ in range(5)] == [0.0] * 5
+    # one token every 12 seconds
+    assert limiter.hit("k") == pytest.approx(12.0)
+
+
+def test_tokens_refill_over_time(clock):
+    limiter = TokenBucketLimiter("t", rate=5, per=60, max_keys=100)
+    for _ in range(5):
+        limiter.hit("k")
+    clock.now += 6
+    assert limiter.hit("k") == pytest.approx(6.0)
+    clock.now += 6
+    assert limiter.hit("k") == 0.0
+    assert limiter.hit("k") > 0
+
+
+def test_refill_is_capped_at_rate(clock):
+    limiter = TokenBucketLimiter("t", rate=3, per=30, max_keys=100)
+    limiter.hit("k")
+    clock.now += 3600
+    assert [limiter.hit("k") for _ in range(3)] == [0.0] * 3
+    assert limiter.hit("k") > 0
+
+
+def test_keys_are_independent_and_reset(clock):
+    limiter = TokenBucketLimiter("t", rate=1, per=60, max_keys=100)
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("a") > 0
+    assert limiter.hit("b") == 0.0
+    limiter.reset("a")
+    assert limiter.hit("a") == 0.0
+
+
+def test_least_recently_used_keys_are_evicted(clock):
+    limiter = TokenBucketLimiter("t", rate=1, per=60, max_keys=2)
+    limiter.hit("a")
+    limiter.hit("b")
+    limiter.hit("c")  # evicts "a", which starts over with a full bucket
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("c") > 0
+
+
+def test_identifier_key_normalizes_aadhaar_spacing():
+    assert identifier_key("farmer", "2345 6789 0123") == identifier_key("farmer", "2345-6789-0123")
+    assert identifier_key("vet", " Vet@Example.com ") == identifier_key("vet", "vet@example.com")
@@ -0,0 +1,110 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import complaints
+from app.api.v1.complaints import STATUS_TRANSITIONS, update_complaint_status
+
+ALL_MOVES = [(old, new) for old in STATUS_TRANSITIONS for new in STATUS_TRANSITIONS if old != new]
+
+
+class _Result:
+    def __init__(self, complaint):
+        self._complaint = complaint
+
+    def scalar_one_or_none(self):
+        return self._complaint
+
+
+class _FakeSession:
+    def __init__(self, complaint):
+        self.complaint = complaint
+        self.committed = False
+
+    async def execute(self, query):
+        return _Result(self.complaint)
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def side_effects(monkeypatch):
+    calls = {"counters": [], "events": [], "released": [], "reserved": []}
+
+    async def adjust_counters(db, deltas):
+        calls["counters"].append(deltas)
+
+    async def publish(db, events):
+        calls["events"].extend(events)
+
+    async def invalidate(*keys):
+        pass
+
+    monkeypatch.setattr(complaints, "adjust_counters", adjust_counters)
+    monkeypatch.setattr(complaints, "publish", publish)
+    monkeypatch.setattr(complaints, "complaint_cache", SimpleNamespace(invalidate=invalidate))
+    monkeypatch.setattr(complaints, "dispatcher", SimpleNamespace(
+        release=calls["released"].append, reserve=calls["reserved"].append))
+    return calls
+
+
+def _complaint(status):
+    return SimpleNamespace(complaint_id=uuid.uuid4(), complaint_status=status, gps_latitude=None,
+                           gps_longitude=None, assigned_shelter_id=uuid.uuid4(), updated_at=None)
+
+
+def _put(complaint, new_status):
+    db = _FakeSession(complaint)
+    body = asyncio.run(update_complaint_status(str(complaint.complaint_id), new_status, db=db))
+    return db, body
+
+
+def test_every_target_is_a_known_status():
+    for targets in STATUS_TRANSITIONS.values():
+        assert set(targets) <= set(STATUS_TRANSITIONS)
+
+
+@pytest.mark.parametrize("old,new", [m for m in ALL_MOVES if m[1] in STATUS_TRANSITIONS[m[0]]])
+def test_listed_transition_is_applied(side_effects, old, new):
+    c = _complaint(old)
+    db, body = _put(c, new)
+    assert body["new_status"] == new
+    assert c.complaint_status == new and db.committed
+    assert side_effects["counters"] == [{old: -1, new: 1}]
+    assert len(side_effects["events"]) == 1
+
+
+@pytest.mark.parametrize("old,new", [m for m in ALL_MOVES if m[1] not in STATUS_TRANSITIONS[m[0]]])
+def test_unlisted_transition_is_refused(side_effects, old, new):
+    c = _complaint(old)
+    with pytest.raises(HTTPException) as exc:
+        _put(c, new)
+    assert exc.value.status_code == 409
+    assert c.complaint_status == old
+    assert side_effects["counters"] == [] and side_effects["events"] == []
+
+
+@pytest.mark.parametrize("status", list(STATUS_TRANSITIONS))
+def test_same_status_is_a_no_op(side_effects, status):
+    c = _complaint(status)
+    _, body = _put(c, status)
+    assert body["new_status"] == status
+    assert side_effects["counters"] == [] and side_effects["events"] == []
+
+
+def test_unknown_status_is_rejected(side_effects):
+    with pytest.raises(HTTPException) as exc:
+        _put(_complaint("Open"), "Archived")
+    assert exc.value.status_code == 400
+
+
+def test_closing_releases_and_reopening_reserves_capacity(side_effects):
+    c = _complaint("Open")
+    _put(c, "Closed")
+    assert side_effects["released"] == [c.assigned_shelter_id]
+    _put(c, "Open")
+    assert side_effects["reserved"] == [c.assigned_shelter_id]
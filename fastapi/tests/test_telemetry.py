@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import msgpack
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import telemetry as telemetry_api
+from app.core.config import settings
+from app.main import app
+from app.services.telemetry import parse_json_array, parse_msgpack, parse_ndjson
+
+TOKEN = "test-telemetry-token"
+
+
+def _iso(ts: datetime) -> str:
+    return ts.isoformat() + "Z"
+
+
+@pytest.fixture
+def now():
+    return datetime.utcnow().replace(microsecond=0)
+
+
+@pytest.fixture
+def readings(now):
+    return [
+        {"tag_id": "TAG-1", "timestamp": _iso(now), "temperature": 38.6, "activity": 12, "rumination": 31.5},
+        ["TAG-2", int(now.timestamp()), 39.1],
+        {"tag_id": "", "timestamp": _iso(now)},
+        ["TAG-3", _iso(now - timedelta(days=settings.TELEMETRY_MAX_AGE_DAYS + 2)), 38.0],
+        {"tag_id": "TAG-4", "timestamp": _iso(now), "temperature": "hot"},
+    ]
+
+
+def _check(batch, now):
+    assert [row[0] for row in batch.rows] == ["TAG-1", "TAG-2"]
+    assert batch.rows[0] == ("TAG-1", now, 38.6, 12.0, 31.5)
+    # compact readings may leave trailing measurements out
+    assert batch.rows[1][2:] == (39.1, None, None)
+    assert batch.rejected == 3
+    assert [e["index"] for e in batch.errors] == [2, 3, 4]
+    assert "tag_id" in batch.errors[0]["error"]
+    assert "window" in batch.errors[1]["error"]
+    assert "temperature" in batch.errors[2]["error"]
+
+
+def test_ndjson(readings, now):
+    body = b"\n".join(orjson.dumps(r) for r in readings) + b"\n"
+    _check(parse_ndjson(body), now)
+
+
+def test_ndjson_bad_line_is_reported_by_index(now):
+    body = b'{"tag_id": "TAG-1", "timestamp": "%s"}\n{not json\n\n["TAG-2", "%s"]\n' % (
+        _iso(now).encode(), _iso(now).encode())
+    batch = parse_ndjson(body)
+    assert [row[0] for row in batch.rows] == ["TAG-1", "TAG-2"]
+    assert batch.errors == [{"index": 1, "error": "invalid JSON"}]
+
+
+def test_json_array(readings, now):
+    _check(parse_json_array(orjson.dumps(readings)), now)
+
+
+def test_json_body_must_be_an_array():
+    batch = parse_json_array(b'{"tag_id": "TAG-1"}')
+    assert batch.rows == [] and batch.rejected == 1
+
+
+def test_msgpack_array_of_readings(readings, now):
+    _check(parse_msgpack(msgpack.packb(readings)), now)
+
+
+def test_msgpack_stream_of_readings(readings, now):
+    _check(parse_msgpack(b"".join(msgpack.packb(r) for r in readings)), now)
+
+
+def test_msgpack_truncated_body_keeps_earlier_readings(readings, now):
+    body = msgpack.packb(readings[0]) + msgpack.packb(readings[1])[:-3]
+    batch = parse_msgpack(body)
+    assert [row[0] for row in batch.rows] == ["TAG-1"]
+
+
+def test_window_boundaries(now):
+    oldest = datetime.combine(now.date() - timedelta(days=settings.TELEMETRY_MAX_AGE_DAYS), datetime.min.time())
+    skew = timedelta(seconds=settings.TELEMETRY_MAX_CLOCK_SKEW_SECONDS)
+    batch = parse_json_array(orjson.dumps([
+        ["at-oldest", _iso(oldest)],
+        ["before-oldest", _iso(oldest - timedelta(seconds=1))],
+        ["within-skew", _iso(now + skew - timedelta(seconds=5))],
+        ["past-skew", _iso(now + skew + timedelta(seconds=60))],
+    ]))
+    assert [row[0] for row in batch.rows] == ["at-oldest", "within-skew"]
+    assert [e["index"] for e in batch.errors] == [1, 3]
+
+
+def test_epoch_milliseconds(now):
+    batch = parse_json_array(orjson.dumps([["TAG-1", int(now.timestamp() * 1000)]]))
+    assert batch.rows[0][1] == now
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "TELEMETRY_INGEST_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "TELEMETRY_MAX_BUFFERED_ROWS", 3)
+    monkeypatch.setattr(telemetry_api.telemetry_buffer, "_rows", [])
+    monkeypatch.setattr(app.router, "on_startup", [])
+    monkeypatch.setattr(app.router, "on_shutdown", [])
+    with TestClient(app) as c:
+        yield c
+
+
+def _post(client, rows, token=TOKEN):
+    return client.post("/api/telemetry/readings", content=b"\n".join(orjson.dumps(r) for r in rows),
+                       headers={"content-type": "application/x-ndjson", "x-telemetry-token": token})
+
+
+def test_ingest_accepts_until_the_buffer_is_full(client, now):
+    r = _post(client, [["TAG-1", _iso(now)], ["TAG-2", _iso(now)]])
+    assert r.status_code == 202
+    assert r.json() == {"accepted": 2, "rejected": 0, "errors": []}
+
+    r = _post(client, [["TAG-3", _iso(now)], ["TAG-4", _iso(now)]])
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+
+    # a batch that still fits is accepted
+    assert _post(client, [["TAG-5", _iso(now)]]).status_code == 202
+
+
+def test_ingest_requires_the_token(client, now):
+    assert _post(client, [["TAG-1", _iso(now)]], token="wrong").status_code == 403